@@ -1,3 +1,21 @@
-from .dag_orchestrator import DAGOrchestrator, AgentNode, NodeStatus, OrchestrationResult
+from .dag_orchestrator import (
+    DAGOrchestrator, AgentNode, MapNode, NodeStatus, OrchestrationResult, ScheduleMode, DAGRun, NodeRun,
+)
+from .dag_cache import ResultCache
+from .dag_checkpoint import CheckpointStore
+from .dag_compiler import ProviderPolicy
+from .dag_planner import PlanReport
+from .dag_results import ResultStore, SpilledResult
+from .dag_shm import SharedBuffer
+from .dag_scheduling import AdaptiveConcurrency, DurationHistory, PriorityPolicy
+from .dag_simulator import NodeProfile, SimulationReport, profiles_from_results
+from .dag_signals import Signal, SignalBus
+from .dag_stream import EventKind, NodeEvent, RunStream
 from .garcar_dag import build_garcar_dag
-__all__ = ["DAGOrchestrator", "AgentNode", "NodeStatus", "OrchestrationResult", "build_garcar_dag"]
+__all__ = [
+    "DAGOrchestrator", "AgentNode", "MapNode", "NodeStatus", "OrchestrationResult", "ScheduleMode", "DAGRun",
+    "NodeRun", "PriorityPolicy", "AdaptiveConcurrency", "DurationHistory", "ResultCache", "ResultStore",
+    "SpilledResult", "SharedBuffer", "CheckpointStore", "ProviderPolicy", "PlanReport", "NodeProfile",
+    "SimulationReport", "profiles_from_results", "Signal", "SignalBus", "EventKind", "NodeEvent", "RunStream",
+    "build_garcar_dag",
+]
@@ -0,0 +1,190 @@
+"""
+RHNS DAG Result Cache
+======================
+Opt-in memoization of AgentNode results.
+
+A node is cached when it declares `cache_ttl_s`. Its key is a hash of the
+node id, its `version` string, the caller-supplied run context and the
+results of the providers behind its `requires` capabilities — so a cached
+node re-executes as soon as any upstream result or the seed context
+changes (one tenant's run never gets another's result) or its version is
+bumped, and otherwise is served without running (or touching an external
+API) at all.
+
+Entries live in a size-bounded LRU. With `path` set, entries are also
+written as one JSON file per key so hits survive process restarts;
+results that aren't JSON-serializable stay memory-only.
+
+`fingerprint()` is the same hash widened for incremental runs
+(DAGOrchestrator(incremental=True)): it also covers the execute_fn's code
+(including closure values and partial arguments) and the node's
+result-relevant config, so a node re-executes when its inputs, its code or
+its declaration change — and only then.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(node_id: str, version: str, inputs: dict) -> str:
+    """Content hash of a node's identity, version and input slices."""
+    payload = json.dumps([node_id, version, inputs], sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Captured values hashed by content; anything else by object identity
+_VALUE_TYPES = (type(None), bool, int, float, complex, str, bytes, Enum)
+
+
+def _value_identity(value: Any, seen: set) -> str:
+    if isinstance(value, _VALUE_TYPES):
+        return repr(value)
+    if isinstance(value, (tuple, frozenset)):
+        parts = [_value_identity(v, seen) for v in value]
+        return f"{type(value).__name__}({','.join(sorted(parts) if isinstance(value, frozenset) else parts)})"
+    if isinstance(value, functools.partial) or hasattr(value, "__code__"):
+        return _code_identity(value, seen)
+    return f"{type(value).__qualname__}@{id(value):x}"
+
+
+def _code_identity(fn: Callable, seen: set) -> str:
+    if id(fn) in seen:
+        return "<recursive>"
+    seen.add(id(fn))
+    if isinstance(fn, functools.partial):
+        args = [_value_identity(a, seen) for a in fn.args]
+        args += [f"{k}={_value_identity(v, seen)}" for k, v in sorted(fn.keywords.items())]
+        return f"{_code_identity(fn.func, seen)}({', '.join(args)})"
+    bound = [_value_identity(fn.__self__, seen)] if inspect.ismethod(fn) else []
+    fn = inspect.unwrap(fn)
+    name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', type(fn).__name__)}"
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return f"{name}@{id(fn):x}"   # Callable object or builtin: changes when the object does
+    consts = repr(tuple(c for c in code.co_consts if not inspect.iscode(c)))
+    digest = hashlib.sha256(code.co_code + consts.encode("utf-8"))
+    kwdefaults = tuple(sorted((fn.__kwdefaults__ or {}).items()))
+    bound += [_value_identity(fn.__defaults__, seen), _value_identity(kwdefaults, seen)]
+    for cell in fn.__closure__ or ():
+        try:
+            bound.append(_value_identity(cell.cell_contents, seen))
+        except ValueError:   # Cell not filled yet
+            bound.append("<empty>")
+    digest.update(repr(bound).encode("utf-8"))
+    return f"{name}:{digest.hexdigest()[:16]}"
+
+
+def code_identity(fn: Optional[Callable]) -> str:
+    """
+    Qualified name plus a digest of the bytecode and literals, the defaults,
+    the values a closure captured and a partial's bound arguments — changes
+    when any of them does. Captured numbers, strings, enums and tuples of them
+    count by value, functions by their own code identity, other objects by
+    identity (replacing the object counts as a change, mutating it does not).
+    """
+    if fn is None:
+        return ""
+    return _code_identity(fn, set())
+
+
+def fingerprint(node_id: str, version: str, fn: Optional[Callable], config: dict, inputs: dict) -> str:
+    """Content hash of everything that decides a node's result: code, version, config and inputs."""
+    return cache_key(node_id, version, {"code": code_identity(fn), "config": config, "inputs": inputs})
+
+
+class ResultCache:
+    """Size-bounded LRU of node results with per-entry TTL and optional disk persistence."""
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[str, float, dict]] = OrderedDict()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[tuple[str, float, dict]]:
+        if not self.path or not os.path.exists(self._file(key)):
+            return None
+        try:
+            with open(self._file(key)) as fh:
+                data = json.load(fh)
+            return data["node_id"], data["expires_at"], data["result"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key[:12]}: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for `key`, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._store(key, entry)
+        if entry is not None and entry[1] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        if entry is not None:
+            self._drop(key)
+        self.misses += 1
+        return None
+
+    def discard(self, key: str) -> None:
+        """Drop an entry the caller found unusable after get(); the lookup counts as a miss."""
+        self._drop(key)
+        self.hits -= 1
+        self.misses += 1
+
+    def put(self, key: str, node_id: str, result: dict, ttl_s: float) -> None:
+        entry = (node_id, time.time() + ttl_s, result)
+        self._store(key, entry)
+        if self.path:
+            try:
+                text = json.dumps({"node_id": node_id, "expires_at": entry[1], "result": result})
+            except (TypeError, ValueError):
+                return
+            with open(self._file(key), "w") as fh:
+                fh.write(text)
+
+    def _store(self, key: str, entry: tuple[str, float, dict]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self.path and os.path.exists(self._file(key)):
+            os.remove(self._file(key))
+
+    def invalidate(self, node_id: Optional[str] = None) -> int:
+        """Drop every entry (or only `node_id`'s). Returns the number of entries removed."""
+        keys = [k for k, (nid, _, _) in self._entries.items() if node_id is None or nid == node_id]
+        if self.path:
+            for name in os.listdir(self.path):
+                key = name[:-len(".json")]
+                if name.endswith(".json") and key not in self._entries:
+                    entry = self._load(key)
+                    if entry is not None and (node_id is None or entry[0] == node_id):
+                        keys.append(key)
+        for key in keys:
+            self._drop(key)
+        return len(keys)
@@ -0,0 +1,98 @@
+"""
+RHNS DAG Checkpoints
+=====================
+Append-only, per-run record of node outcomes so an interrupted or partially
+failed run can be resumed instead of restarted.
+
+Layout: one JSON-lines file per run in the store directory. The first line
+is a header with the caller-supplied context; every settled node appends
+one line with its status and result. A line is flushed as soon as the
+node settles, so a crash loses at most the nodes still in flight.
+
+Results that aren't JSON-serializable are recorded without their payload;
+on resume those nodes simply run again.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class Checkpoint:
+    """What a run had persisted when it stopped."""
+    run_id: str
+    context: Optional[dict]                              # None if the seed context wasn't serializable
+    nodes: dict[str, dict] = field(default_factory=dict)  # node_id → last recorded outcome
+
+    def reusable(self, node_id: str) -> Optional[dict]:
+        """The stored result if the node succeeded and its result was persisted, else None."""
+        record = self.nodes.get(node_id)
+        if record and record["status"] == "success" and record.get("result") is not None:
+            return record["result"]
+        return None
+
+
+class CheckpointStore:
+    """Directory of per-run JSONL checkpoint files."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, run_id: str) -> str:
+        if os.path.basename(run_id) != run_id or not run_id:
+            raise ValueError(f"Invalid run_id for checkpoint: {run_id!r}")
+        return os.path.join(self.path, f"{run_id}.jsonl")
+
+    def _append(self, run_id: str, line: str) -> None:
+        with open(self._file(run_id), "a") as fh:
+            fh.write(line + "\n")
+
+    def begin(self, run_id: str, context: dict) -> None:
+        """Start (or, on resume, continue) a run's checkpoint file."""
+        if os.path.exists(self._file(run_id)):
+            return
+        try:
+            header = {"run_id": run_id, "context": json.loads(json.dumps(context))}
+        except (TypeError, ValueError):
+            header = {"run_id": run_id, "context": None}
+        self._append(run_id, json.dumps(header))
+
+    def record(
+        self, run_id: str, node_id: str, status: str,
+        result: Optional[dict] = None, error: Optional[str] = None,
+    ) -> None:
+        """Append one settled node's outcome."""
+        record = {"node_id": node_id, "status": status, "error": error, "result": result}
+        try:
+            line = json.dumps(record)
+        except (TypeError, ValueError):
+            record["result"] = None
+            line = json.dumps(record)
+        self._append(run_id, line)
+
+    def load(self, run_id: str) -> Checkpoint:
+        """Read a run's checkpoint. Raises FileNotFoundError if the run was never checkpointed."""
+        lines = []
+        with open(self._file(run_id)) as fh:
+            for line in fh:
+                try:
+                    lines.append(json.loads(line))
+                except ValueError:
+                    continue  # torn write from a crash mid-append
+        checkpoint = Checkpoint(run_id=run_id, context=lines[0].get("context") if lines else None)
+        for record in lines[1:]:
+            checkpoint.nodes[record["node_id"]] = record
+        return checkpoint
+
+    def runs(self) -> list[str]:
+        """Run ids with a checkpoint, oldest file first."""
+        names = [n for n in os.listdir(self.path) if n.endswith(".jsonl")]
+        names.sort(key=lambda n: os.path.getmtime(os.path.join(self.path, n)))
+        return [n[:-len(".jsonl")] for n in names]
+
+    def delete(self, run_id: str) -> None:
+        if os.path.exists(self._file(run_id)):
+            os.remove(self._file(run_id))
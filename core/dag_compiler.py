@@ -0,0 +1,202 @@
+"""
+RHNS DAG Compiler
+==================
+Turns the orchestrator's registered AgentNodes into an execution plan
+that is built once and reused by every run(), visualize() and planning
+call until the node set changes.
+
+The plan is index-based: each node gets a stable integer (registration
+order) and edges are stored as adjacency lists of integers, so the
+scheduler's per-run bookkeeping is plain list arithmetic instead of
+string-keyed dict lookups.
+
+A capability may have several providers. A dependent is wired to all of
+them so layering and cycle detection see every edge; when the capability
+counts as available during a run is decided by its ProviderPolicy. By
+default every provider runs and dependents wait for all of them; hedged
+cancellation of redundant providers is opt-in (FIRST_SUCCESS).
+"""
+
+from enum import Enum
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .dag_orchestrator import AgentNode
+
+
+CYCLE_ERROR = "Cycle detected in agent dependency graph"
+
+
+class ProviderPolicy(Enum):
+    ALL_SETTLED = "all_settled"       # Default: every provider runs; available once all settled, if any succeeded
+    FIRST_SUCCESS = "first_success"   # Available once any provider succeeds; redundant replicas are cancelled
+    ALL_REQUIRED = "all_required"     # Available once every provider has succeeded
+    ROUND_ROBIN = "round_robin"       # One provider per run, rotating across runs; the others don't run
+
+
+class CompiledDAG:
+    """Immutable, index-based view of a registered node set."""
+
+    def __init__(self, nodes: list["AgentNode"], policies: Optional[dict[str, ProviderPolicy]] = None):
+        self.nodes = nodes
+        self.node_ids: list[str] = [n.node_id for n in nodes]
+        self.index: dict[str, int] = {nid: i for i, nid in enumerate(self.node_ids)}
+        self.policies: dict[str, ProviderPolicy] = dict(policies or {})
+
+        self.capability_providers = self._index_providers()
+        # Node A depends on node B if B.provides intersects A.requires. A node's
+        # own capabilities never count towards its requirements.
+        self.providers: list[list[int]] = []
+        self.required_caps: list[list[str]] = []
+        self.capability_consumers: dict[str, list[int]] = {}
+        self.dependents: list[list[int]] = [[] for _ in nodes]
+        # Requirements no other node provides: the node can never run (it is skipped)
+        self.unprovided_caps: list[list[str]] = []
+        self._build_edges()
+
+        self.layers, self.error = self._kahn_layers()
+        self.order: list[int] = [i for layer in self.layers for i in layer]
+        self.layer_of: list[int] = [0] * len(nodes)
+        for layer_idx, layer in enumerate(self.layers):
+            for i in layer:
+                self.layer_of[i] = layer_idx
+
+    def _index_providers(self) -> dict[str, list[int]]:
+        """Capability → providing node indices, in registration order."""
+        cap_providers: dict[str, list[int]] = {}
+        for i, node in enumerate(self.nodes):
+            for cap in node.provides:
+                listed = cap_providers.get(cap)
+                if listed is None:
+                    cap_providers[cap] = [i]
+                elif listed[-1] != i:
+                    listed.append(i)
+        return cap_providers
+
+    def _build_edges(self) -> None:
+        """Fill providers, required_caps, unprovided_caps, capability_consumers and dependents, in index order."""
+        cap_providers, consumers, dependents = self.capability_providers, self.capability_consumers, self.dependents
+        for i, node in enumerate(self.nodes):
+            requires = node.requires if len(node.requires) < 2 else dict.fromkeys(node.requires)
+            caps = [cap for cap in requires if cap in cap_providers and cap not in node.provides]
+            providers = []
+            for cap in caps:
+                providers.extend(cap_providers[cap])
+                listed = consumers.get(cap)
+                if listed is None:
+                    consumers[cap] = [i]
+                else:
+                    listed.append(i)
+            if len(caps) > 1:
+                providers = list(dict.fromkeys(providers))
+            for provider in providers:
+                dependents[provider].append(i)
+            self.required_caps.append(caps)
+            self.providers.append(providers)
+            self.unprovided_caps.append([cap for cap in requires if cap_providers.get(cap, [i]) == [i]])
+
+    def _kahn_layers(self) -> tuple[list[list[int]], Optional[str]]:
+        """Kahn's algorithm; returns (layers, error) where error is set on a cycle."""
+        in_degree = [len(p) for p in self.providers]
+        layer = [i for i, d in enumerate(in_degree) if d == 0]
+        layers: list[list[int]] = []
+        processed = 0
+        while layer:
+            layers.append(layer)
+            processed += len(layer)
+            nxt: list[int] = []
+            for i in layer:
+                for dependent in self.dependents[i]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        nxt.append(dependent)
+            layer = nxt
+        return layers, (None if processed == len(self.nodes) else CYCLE_ERROR)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def acyclic(self) -> bool:
+        return self.error is None
+
+    def policy(self, capability: str) -> ProviderPolicy:
+        return self.policies.get(capability, ProviderPolicy.ALL_SETTLED)
+
+    def provider_ids(self, node_id: str) -> list[str]:
+        """Node ids this node depends on."""
+        return [self.node_ids[p] for p in self.providers[self.index[node_id]]]
+
+    def descendants(self, roots: list[int]) -> set[int]:
+        """The roots plus every node that (transitively) depends on one of them."""
+        seen = set(roots)
+        stack = list(roots)
+        while stack:
+            for d in self.dependents[stack.pop()]:
+                if d not in seen:
+                    seen.add(d)
+                    stack.append(d)
+        return seen
+
+    def layer_ids(self) -> list[list[str]]:
+        """Kahn layers as node ids."""
+        return [[self.node_ids[i] for i in layer] for layer in self.layers]
+
+
+class CapabilityLedger:
+    """
+    One run's view of capability availability under the provider policies.
+    Shared by the orchestrator and the simulator so both settle providers
+    by the same rules.
+    """
+
+    def __init__(self, plan: CompiledDAG, seq: int = 0):
+        self.plan = plan
+        self.caps: set[str] = set()       # Capabilities whose provider policy is satisfied
+        self.resolved: set[str] = set()   # Capabilities that are satisfied or can no longer be
+        self.provided: set[str] = set()   # Capabilities at least one provider has succeeded for
+        self.unsettled = {cap: len(p) for cap, p in plan.capability_providers.items()}
+        self.selected: dict[str, int] = {}   # ROUND_ROBIN capability → this run's provider (by run number seq)
+        for cap, providers in plan.capability_providers.items():
+            if plan.policy(cap) is ProviderPolicy.ROUND_ROBIN:
+                self.selected[cap] = providers[seq % len(providers)]
+
+    def settle(self, i: int, ok: bool) -> list[str]:
+        """
+        Account for provider i having settled (`ok`: it succeeded) against the
+        policies of the capabilities it provides. Returns the capabilities this
+        settles, satisfied (now in `caps`) or lost.
+        """
+        plan = self.plan
+        newly = []
+        for cap in dict.fromkeys(plan.nodes[i].provides):
+            if cap in self.resolved:
+                continue
+            policy = plan.policy(cap)
+            if policy is ProviderPolicy.ROUND_ROBIN:
+                if self.selected[cap] != i:
+                    continue
+                self.unsettled[cap] = 0
+            else:
+                self.unsettled[cap] -= 1
+            if ok:
+                self.provided.add(cap)
+            if policy is ProviderPolicy.ALL_REQUIRED:
+                settled, satisfied = not ok or self.unsettled[cap] == 0, ok
+            elif policy is ProviderPolicy.ALL_SETTLED:
+                settled, satisfied = self.unsettled[cap] == 0, cap in self.provided
+            else:
+                settled, satisfied = ok or self.unsettled[cap] == 0, ok
+            if settled:
+                self.resolved.add(cap)
+                if satisfied:
+                    self.caps.add(cap)
+                newly.append(cap)
+        return newly
+
+
+def compile_dag(
+    nodes: dict[str, "AgentNode"], policies: Optional[dict[str, ProviderPolicy]] = None,
+) -> CompiledDAG:
+    """Compile a {node_id: AgentNode} mapping into an index-based plan."""
+    return CompiledDAG(list(nodes.values()), policies)
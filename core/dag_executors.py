@@ -0,0 +1,112 @@
+"""
+RHNS DAG Executors
+===================
+Where an AgentNode's execute_fn actually runs.
+
+- ASYNC:   awaited on the orchestrator's event loop (default)
+- THREAD:  run on a shared thread pool — for blocking I/O
+- PROCESS: run on a shared process pool — for CPU-bound work
+
+Pool-backed nodes may use either `def fn(ctx)` or `async def fn(ctx)`;
+coroutine functions get a private event loop inside the worker. PROCESS
+nodes must be module-level (picklable) and receive a picklable context
+slice instead of the live run context.
+
+An ASYNC execute_fn is called on the loop and its result awaited if it is
+awaitable, so anything may return a coroutine. With
+DAGOrchestrator(offload_sync=True), an ASYNC execute_fn that isn't an
+async callable is treated as blocking and resolved to THREAD (see
+effective_mode); an awaitable it returns is handed back to the
+orchestrator's loop rather than run on a private one.
+
+Timeouts and retries are enforced by the orchestrator as for ASYNC nodes.
+A timed-out pool attempt is abandoned rather than killed, so its worker
+stays busy until the call returns; a crashed process worker
+(BrokenProcessPool) discards the pool and the retry runs on a fresh one.
+"""
+
+import asyncio
+import inspect
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Optional
+
+
+class ExecutionMode(Enum):
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def is_async_callable(fn: Callable) -> bool:
+    """`async def` functions (also under functools.partial) and objects with an `async def __call__`."""
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, "__call__", None))
+
+
+def effective_mode(mode: ExecutionMode, fn: Optional[Callable], offload_sync: bool = False) -> ExecutionMode:
+    """With `offload_sync`, an ASYNC execute_fn that isn't an async callable is assumed to block: THREAD."""
+    if offload_sync and mode is ExecutionMode.ASYNC and fn is not None and not is_async_callable(fn):
+        return ExecutionMode.THREAD
+    return mode
+
+
+def invoke(fn: Callable, ctx: dict, drive: bool = True):
+    """
+    Worker entry point: call `fn(ctx)`, driving the result to completion on a
+    private loop if it is a coroutine (with `drive=False`, return it as is).
+    """
+    result = fn(ctx)
+    if drive and inspect.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def invoke_timed(fn: Callable, ctx: dict, drive: bool = True) -> tuple[float, object]:
+    """Like invoke(), but also report when the worker actually picked the call up (wall clock)."""
+    started = time.time()
+    return started, invoke(fn, ctx, drive)
+
+
+class ExecutorPools:
+    """
+    Lazily created, orchestrator-owned thread and process pools.
+
+    Pools are sized once and shared by every run on the orchestrator, so the
+    worker count caps pool-backed concurrency across concurrent runs too.
+    """
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        min_threads: int = 1,
+    ):
+        cpus = os.cpu_count() or 1
+        self.thread_workers = thread_workers or max(min(32, cpus + 4), min_threads)
+        self.process_workers = process_workers or cpus
+        self._pools: dict[ExecutionMode, Executor] = {}
+
+    def get(self, mode: ExecutionMode) -> Executor:
+        pool = self._pools.get(mode)
+        if pool is None:
+            if mode is ExecutionMode.THREAD:
+                pool = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="rhns-dag")
+            elif mode is ExecutionMode.PROCESS:
+                pool = ProcessPoolExecutor(self.process_workers)
+            else:
+                raise ValueError(f"{mode} does not use an executor")
+            self._pools[mode] = pool
+        return pool
+
+    def reset(self, mode: ExecutionMode) -> None:
+        """Discard a pool (e.g. a BrokenProcessPool) so the next get() builds a fresh one."""
+        pool = self._pools.pop(mode, None)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools.clear()
@@ -0,0 +1,140 @@
+"""
+RHNS DAG Map Nodes
+===================
+Fan-out helpers behind MapNode: one node that runs its execute_fn for
+every item of a collection found in the run context, instead of hundreds
+of near-identical AgentNode registrations.
+
+    dag.register(MapNode(
+        node_id="repo_health", name="Repo Health", description="Checks every repo",
+        requires=["repo_list"], provides=["repo_health"],
+        items_from="result_repo_discovery.repos",   # context key, dotted into dict results
+        execute_fn=check_repo,                      # fn(item, ctx) -> result
+        map_concurrency=8, batch_size=10,
+    ))
+
+Items are split into batches of `batch_size`; up to `map_concurrency`
+batches are in flight at once. For THREAD and PROCESS nodes a batch is
+one executor submission, so batching amortizes the hand-off (and, for
+processes, the pickling) over many small items.
+
+A failing item is retried up to `item_retries` times and then recorded;
+the other items are unaffected. The node's result aggregates everything:
+
+    {"items": 332, "succeeded": 330, "failed": 2,
+     "results": [...],                         # per item, input order; None where it failed
+     "errors": [{"index": 17, "error": "..."}, ...]}
+"""
+
+import asyncio
+import inspect
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+
+def resolve_items(context: dict, path: str) -> list:
+    """Look up `path` ("key" or "key.field.subfield") in the context and return it as a list."""
+    head, *fields = path.split(".")
+    if head not in context:
+        raise KeyError(f"Map input {path!r} not found in context")
+    value: Any = context[head]
+    for name in fields:
+        if not isinstance(value, Mapping) or name not in value:
+            raise KeyError(f"Map input {path!r} not found in context")
+        value = value[name]
+    if isinstance(value, (str, bytes, Mapping)) or not hasattr(value, "__iter__"):
+        raise TypeError(f"Map input {path!r} is not a collection: {type(value).__name__}")
+    return list(value)
+
+
+def run_batch(fn: Callable, items: list, ctx: dict, retries: int = 0) -> list[tuple[bool, Any]]:
+    """
+    Worker entry point: call `fn(item, ctx)` for each item, isolating failures.
+    Returns one (ok, result-or-error-message) pair per item.
+    """
+    outcomes = []
+    for item in items:
+        for attempt in range(retries + 1):
+            try:
+                result = fn(item, ctx)
+                if inspect.iscoroutine(result):
+                    result = asyncio.run(result)
+                outcomes.append((True, result))
+                break
+            except Exception as e:
+                if attempt == retries:
+                    outcomes.append((False, str(e) or type(e).__name__))
+    return outcomes
+
+
+async def run_batch_async(fn: Callable, items: list, ctx: dict, retries: int = 0) -> list[tuple[bool, Any]]:
+    """run_batch() on the caller's event loop, awaiting results that are awaitable."""
+    outcomes = []
+    for item in items:
+        for attempt in range(retries + 1):
+            try:
+                result = fn(item, ctx)
+                if inspect.isawaitable(result):
+                    result = await result
+                outcomes.append((True, result))
+                break
+            except Exception as e:
+                if attempt == retries:
+                    outcomes.append((False, str(e) or type(e).__name__))
+    return outcomes
+
+
+def aggregate(outcomes: list[tuple[bool, Any]], max_item_failures: Optional[int] = None) -> dict:
+    """
+    Fold per-item outcomes into the node result. Raises RuntimeError if more
+    than `max_item_failures` items failed (None: item failures never fail the node).
+    """
+    results, errors = [], []
+    for index, (ok, value) in enumerate(outcomes):
+        results.append(value if ok else None)
+        if not ok:
+            errors.append({"index": index, "error": value})
+    if max_item_failures is not None and len(errors) > max_item_failures:
+        raise RuntimeError(
+            f"{len(errors)}/{len(outcomes)} items failed (max_item_failures={max_item_failures}); "
+            f"first error: {errors[0]['error']}"
+        )
+    return {
+        "items": len(outcomes),
+        "succeeded": len(outcomes) - len(errors),
+        "failed": len(errors),
+        "results": results,
+        "errors": errors,
+    }
+
+
+async def run_map(
+    fn: Callable,
+    items: list,
+    ctx: dict,
+    concurrency: int = 4,
+    batch_size: int = 1,
+    retries: int = 0,
+    executor: Optional[Executor] = None,
+) -> list[tuple[bool, Any]]:
+    """
+    Run `fn` over `items` in batches with at most `concurrency` batches in flight.
+    With an executor each batch is submitted to it; otherwise batches run on
+    the running loop.
+    """
+    outcomes: list = [None] * len(items)
+    batches = iter([(start, items[start:start + batch_size]) for start in range(0, len(items), batch_size)])
+    loop = asyncio.get_running_loop()
+
+    async def worker():
+        for start, batch in batches:  # Shared iterator: each batch goes to exactly one worker
+            if executor is None:
+                done = await run_batch_async(fn, batch, ctx, retries)
+            else:
+                done = await loop.run_in_executor(executor, run_batch, fn, batch, ctx, retries)
+            outcomes[start:start + len(done)] = done
+
+    n_batches = -(-len(items) // batch_size)
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, n_batches))))
+    return outcomes
@@ -8,6 +8,34 @@ Architecture: AgentNet-style DAG + RHNS routing
 - Nodes declare capabilities and dependencies
 - Orchestrator builds and validates the execution DAG
 - Topological sort enables maximum parallelism
+- READY mode dispatches each node the moment its last provider completes
+- CRITICAL_PATH policy hands free slots to the longest remaining path first
+- Runtime state lives in a per-run DAGRun, so one DAG can serve many concurrent runs
+- Nodes run inline, on a thread pool or on a process pool (AgentNode.execution);
+  with offload_sync=True, ASYNC execute_fns that aren't async callables go to the thread pool
+- A capability may have several providers; by default all of them run and
+  dependents wait for every one, while a ProviderPolicy can instead wait for the
+  first success (cancelling the rest), require all to succeed, or pick one
+  provider round-robin per run
+- Optional AIMD auto-tuning of the concurrency limit from node latency, errors and timeouts
+- Named resource pools (github_api=4, local_llm=1, ...) cap node kinds on top of
+  max_parallelism, with per-pool wait stats in the result
+- MapNode fans one execute_fn out over a context collection, aggregating per-item results
+- Opt-in hedging: a node that outlives its learned p95 gets a second, parallel attempt
+- Opt-in result cache keyed by a node's version and its upstream results
+- Optional ResultStore: large results spill to memory-mapped files, are handed to
+  consumers as lazy zero-copy views and unloaded once every dependent has settled
+- Opt-in shared memory for PROCESS nodes: large buffers in a worker's result travel
+  as SharedBuffer handles to segments the run unlinks once their dependents settle
+- Opt-in incremental runs: a node whose code, config and inputs are unchanged since
+  its last success reuses that result; only the changed subgraph executes
+- Checkpointed runs can be resumed, re-executing only what didn't succeed
+- serve() subscribes to a SignalBus: a signal runs only the nodes that consume it
+  and their descendants, reusing everyone else's last result
+- analyze() reports critical path, width and estimated makespan before a run;
+  simulate() replays recorded duration/failure distributions in virtual time
+- run_stream() yields node started/succeeded/failed/skipped/cancelled events as they happen
+- A critical failure or an exceeded run deadline cancels in-flight nodes at once
 - Failure of one node does NOT propagate to independent nodes
 - Signals route to nodes by capability, not by position
 
@@ -18,14 +46,35 @@ Research basis:
 """
 
 import asyncio
+import inspect
+import json
 import logging
 import time
-from collections import defaultdict, deque
-from dataclasses import dataclass, field
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timezone
 from enum import Enum
+from collections import Counter
+from collections.abc import Iterator, Mapping
 from typing import Optional, Callable
 
+from .dag_cache import ResultCache, cache_key, fingerprint
+from .dag_checkpoint import CheckpointStore
+from .dag_compiler import CapabilityLedger, CompiledDAG, ProviderPolicy, compile_dag
+from .dag_executors import ExecutionMode, ExecutorPools, effective_mode, invoke_timed
+from .dag_map import aggregate, resolve_items, run_map
+from .dag_planner import PlanReport, analyze
+from .dag_results import ResultStore, SpilledResult
+from .dag_shm import SharedSegments, discard_abandoned, find_buffers, invoke_sharing
+from .dag_simulator import NodeProfile, SimulationReport, simulate
+from .dag_scheduling import (
+    AIMDController, AdaptiveConcurrency, DeadlineHeap, DurationHistory, PoolWait,
+    PriorityPolicy, PrioritySemaphore, ResourcePools, upward_ranks,
+)
+from .dag_signals import Signal, SignalBus
+from .dag_stream import EventKind, NodeEvent, RunStream
 
 logger = logging.getLogger(__name__)
 
@@ -36,11 +85,69 @@ class NodeStatus(Enum):
     SUCCESS = "success"
     FAILED = "failed"
     SKIPPED = "skipped"   # Skipped because a dependency failed
+    CANCELLED = "cancelled"   # Was running when the run halted (critical failure or deadline)
 
 
-@dataclass
+class ScheduleMode(Enum):
+    LAYERED = "layered"   # Barrier between Kahn layers: a layer starts once the previous one is done
+    READY = "ready"       # Dependency-driven: a node starts once its own providers are done
+
+
+@dataclass(slots=True)
+class NodeRun:
+    """Runtime state of one node within one run."""
+    status: NodeStatus = NodeStatus.PENDING
+    result: Optional[dict] = None           # Set once the node succeeds
+    error: Optional[str] = None
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    retry_count: int = 0
+    queue_wait_ms: Optional[float] = None   # Ready → actually running (slot + executor queue), last attempt
+    run_ms: Optional[float] = None          # Time spent inside execute_fn, last attempt
+    cached: bool = False                    # Result served from the ResultCache; execute_fn not called
+    # Result reused, not executed: resume() checkpoint or, for a signal-triggered run, the last successful run
+    restored: bool = False
+    hedged: bool = False                    # A hedge attempt was launched (see AgentNode.hedge)
+    hedge_won: bool = False                 # ...and it finished before the attempt it shadowed
+    reused: bool = False                    # Incremental run: fingerprint unchanged, last result reused
+    fingerprint: Optional[str] = None       # Incremental run: hash of code, config and inputs
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.start_time and self.end_time:
+            return (self.end_time - self.start_time) * 1000
+        return None
+
+    def summary(self) -> dict:
+        """The per-node dict exposed through OrchestrationResult.node_results."""
+        return {
+            "status": self.status.value,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            "retry_count": self.retry_count,
+            "queue_wait_ms": self.queue_wait_ms,
+            "run_ms": self.run_ms,
+            "cached": self.cached,
+            "restored": self.restored,
+            "hedged": self.hedged,
+            "hedge_won": self.hedge_won,
+            "reused": self.reused,
+            "result_keys": list(self.result) if self.result else [],
+        }
+
+
+_NEVER_RUN = NodeRun()
+
+
+@dataclass(slots=True)
 class AgentNode:
-    """A single agent node in the execution DAG."""
+    """
+    A single agent node in the execution DAG.
+
+    Only the declaration lives here; runtime state is kept per run in NodeRun
+    records. `last_run` points at the most recently finished run's record and
+    backs the read-only status/result/error/... properties.
+    """
     node_id: str
     name: str
     description: str
@@ -56,23 +163,144 @@ class AgentNode:
     timeout_s: float = 30.0
     max_retries: int = 1
     critical: bool = False      # If True and this fails, halt entire orchestration
-
-    # Runtime state (set by orchestrator)
-    status: NodeStatus = NodeStatus.PENDING
-    result: dict = field(default_factory=dict)
-    error: Optional[str] = None
-    start_time: Optional[float] = None
-    end_time: Optional[float] = None
-    retry_count: int = 0
+    execution: ExecutionMode = ExecutionMode.ASYNC   # THREAD for blocking I/O, PROCESS for CPU-bound work
+    version: str = ""           # Bump when execute_fn's behaviour changes; part of the cache key
+    cache_ttl_s: Optional[float] = None   # Opt-in: reuse results for unchanged upstream inputs (see dag_cache)
+    hedge: bool = False         # Opt-in, idempotent nodes only: race a second attempt past the learned p95
+    resources: list[str] = field(default_factory=list)   # Named pools this node holds a slot in, e.g. ["github_api"]
 
     # Execution function (async callable)
     execute_fn: Optional[Callable] = field(default=None, repr=False)
 
+    # State of the most recently finished run (None until one has finished)
+    last_run: Optional[NodeRun] = field(default=None, repr=False, compare=False)
+
+    @property
+    def _snapshot(self) -> NodeRun:
+        return self.last_run or _NEVER_RUN
+
+    @property
+    def status(self) -> NodeStatus:
+        return self._snapshot.status
+
+    @property
+    def result(self) -> dict:
+        return self._snapshot.result or {}
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._snapshot.error
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return self._snapshot.start_time
+
+    @property
+    def end_time(self) -> Optional[float]:
+        return self._snapshot.end_time
+
+    @property
+    def retry_count(self) -> int:
+        return self._snapshot.retry_count
+
     @property
     def duration_ms(self) -> Optional[float]:
-        if self.start_time and self.end_time:
-            return (self.end_time - self.start_time) * 1000
-        return None
+        return self._snapshot.duration_ms
+
+
+class DAGRun:
+    """
+    Everything that changes during one execution of a compiled DAG.
+
+    Node state is a list indexed like plan.nodes, and the concurrency limit is
+    per run, so any number of DAGRuns can share one plan concurrently.
+    """
+
+    def __init__(
+        self, plan: CompiledDAG, context: dict, max_parallelism: int,
+        run_id: Optional[str] = None, seq: int = 0, deadline_s: Optional[float] = None,
+        adaptive: Optional[AdaptiveConcurrency] = None,
+    ):
+        self.run_id = run_id or f"dag_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.wall_start = time.time()
+        self.deadline_s = deadline_s
+        self.deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+        self.plan = plan
+        self.context = context
+        self.seed_keys = frozenset(context)
+        self.states: list[NodeRun] = [NodeRun() for _ in plan.nodes]
+        self.controller = AIMDController(adaptive, max_parallelism) if adaptive else None
+        self.timeouts = DeadlineHeap()   # One timer for every in-flight attempt's timeout_s
+        self.semaphore = PrioritySemaphore(self.controller.limit if self.controller else max_parallelism)
+        self.halt_reason = ""
+        self.listeners: list[Callable[[NodeEvent], None]] = []
+        self.seq = seq           # Orchestrator-wide run counter; drives ROUND_ROBIN selection
+        self.ledger = CapabilityLedger(plan, seq)   # Capability availability under the provider policies
+        self.tasks: dict[int, asyncio.Task] = {}   # In-flight node executions
+        self.resource_waits: dict[str, PoolWait] = {}   # Pool name (or GLOBAL_POOL) → wait stats
+        self.resident_bytes = 0  # Result store: estimated size of results kept in memory
+        self.consumers_left: Optional[list[int]] = None   # Result store/shm: dependents yet to settle, per node
+        self.segments: Optional[SharedSegments] = None     # Shared memory behind this run's results
+
+    def state(self, node_id: str) -> NodeRun:
+        return self.states[self.plan.index[node_id]]
+
+
+@dataclass(slots=True)
+class MapNode(AgentNode):
+    """
+    An AgentNode that calls `execute_fn(item, ctx)` once per item of the context
+    collection at `items_from` (e.g. "result_repo_discovery.repos") and provides
+    the aggregated per-item results as a single capability. See dag_map.
+    """
+    items_from: str = ""
+    map_concurrency: int = 4            # Batches in flight at once
+    batch_size: int = 1                 # Items per batch (one executor submission for THREAD/PROCESS)
+    item_retries: int = 0               # Per-item retries; node-level max_retries re-runs the whole map
+    max_item_failures: Optional[int] = None   # Fail the node past this many failed items (None: never)
+
+    def __post_init__(self):
+        if not self.items_from:
+            raise ValueError(f"MapNode [{self.node_id}] needs items_from")
+        if self.map_concurrency < 1 or self.batch_size < 1:
+            raise ValueError(f"MapNode [{self.node_id}] needs map_concurrency >= 1 and batch_size >= 1")
+
+
+class NodeResults(Mapping):
+    """
+    Read-only {node_id: summary dict} view over a finished run's NodeRun records.
+    Each summary is built on access, so compiling a result costs nothing per node.
+    """
+
+    __slots__ = ("_index", "_states")
+
+    def __init__(self, plan: CompiledDAG, states: list[NodeRun]):
+        self._index = plan.index
+        self._states = states
+
+    def __getitem__(self, node_id: str) -> dict:
+        return self._states[self._index[node_id]].summary()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"NodeResults({len(self)} nodes)"
+
+    def as_dict(self) -> dict[str, dict]:
+        """Every summary, materialized into a plain dict."""
+        return {node_id: self[node_id] for node_id in self._index}
+
+    # Copies and pickles are plain dicts, so asdict() and friends never drag the plan along
+    def __deepcopy__(self, memo: dict) -> dict[str, dict]:
+        return self.as_dict()
+
+    def __reduce__(self):
+        return dict, (self.as_dict(),)
 
 
 @dataclass
@@ -86,9 +314,42 @@ class OrchestrationResult:
     failed: int
     skipped: int
     total_duration_ms: float
-    node_results: dict[str, dict] = field(default_factory=dict)
+    cancelled: int = 0      # In flight when the run halted
+    node_results: Mapping[str, dict] = field(default_factory=dict)   # NodeResults view
     halted_early: bool = False
     halt_reason: str = ""
+    cache_hits: int = 0
+    restored: int = 0
+    hedges: int = 0         # Hedge attempts launched — each one is extra execute_fn work
+    hedge_wins: int = 0     # Hedges that beat the attempt they shadowed
+    reused: int = 0         # Incremental runs: nodes whose fingerprint was unchanged
+    resource_waits: dict[str, dict] = field(default_factory=dict)   # Pool → acquired / wait_ms / max_wait_ms
+    parallelism_limit: int = 0      # Concurrency limit at the end of the run (the tuned value if adaptive)
+    parallelism_trace: list[dict] = field(default_factory=list)   # Adaptive only: {t_ms, limit, reason} changes
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+
+GLOBAL_POOL = "max_parallelism"   # resource_waits key for the run-wide concurrency limit
+
+# Declaration fields that affect how or when a node runs, not what it returns;
+# left out of incremental fingerprints. Every other field (including ones added
+# later, such as MapNode's items_from) is fingerprinted.
+_SCHEDULING_FIELDS = frozenset({
+    "name", "description", "priority", "timeout_s", "max_retries", "critical", "execution",
+    "cache_ttl_s", "hedge", "resources", "emits", "execute_fn", "last_run", "map_concurrency", "batch_size",
+})
+
+_SETTLED_EVENTS = {
+    NodeStatus.SUCCESS: EventKind.SUCCEEDED,
+    NodeStatus.FAILED: EventKind.FAILED,
+    NodeStatus.SKIPPED: EventKind.SKIPPED,
+    NodeStatus.CANCELLED: EventKind.CANCELLED,
+}
 
 
 class DAGOrchestrator:
@@ -99,256 +360,929 @@ class DAGOrchestrator:
         orchestrator = DAGOrchestrator()
         orchestrator.register(my_node)
         result = await orchestrator.run()
+
+    run() may be awaited concurrently (e.g. one run per tenant or signal);
+    each call gets its own DAGRun over the shared compiled plan.
     """
 
-    def __init__(self, max_parallelism: int = 8):
+    def __init__(
+        self,
+        max_parallelism: int = 8,
+        schedule: ScheduleMode = ScheduleMode.LAYERED,
+        priority_policy: PriorityPolicy = PriorityPolicy.STATIC,
+        history: Optional[DurationHistory] = None,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        provider_policies: Optional[dict[str, ProviderPolicy]] = None,
+        deadline_s: Optional[float] = None,
+        resource_limits: Optional[dict[str, int]] = None,
+        adaptive: Optional[AdaptiveConcurrency] = None,
+        incremental: bool = False,
+        result_store: Optional[ResultStore] = None,
+        shared_memory_min_bytes: Optional[int] = None,
+        offload_sync: bool = False,
+    ):
         self.nodes: dict[str, AgentNode] = {}
-        self.max_parallelism = max_parallelism
-        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.max_parallelism = max_parallelism   # Fixed limit, or the starting point when `adaptive` is set
+        self.adaptive = adaptive
+        self.schedule = ScheduleMode(schedule)
+        self.priority_policy = PriorityPolicy(priority_policy)
+        self.history = history or DurationHistory()
+        # Size the blocking-I/O pool so every slot can be in a worker at once
+        # Run ASYNC execute_fns that aren't async callables on the thread pool (see dag_executors)
+        self.offload_sync = offload_sync
+        self.executors = ExecutorPools(
+            thread_workers, process_workers,
+            min_threads=max(max_parallelism, adaptive.max_limit if adaptive else 0),
+        )
+        self.cache = cache
+        self.checkpoints = checkpoints
+        self.result_store = result_store   # Spills large results to memory-mapped files (see dag_results)
+        # PROCESS results: buffers of at least this size come back in shared memory (see dag_shm)
+        self.shared_memory_min_bytes = shared_memory_min_bytes
+        self.resources = ResourcePools(resource_limits)   # Shared by all runs, like the executors
+        self.deadline_s = deadline_s   # Default wall-clock budget per run; run(deadline_s=...) overrides
+        self.provider_policies = {cap: ProviderPolicy(p) for cap, p in (provider_policies or {}).items()}
+        # Re-execute only nodes whose fingerprint changed since their last successful run
+        self.incremental = incremental
+        self._dirty: set[str] = set()
+        self._plan: Optional[CompiledDAG] = None
+        self._runs = 0
 
     def register(self, node: AgentNode) -> "DAGOrchestrator":
         """Register a node. Returns self for chaining."""
+        unknown = self.resources.unknown(node.resources)
+        if unknown:
+            raise ValueError(
+                f"Node [{node.node_id}] uses undeclared resource pools {unknown}; "
+                f"declare them with DAGOrchestrator(resource_limits=...)"
+            )
         self.nodes[node.node_id] = node
+        self._plan = None
+        return self
+
+    def unregister(self, node_id: str) -> Optional[AgentNode]:
+        """Remove a node by id. Returns the removed node, or None if it wasn't registered."""
+        node = self.nodes.pop(node_id, None)
+        if node is not None:
+            self._plan = None
+        return node
+
+    def set_provider_policy(self, capability: str, policy: ProviderPolicy) -> "DAGOrchestrator":
+        """Choose how a capability with several providers is satisfied. Returns self for chaining."""
+        self.provider_policies[capability] = ProviderPolicy(policy)
+        self._plan = None
         return self
 
-    def _build_dependency_edges(self) -> dict[str, list[str]]:
+    def mark_dirty(self, *node_ids: str) -> None:
         """
-        Build dependency edges from capability declarations.
-        Node A depends on Node B if B.provides intersects A.requires.
-        Returns {node_id: [dependency_node_ids]}
+        Incremental runs: execute these nodes next time even if their fingerprint
+        is unchanged — e.g. a poller whose external source has moved on. Their
+        dependents follow if the fresh result differs.
         """
-        # Map capability → node_id
-        capability_provider: dict[str, str] = {}
-        for node_id, node in self.nodes.items():
-            for cap in node.provides:
-                capability_provider[cap] = node_id
+        self._dirty.update(node_ids)
 
-        deps: dict[str, list[str]] = defaultdict(list)
-        for node_id, node in self.nodes.items():
-            for req in node.requires:
-                provider = capability_provider.get(req)
-                if provider and provider != node_id:
-                    deps[node_id].append(provider)
+    def invalidate(self) -> None:
+        """Drop the compiled plan, e.g. after editing a registered node's provides/requires."""
+        self._plan = None
+
+    def compile(self) -> CompiledDAG:
+        """Return the cached execution plan, rebuilding it only when the node set changed."""
+        if self._plan is None or len(self._plan) != len(self.nodes):
+            self._plan = compile_dag(self.nodes, self.provider_policies)
+        return self._plan
+
+    def close(self) -> None:
+        """Shut down the thread/process pools used by THREAD and PROCESS nodes."""
+        self.executors.shutdown()
+
+    def _provider_results(self, run: DAGRun, i: int) -> dict:
+        """The context slices behind this node's `requires`: {result_<provider>: result}."""
+        context = run.context
+        slices = {}
+        for provider in run.plan.providers[i]:
+            key = f"result_{run.plan.node_ids[provider]}"
+            if key in context:
+                slices[key] = context[key]
+        return slices
+
+    def _seed_slice(self, run: DAGRun) -> dict:
+        """The caller-supplied part of the run context."""
+        context = run.context
+        return {k: context[k] for k in run.seed_keys if k in context}
 
-        return dict(deps)
+    def _context_slice(self, run: DAGRun, i: int) -> dict:
+        """Caller-supplied context plus this node's provider results — what a process worker receives."""
+        ctx = self._seed_slice(run)
+        ctx.update(self._provider_results(run, i))
+        return ctx
 
-    def _topological_sort(self, deps: dict[str, list[str]]) -> list[list[str]]:
+    def _fingerprint(self, run: DAGRun, i: int) -> str:
         """
-        Kahn's algorithm topological sort.
-        Returns layers where all nodes in a layer can run in parallel.
-        Raises ValueError if a cycle is detected.
+        Incremental fingerprint: the node's code, version and result-relevant
+        config, the caller-supplied context (as in the cache key), its provider
+        results and the signals it consumes.
         """
-        all_nodes = set(self.nodes.keys())
-        in_degree: dict[str, int] = {n: 0 for n in all_nodes}
-        adjacency: dict[str, list[str]] = defaultdict(list)
+        node, context = run.plan.nodes[i], run.context
+        config = {f.name: getattr(node, f.name) for f in fields(node) if f.name not in _SCHEDULING_FIELDS}
+        inputs = self._seed_slice(run)
+        inputs.pop("signals", None)   # Only the signals this node consumes count, below
+        inputs.update(self._provider_results(run, i))
+        signals = [(sig.type, sig.payload) for sig in context.get("signals", ()) if sig.type in node.consumes]
+        if signals:
+            inputs["signals"] = signals
+        return fingerprint(node.node_id, node.version, node.execute_fn, config, inputs)
 
-        for node_id, dep_list in deps.items():
-            for dep in dep_list:
-                adjacency[dep].append(node_id)
-                in_degree[node_id] += 1
+    def _cache_lookup(self, run: DAGRun, i: int) -> Optional[str]:
+        """
+        For a cacheable node, serve a hit straight into its state and return None;
+        on a miss return the key to store the fresh result under.
+        """
+        node, state = run.plan.nodes[i], run.states[i]
+        key = cache_key(node.node_id, node.version, self._context_slice(run, i))
+        hit = self.cache.get(key)
+        if hit is None:
+            return key
+        if not self._reusable(hit):
+            self.cache.discard(key)   # Its shared memory went with the run that produced it
+            return key
+        state.result = dict(hit)
+        state.cached = True
+        state.status = NodeStatus.SUCCESS
+        state.end_time = time.time()
+        logger.info(f"♻️ [{node.node_id}] {node.name} — CACHED")
+        return None
+
+    async def _call(self, run: DAGRun, i: int) -> tuple[float, object]:
+        """
+        Invoke a node's execute_fn according to its (effective) execution mode.
+        Returns (wall time the function actually started, result) so executor
+        queueing can be told apart from run time.
+        """
+        node = run.plan.nodes[i]
+        if isinstance(node, MapNode):
+            return time.time(), await self._call_map(run, i)
+        mode = effective_mode(node.execution, node.execute_fn, self.offload_sync)
+        if mode is ExecutionMode.ASYNC:
+            started, result = time.time(), node.execute_fn(run.context)
+            return started, (await result if inspect.isawaitable(result) else result)
+        if mode is ExecutionMode.THREAD:
+            ctx = dict(run.context)
+        else:
+            ctx = self._context_slice(run, i)
+        if mode is ExecutionMode.PROCESS and self.shared_memory_min_bytes is not None:
+            future = self.executors.get(mode).submit(
+                invoke_sharing, node.execute_fn, ctx, self.shared_memory_min_bytes,
+            )
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                future.add_done_callback(discard_abandoned)   # Don't leak what the worker goes on to share
+                raise
+        # Offloaded from ASYNC: an awaitable it returns belongs on this loop, not a private one
+        offloaded = mode is not node.execution
+        loop = asyncio.get_running_loop()
+        started, result = await loop.run_in_executor(
+            self.executors.get(mode), invoke_timed, node.execute_fn, ctx, not offloaded,
+        )
+        return started, (await result if inspect.isawaitable(result) else result)
 
-        # Start with nodes that have no dependencies
-        queue = deque([n for n in all_nodes if in_degree[n] == 0])
-        layers: list[list[str]] = []
-        processed = 0
+    async def _call_map(self, run: DAGRun, i: int) -> dict:
+        """Fan a MapNode's execute_fn out over its input collection and aggregate the outcomes."""
+        node = run.plan.nodes[i]
+        items = resolve_items(run.context, node.items_from)
+        mode = effective_mode(node.execution, node.execute_fn, self.offload_sync)
+        if mode is ExecutionMode.ASYNC:
+            ctx, executor = run.context, None
+        elif mode is ExecutionMode.THREAD:
+            ctx, executor = dict(run.context), self.executors.get(mode)
+        else:
+            ctx, executor = self._context_slice(run, i), self.executors.get(mode)
+        outcomes = await run_map(
+            node.execute_fn, items, ctx, concurrency=node.map_concurrency,
+            batch_size=node.batch_size, retries=node.item_retries, executor=executor,
+        )
+        summary = aggregate(outcomes, node.max_item_failures)
+        logger.info(f"🗺 [{node.node_id}] Mapped {summary['items']} items — {summary['failed']} failed")
+        return summary
 
-        while queue:
-            layer = list(queue)
-            queue.clear()
-            layers.append(layer)
+    @asynccontextmanager
+    async def _slot(self, run: DAGRun, node: AgentNode, key: tuple):
+        """
+        Hold the node's named resource pools, then a run-wide slot. Pools come
+        first so a node queued behind a busy pool doesn't sit on a slot that
+        nodes needing other resources could use.
+        """
+        async with self.resources.hold(node.resources, key, run.resource_waits):
+            t0 = time.perf_counter()
+            async with run.semaphore.slot(key):
+                wait = run.resource_waits.get(GLOBAL_POOL)
+                if wait is None:
+                    wait = run.resource_waits[GLOBAL_POOL] = PoolWait()
+                wait.add(time.perf_counter() - t0)
+                yield
 
-            next_layer_candidates: dict[str, int] = {}
-            for node_id in layer:
-                processed += 1
-                for dependent in adjacency[node_id]:
-                    in_degree[dependent] -= 1
-                    if in_degree[dependent] == 0:
-                        next_layer_candidates[dependent] = 1
+    def _adapt(self, run: DAGRun, congested: bool, reason: str = "") -> None:
+        """Feed an attempt's outcome to the run's AIMD controller and apply any new limit."""
+        controller = run.controller
+        if controller is not None and controller.observe(congested, reason):
+            run.semaphore.set_limit(controller.limit)
+            logger.info(f"🎚 Concurrency limit → {controller.limit} ({reason or 'healthy'})")
 
-            for node_id in next_layer_candidates:
-                queue.append(node_id)
+    async def _call_hedged(self, run: DAGRun, i: int, after_s: float, slot_key: tuple) -> tuple[float, object]:
+        """
+        Like _call(), but if the attempt is still running after `after_s`, start a
+        second one and return whichever succeeds first; the other is cancelled
+        (pool-backed calls are abandoned, as on timeout). The second attempt holds
+        slots of its own, so hedging never exceeds max_parallelism or a resource pool.
+        """
+        state = run.states[i]
+        primary = asyncio.ensure_future(self._call(run, i))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=after_s)
+            if done:
+                return primary.result()
+            hedge = asyncio.ensure_future(self._call_in_slot(run, i, slot_key))
+            pending.add(hedge)
+            state.hedged = True
+            logger.info(f"🪞 [{run.plan.node_ids[i]}] Hedging after {after_s * 1000:.0f}ms (p95)")
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        state.hedge_won = task is hedge
+                        return task.result()
+                if not pending:
+                    return done.pop().result()   # Both failed: raise the last error
+        finally:
+            for task in pending:
+                task.cancel()
 
-        if processed != len(all_nodes):
-            raise ValueError("Cycle detected in agent dependency graph")
+    async def _call_in_slot(self, run: DAGRun, i: int, slot_key: tuple) -> tuple[float, object]:
+        """_call() under a slot of its own (a hedge attempt; the primary holds the node's slot)."""
+        async with self._slot(run, run.plan.nodes[i], slot_key):
+            return await self._call(run, i)
 
-        return layers
+    def _emit(self, run: DAGRun, kind: EventKind, i: int) -> None:
+        """Notify the run's listeners (e.g. a RunStream) of a node transition."""
+        if not run.listeners:
+            return
+        state = run.states[i]
+        event = NodeEvent(
+            kind=kind, run_id=run.run_id, node_id=run.plan.node_ids[i],
+            duration_ms=state.duration_ms, error=state.error,
+            result=state.result if kind is EventKind.SUCCEEDED else None,
+        )
+        for listener in run.listeners:
+            listener(event)
 
-    async def _execute_node(self, node: AgentNode, context: dict) -> None:
+    async def _execute_node(self, run: DAGRun, i: int, slot_key: tuple = ()) -> None:
         """Execute a single node with timeout and retry logic."""
-        node.status = NodeStatus.RUNNING
-        node.start_time = time.time()
+        node = run.plan.nodes[i]
+        state = run.states[i]
+        state.status = NodeStatus.RUNNING
+        state.start_time = time.time()
+        self._emit(run, EventKind.STARTED, i)
+
+        if self.incremental and self._reuse_unchanged(run, i):
+            return
+        store_key = None
+        if node.cache_ttl_s and self.cache is not None:
+            store_key = self._cache_lookup(run, i)
+            if state.cached:
+                return
+
+        usual_s = self.history.estimate(node.node_id, 0.0)   # Run-time baseline for adaptive concurrency
+        hedge_after = self._hedge_after(node)
 
         for attempt in range(node.max_retries + 1):
             try:
-                async with self._semaphore:
-                    if node.execute_fn:
-                        result = await asyncio.wait_for(
-                            node.execute_fn(context),
-                            timeout=node.timeout_s,
-                        )
-                        node.result = result or {}
-                    else:
-                        node.result = {"status": "no_execute_fn", "node_id": node.node_id}
-
-                node.status = NodeStatus.SUCCESS
-                node.end_time = time.time()
-                logger.info(f"✅ [{node.node_id}] {node.name} — SUCCESS ({node.duration_ms:.0f}ms)")
+                await self._attempt(run, i, slot_key, hedge_after, usual_s)
+                self._succeed(run, i, store_key)
                 return
 
             except asyncio.TimeoutError:
-                node.retry_count = attempt + 1
-                node.error = f"Timeout after {node.timeout_s}s"
+                state.retry_count = attempt + 1
+                state.error = f"Timeout after {node.timeout_s}s"
+                self._adapt(run, True, "timeout")
                 logger.warning(f"⏱ [{node.node_id}] Timeout on attempt {attempt + 1}")
 
+            except BrokenProcessPool as e:
+                self.executors.reset(ExecutionMode.PROCESS)
+                state.retry_count = attempt + 1
+                state.error = f"Process pool broken: {e}"
+                self._adapt(run, True, "error")
+                logger.warning(f"❌ [{node.node_id}] Worker died on attempt {attempt + 1}")
+
             except Exception as e:
-                node.retry_count = attempt + 1
-                node.error = str(e)
+                state.retry_count = attempt + 1
+                state.error = str(e)
+                self._adapt(run, True, "error")
                 logger.warning(f"❌ [{node.node_id}] Error on attempt {attempt + 1}: {e}")
 
             if attempt < node.max_retries:
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
 
-        node.status = NodeStatus.FAILED
-        node.end_time = time.time()
-        logger.error(f"💀 [{node.node_id}] {node.name} — FAILED: {node.error}")
-
-    def _reset_nodes(self) -> None:
-        """Reset all node runtime state before a run."""
-        for node in self.nodes.values():
-            node.status = NodeStatus.PENDING
-            node.result = {}
-            node.error = None
-            node.start_time = None
-            node.end_time = None
-            node.retry_count = 0
-
-    def _available_caps(self) -> set:
-        """Return the set of capabilities provided by all successful nodes so far."""
-        caps: set = set()
-        for n in self.nodes.values():
-            if n.status == NodeStatus.SUCCESS:
-                caps.update(n.provides)
-        return caps
-
-    def _filter_layer(self, layer_nodes: list, available_caps: set) -> list:
+        state.status = NodeStatus.FAILED
+        state.end_time = time.time()
+        logger.error(f"💀 [{node.node_id}] {node.name} — FAILED: {state.error}")
+
+    async def _attempt(
+        self, run: DAGRun, i: int, slot_key: tuple, hedge_after: Optional[float], usual_s: float,
+    ) -> None:
+        """One attempt at node i: hold a slot, call execute_fn (hedged and under timeout_s) and keep its result."""
+        node, state = run.plan.nodes[i], run.states[i]
+        ready_at = time.time()
+        async with self._slot(run, node, slot_key):
+            if node.execute_fn:
+                call = self._call(run, i) if hedge_after is None else self._call_hedged(run, i, hedge_after, slot_key)
+                with run.timeouts.after(node.timeout_s):
+                    started, result = await call
+                finished = time.time()
+                state.queue_wait_ms = (started - ready_at) * 1000
+                state.run_ms = (finished - started) * 1000
+                state.result = result or {}
+                if run.segments is not None:
+                    run.segments.adopt(i, state.result)
+                if run.controller is not None:
+                    tolerance_ms = usual_s * self.adaptive.latency_tolerance * 1000
+                    self._adapt(run, usual_s > 0 and state.run_ms > tolerance_ms, "latency")
+            else:
+                state.result = {"status": "no_execute_fn", "node_id": node.node_id}
+        if self.result_store is not None:
+            await self._admit(run, i)
+
+    def _reuse_unchanged(self, run: DAGRun, i: int) -> bool:
+        """
+        Incremental run: fingerprint node i and, if neither it nor the node was
+        changed since its last successful run, settle it with that run's result.
+        """
+        node, state = run.plan.nodes[i], run.states[i]
+        state.fingerprint = self._fingerprint(run, i)
+        last = node.last_run
+        if (last is None or last.status != NodeStatus.SUCCESS or node.node_id in self._dirty
+                or last.fingerprint != state.fingerprint or not self._reusable(last.result)):
+            return False
+        state.result = last.result
+        state.reused = True
+        state.status = NodeStatus.SUCCESS
+        state.end_time = time.time()
+        logger.info(f"♻️ [{node.node_id}] {node.name} — UNCHANGED")
+        return True
+
+    def _hedge_after(self, node: AgentNode) -> Optional[float]:
+        """Seconds after which to launch a hedge attempt: the node's p95 run time, if it beats timeout_s."""
+        if not node.hedge:
+            return None
+        p95 = self.history.percentile(node.node_id, 0.95)
+        return p95 if p95 is not None and p95 < node.timeout_s else None
+
+    def _succeed(self, run: DAGRun, i: int, store_key: Optional[str]) -> None:
+        """Mark node i successful and record it: duration history and, if cacheable, the result cache."""
+        node, state = run.plan.nodes[i], run.states[i]
+        state.status = NodeStatus.SUCCESS
+        state.end_time = time.time()
+        self._dirty.discard(node.node_id)
+        if state.run_ms is not None:
+            # execute_fn run time only: slot/pool waits, retries and backoff would
+            # inflate the p95 the hedge timer (started once the slot is held) uses
+            self.history.record(node.node_id, state.run_ms / 1000)
+        if store_key:
+            self.cache.put(store_key, node.node_id, state.result, node.cache_ttl_s)
+        logger.info(f"✅ [{node.node_id}] {node.name} — SUCCESS ({state.duration_ms:.0f}ms)")
+
+    async def _admit(self, run: DAGRun, i: int) -> None:
+        """
+        Result store: keep a fresh result in memory if it is small and the run is
+        within budget; otherwise spill it (off the event loop) and hand out the view.
+        """
+        store, state = self.result_store, run.states[i]
+        size = store.size(state.result)
+        if not store.should_spill(size, run.resident_bytes):
+            run.resident_bytes += size
+            return
+        node_id = run.plan.node_ids[i]
+        try:
+            state.result = await asyncio.to_thread(store.spill, node_id, state.result)
+        except Exception as e:
+            run.resident_bytes += size
+            logger.warning(f"⚠️ [{node_id}] Result kept in memory, spill failed: {e}")
+
+    def _release_inputs(self, run: DAGRun, i: int) -> None:
+        """
+        Node i has settled, so it is done with its providers' results. Unload every
+        spilled result (its own included) that no dependent still needs, and unlink
+        the shared memory of providers whose last dependent this was.
+        """
+        left, states, segments = run.consumers_left, run.states, run.segments
+        for p in run.plan.providers[i]:
+            left[p] -= 1
+            if left[p] == 0:
+                if isinstance(states[p].result, SpilledResult):
+                    states[p].result.release()
+                if segments is not None:
+                    segments.release(p)
+        if left[i] == 0:
+            if isinstance(states[i].result, SpilledResult):
+                states[i].result.release()
+            if segments is not None:
+                segments.keep(i)   # Nobody in the run consumes it: keep it readable via node.result
+
+    def _reusable(self, result: object) -> bool:
+        """False for a result whose shared memory has been unlinked: it can't be handed on again."""
+        if self.shared_memory_min_bytes is None:
+            return True
+        return not any(buffer.released for buffer in find_buffers(result))
+
+    def _publish(self, run: DAGRun) -> None:
+        """Point each AgentNode at its state from a finished run (last-run snapshot)."""
+        for node, state in zip(run.plan.nodes, run.states):
+            node.last_run = state
+
+    def _filter_layer(self, run: DAGRun, layer: list[int]) -> list[int]:
         """Skip nodes whose upstream capability requirements aren't met; return runnable nodes."""
+        plan, available_caps = run.plan, run.ledger.caps
         runnable = []
-        for node in layer_nodes:
-            missing = [cap for cap in node.requires if cap not in available_caps]
-            if missing and node.requires:
-                node.status = NodeStatus.SKIPPED
-                node.error = f"Skipped: upstream provider failed for caps {missing}"
+        for i in layer:
+            node = plan.nodes[i]
+            missing = plan.unprovided_caps[i] + [cap for cap in plan.required_caps[i] if cap not in available_caps]
+            if missing:
+                run.states[i].status = NodeStatus.SKIPPED
+                run.states[i].error = f"Skipped: upstream provider failed for caps {missing}"
                 logger.warning(f"⏭ [{node.node_id}] Skipped — missing upstream caps: {missing}")
             else:
-                runnable.append(node)
+                runnable.append(i)
         return runnable
 
-    def _check_halt(self, layer_nodes: list) -> str:
+    def _select_providers(self, run: DAGRun) -> None:
+        """
+        ROUND_ROBIN: skip the providers not selected for this run, unless they
+        are also needed for some other capability.
+        """
+        plan = run.plan
+        passed_over: dict[int, list[str]] = {}
+        for cap, selected in run.ledger.selected.items():
+            for p in plan.capability_providers[cap]:
+                if p != selected:
+                    passed_over.setdefault(p, []).append(cap)
+        for p, caps in passed_over.items():
+            state = run.states[p]
+            if state.status == NodeStatus.PENDING and len(caps) == len(set(plan.nodes[p].provides)):
+                state.status = NodeStatus.SKIPPED
+                state.error = f"Skipped: not selected by round-robin for caps {caps}"
+
+    def _supersede(self, run: DAGRun, cap: str) -> None:
+        """
+        FIRST_SUCCESS hedging: once `cap` is available, providers still pending or
+        in flight whose every capability is already available are redundant —
+        skip them, cancelling any that are running.
+        """
+        plan, states = run.plan, run.states
+        for p in plan.capability_providers[cap]:
+            state = states[p]
+            if state.status not in (NodeStatus.PENDING, NodeStatus.RUNNING):
+                continue
+            if not all(c in run.ledger.caps for c in plan.nodes[p].provides):
+                continue
+            state.status = NodeStatus.SKIPPED
+            state.error = f"Superseded: caps {plan.nodes[p].provides} already provided"
+            state.end_time = time.time()
+            task = run.tasks.get(p)
+            if task is not None:
+                task.cancel()
+            logger.info(f"🏁 [{plan.node_ids[p]}] Superseded — {cap} already provided")
+
+    def _skip_descendants(self, run: DAGRun, lost: list[str]) -> None:
+        """
+        Capabilities can no longer be satisfied: mark their pending consumers
+        SKIPPED. Those settle in turn, so skips reach every descendant that
+        depends on a lost capability in O(descendants) overall.
+        """
+        plan, states = run.plan, run.states
+        for cap in lost:
+            for d in plan.capability_consumers.get(cap, ()):
+                state = states[d]
+                if state.status != NodeStatus.PENDING:
+                    continue
+                node = plan.nodes[d]
+                missing = [c for c in node.requires if c in run.ledger.resolved and c not in run.ledger.caps]
+                state.status = NodeStatus.SKIPPED
+                state.error = f"Skipped: upstream provider failed for caps {missing}"
+                logger.warning(f"⏭ [{node.node_id}] Skipped — missing upstream caps: {missing}")
+
+    def _check_halt(self, run: DAGRun, settled: list[int]) -> str:
         """Return a halt reason if any critical node failed, else empty string."""
-        for node in layer_nodes:
-            if node.status == NodeStatus.FAILED and node.critical:
-                reason = f"Critical node [{node.node_id}] failed: {node.error}"
-                logger.error(f"🛑 HALT: {reason}")
-                return reason
+        for i in settled:
+            node, state = run.plan.nodes[i], run.states[i]
+            if state.status == NodeStatus.FAILED and node.critical:
+                return f"Critical node [{node.node_id}] failed: {state.error}"
         return ""
 
-    def _update_context(self, layer_nodes: list, context: dict) -> None:
-        """Merge successful node results into the shared context."""
-        for node in layer_nodes:
-            if node.status == NodeStatus.SUCCESS:
-                context[f"result_{node.node_id}"] = node.result
+    def _halt(self, run: DAGRun, reason: str) -> None:
+        """
+        Stop the run now: cancel every in-flight node (its scheduler slot is
+        released as the task unwinds) and skip everything not yet started.
+        """
+        for i, task in run.tasks.items():
+            state = run.states[i]
+            if state.status == NodeStatus.RUNNING:
+                state.status = NodeStatus.CANCELLED
+                state.error = f"Cancelled: {reason}"
+                state.end_time = time.time()
+                task.cancel()
+        for state in run.states:
+            if state.status == NodeStatus.PENDING:
+                state.status = NodeStatus.SKIPPED
+                state.error = f"Skipped: run halted — {reason}"
+        logger.error(f"🛑 HALT: {reason} — cancelled {len(run.tasks)} in-flight node(s)")
 
-    def _compile_result(
-        self, run_id: str, started_at: str,
-        wall_start: float, halted: bool, halt_reason: str,
-    ) -> OrchestrationResult:
-        """Build the final OrchestrationResult from node states."""
-        succeeded = sum(1 for n in self.nodes.values() if n.status == NodeStatus.SUCCESS)
-        failed = sum(1 for n in self.nodes.values() if n.status == NodeStatus.FAILED)
-        skipped = sum(1 for n in self.nodes.values() if n.status == NodeStatus.SKIPPED)
+    def _update_context(self, run: DAGRun, settled: list[int]) -> None:
+        """Merge successful node results into the run's shared context."""
+        for i in settled:
+            if run.states[i].status == NodeStatus.SUCCESS:
+                run.context[f"result_{run.plan.node_ids[i]}"] = run.states[i].result
+
+    def _compile_result(self, run: DAGRun) -> OrchestrationResult:
+        """Build the final OrchestrationResult from the run's node states."""
+        states = run.states
+        counts = Counter(st.status for st in states)
         return OrchestrationResult(
-            run_id=run_id,
-            started_at=started_at,
+            run_id=run.run_id,
+            started_at=run.started_at,
             completed_at=datetime.now(timezone.utc).isoformat(),
-            total_nodes=len(self.nodes),
-            succeeded=succeeded,
-            failed=failed,
-            skipped=skipped,
-            total_duration_ms=(time.time() - wall_start) * 1000,
-            node_results={
-                nid: {
-                    "status": n.status.value,
-                    "duration_ms": n.duration_ms,
-                    "error": n.error,
-                    "retry_count": n.retry_count,
-                    "result_keys": list(n.result.keys()) if n.result else [],
-                }
-                for nid, n in self.nodes.items()
-            },
-            halted_early=halted,
-            halt_reason=halt_reason,
+            total_nodes=len(states),
+            succeeded=counts[NodeStatus.SUCCESS],
+            failed=counts[NodeStatus.FAILED],
+            skipped=counts[NodeStatus.SKIPPED],
+            cancelled=counts[NodeStatus.CANCELLED],
+            total_duration_ms=(time.time() - run.wall_start) * 1000,
+            node_results=NodeResults(run.plan, states),
+            halted_early=bool(run.halt_reason),
+            halt_reason=run.halt_reason,
+            cache_hits=sum(1 for st in states if st.cached),
+            restored=sum(1 for st in states if st.restored),
+            hedges=sum(1 for st in states if st.hedged),
+            hedge_wins=sum(1 for st in states if st.hedge_won),
+            reused=sum(1 for st in states if st.reused),
+            resource_waits={name: wait.as_dict() for name, wait in run.resource_waits.items()},
+            parallelism_limit=run.semaphore.limit,
+            parallelism_trace=run.controller.trace if run.controller else [],
         )
 
-    async def run(self, context: dict = None) -> OrchestrationResult:
+    def _priority_keys(self, plan: CompiledDAG, policy: Optional[PriorityPolicy] = None) -> list[tuple]:
         """
-        Execute the full DAG.
-        Runs nodes layer by layer; within each layer, nodes run in parallel.
+        Sort key per node index (lowest first) used to order ready batches and to
+        hand out free semaphore slots. CRITICAL_PATH ranks nodes by their longest
+        remaining path to a sink, weighted by historical run time (timeout_s for
+        nodes that have never completed); static priority breaks ties.
         """
-        run_id = f"dag_{int(time.time())}"
-        started_at = datetime.now(timezone.utc).isoformat()
-        context = context or {}
-        self._semaphore = asyncio.Semaphore(self.max_parallelism)
-        logger.info(f"🚀 DAG Orchestration [{run_id}] — {len(self.nodes)} nodes")
+        if (policy or self.priority_policy) is PriorityPolicy.CRITICAL_PATH:
+            weights = [self.history.estimate(n.node_id, n.timeout_s) for n in plan.nodes]
+            ranks = upward_ranks(plan.order, plan.dependents, weights)
+            return [(-ranks[i], n.priority) for i, n in enumerate(plan.nodes)]
+        return [(n.priority,) for n in plan.nodes]
 
-        self._reset_nodes()
+    async def _dispatch(self, run: DAGRun) -> str:
+        """
+        Drive the DAG to completion and return a halt reason ("" if none).
 
-        try:
-            deps = self._build_dependency_edges()
-            layers = self._topological_sort(deps)
-        except ValueError as e:
-            return OrchestrationResult(
-                run_id=run_id, started_at=started_at,
-                completed_at=datetime.now(timezone.utc).isoformat(),
-                total_nodes=len(self.nodes), succeeded=0, failed=0,
-                skipped=len(self.nodes), total_duration_ms=0,
-                halted_early=True, halt_reason=str(e),
+        LAYERED releases a whole Kahn layer once the previous layer has settled and
+        merges its results into the context at the barrier. READY releases each node
+        as soon as all of its providers have settled and merges results immediately,
+        so the makespan follows the critical path instead of the slowest node per layer.
+        """
+        plan = run.plan
+        layered = self.schedule is ScheduleMode.LAYERED
+        keys = self._priority_keys(plan)
+        waiting = [len(caps) for caps in plan.required_caps]   # READY: capabilities not yet settled
+        layer_left = [len(layer) for layer in plan.layers]
+        next_layer = 1
+        if layered:
+            ready = list(plan.layers[0]) if plan.layers else []
+        else:
+            ready = [i for i, count in enumerate(waiting) if count == 0]
+
+        tasks: dict[asyncio.Task, int] = {}
+        while ready or tasks:
+            if ready:
+                ready.sort(key=keys.__getitem__)
+                batch, ready = ready, []
+                settled = self._launch(run, batch, keys, tasks)
+            else:
+                settled = await self._wait(run, tasks)
+
+            for i in settled:
+                newly = self._settle(run, i)
+                if not layered:
+                    self._update_context(run, [i])
+                    ready += self._unblocked(run, newly, waiting)
+                    continue
+                layer_idx = plan.layer_of[i]
+                layer_left[layer_idx] -= 1
+                if layer_left[layer_idx] == 0:
+                    self._update_context(run, plan.layers[layer_idx])
+                    if next_layer < len(plan.layers):
+                        ready.extend(plan.layers[next_layer])
+                        next_layer += 1
+
+        return run.halt_reason
+
+    def _launch(self, run: DAGRun, batch: list[int], keys: list[tuple], tasks: dict[asyncio.Task, int]) -> list[int]:
+        """
+        Start a task for every runnable node of a released batch. Returns the nodes
+        that settle without running: already settled (restored from a checkpoint, or
+        skipped because an upstream provider failed or the run halted) or skipped now.
+        """
+        plan, states = run.plan, run.states
+        settled = [i for i in batch if states[i].status != NodeStatus.PENDING]
+        batch = [i for i in batch if states[i].status == NodeStatus.PENDING]
+        if not batch:
+            return settled
+        if self.schedule is ScheduleMode.LAYERED:
+            logger.info(
+                f"⚡ Layer {plan.layer_of[batch[0]] + 1}/{len(plan.layers)}: "
+                f"{[plan.node_ids[i] for i in batch]}"
             )
+        runnable = self._filter_layer(run, batch)
+        settled += [i for i in batch if states[i].status == NodeStatus.SKIPPED]
+        for i in runnable:
+            task = run.tasks[i] = asyncio.create_task(self._execute_node(run, i, keys[i]))
+            tasks[task] = i
+        return settled
+
+    async def _wait(self, run: DAGRun, tasks: dict[asyncio.Task, int]) -> list[int]:
+        """
+        Wait for in-flight nodes (or the run deadline) and return the ones that
+        finished. Halts the run on the first critical failure or a missed deadline.
+        """
+        timeout = None
+        if run.deadline is not None and not run.halt_reason:
+            timeout = max(0.0, run.deadline - time.monotonic())
+        done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        settled = [tasks.pop(task) for task in done]
+        if not run.halt_reason:
+            reason = self._check_halt(run, settled)
+            if not reason and run.deadline is not None and time.monotonic() >= run.deadline:
+                reason = f"Run deadline of {run.deadline_s}s exceeded"
+            if reason:
+                run.halt_reason = reason
+                self._halt(run, reason)
+        return settled
+
+    def _unblocked(self, run: DAGRun, newly: list[str], waiting: list[int]) -> list[int]:
+        """READY: count settled capabilities off their consumers; return those with none left to wait for."""
+        unblocked = []
+        for cap in newly:
+            for consumer in run.plan.capability_consumers.get(cap, ()):
+                waiting[consumer] -= 1
+                if waiting[consumer] == 0:
+                    unblocked.append(consumer)
+        return unblocked
 
-        halted = False
-        halt_reason = ""
-        wall_start = time.time()
+    def _settle(self, run: DAGRun, i: int) -> list[str]:
+        """
+        Node i is done (run, restored or skipped): resolve its capabilities, skip
+        or supersede what that decides, emit its event, checkpoint it and release
+        its inputs. Returns the capabilities it settled.
+        """
+        plan, state = run.plan, run.states[i]
+        run.tasks.pop(i, None)
+        newly = run.ledger.settle(i, state.status == NodeStatus.SUCCESS)
+        lost = [cap for cap in newly if cap not in run.ledger.caps]
+        if lost:
+            self._skip_descendants(run, lost)
+        for cap in newly:
+            if cap in run.ledger.caps and plan.policy(cap) is ProviderPolicy.FIRST_SUCCESS:
+                self._supersede(run, cap)
+        self._emit(run, _SETTLED_EVENTS[state.status], i)
+        if self.checkpoints is not None and not state.restored:
+            self.checkpoints.record(run.run_id, plan.node_ids[i], state.status.value, state.result, state.error)
+        if run.consumers_left is not None:
+            self._release_inputs(run, i)
+        return newly
+
+    def _new_run(self, context: dict, run_id: Optional[str] = None, deadline_s: Optional[float] = None) -> DAGRun:
+        self._runs += 1
+        run = DAGRun(
+            self.compile(), context, self.max_parallelism, run_id=run_id, seq=self._runs - 1,
+            deadline_s=deadline_s if deadline_s is not None else self.deadline_s, adaptive=self.adaptive,
+        )
+        if self.shared_memory_min_bytes is not None:
+            run.segments = SharedSegments()
+        if self.result_store is not None or run.segments is not None:
+            run.consumers_left = [len(d) for d in run.plan.dependents]
+        return run
+
+    async def run(self, context: dict = None, deadline_s: Optional[float] = None) -> OrchestrationResult:
+        """
+        Execute the full DAG.
+        LAYERED runs nodes layer by layer; READY dispatches each node as soon as its
+        providers complete. Either way, independent ready nodes run in parallel.
+        With a deadline (here or on the orchestrator), the run halts once it has
+        been going for `deadline_s`: in-flight nodes are cancelled, the rest skipped.
+        """
+        return await self._execute(self._new_run(context or {}, deadline_s=deadline_s))
+
+    def run_stream(self, context: dict = None, deadline_s: Optional[float] = None) -> RunStream:
+        """
+        Execute the full DAG like run(), but as an async iterator of NodeEvents
+        emitted as nodes start and settle. After iteration, `stream.result`
+        holds the OrchestrationResult.
+        """
+        async def start(listener: Callable[[NodeEvent], None]) -> OrchestrationResult:
+            run = self._new_run(context or {}, deadline_s=deadline_s)
+            run.listeners.append(listener)
+            return await self._execute(run)
+        return RunStream(start)
+
+    async def resume(
+        self, run_id: str, context: dict = None, deadline_s: Optional[float] = None,
+    ) -> OrchestrationResult:
+        """
+        Continue a checkpointed run. Nodes that succeeded (with a persisted result)
+        are restored into the context without executing; failed, skipped and
+        never-settled nodes run again. The original seed context is reused unless
+        `context` is given. Requires a CheckpointStore.
+        """
+        if self.checkpoints is None:
+            raise ValueError("resume() requires DAGOrchestrator(checkpoints=CheckpointStore(...))")
+        checkpoint = self.checkpoints.load(run_id)
+        if context is None:
+            context = dict(checkpoint.context or {})
+        run = self._new_run(context, run_id=run_id, deadline_s=deadline_s)
+        for node_id, state in zip(run.plan.node_ids, run.states):
+            result = checkpoint.reusable(node_id)
+            if result is not None:
+                state.status = NodeStatus.SUCCESS
+                state.result = result
+                state.restored = True
+        logger.info(f"⏯ Resuming [{run_id}] — {sum(st.restored for st in run.states)} nodes restored")
+        return await self._execute(run)
+
+    async def run_signals(
+        self, signals: list[Signal], context: dict = None, bus: Optional[SignalBus] = None,
+    ) -> OrchestrationResult:
+        """
+        Run the subgraph a batch of signals triggers: every node that consumes one
+        of their types, plus its descendants. Other nodes don't execute — a node
+        whose last run succeeded contributes that result (restored), any other is
+        skipped. The signals are passed to the nodes as context["signals"].
 
-        for layer_idx, layer in enumerate(layers):
-            if halted:
-                for node_id in layer:
-                    self.nodes[node_id].status = NodeStatus.SKIPPED
+        With `bus`, each node that succeeds publishes its `emits` types back onto
+        it, except types consumed inside this subgraph (which would re-trigger it).
+        """
+        plan = self.compile()
+        types = {signal.type for signal in signals}
+        roots = [i for i, node in enumerate(plan.nodes) if types.intersection(node.consumes)]
+        targets = plan.descendants(roots)
+        run = self._new_run({**(context or {}), "signals": list(signals)})
+        for i in range(len(plan)):
+            if i in targets:
                 continue
+            state, last = run.states[i], plan.nodes[i].last_run
+            if last is not None and last.status == NodeStatus.SUCCESS and self._reusable(last.result):
+                state.status = NodeStatus.SUCCESS
+                state.result = last.result
+                state.fingerprint = last.fingerprint
+                state.restored = True
+            else:
+                state.status = NodeStatus.SKIPPED
+                state.error = "Skipped: not triggered and no earlier result to reuse"
 
-            layer_nodes = sorted(
-                [self.nodes[nid] for nid in layer], key=lambda n: n.priority
-            )
-            logger.info(f"⚡ Layer {layer_idx + 1}/{len(layers)}: {[n.node_id for n in layer_nodes]}")
+        if bus is not None:
+            consumed = {t for i in targets for t in plan.nodes[i].consumes}
 
-            nodes_to_run = self._filter_layer(layer_nodes, self._available_caps())
-            await asyncio.gather(
-                *[self._execute_node(n, context) for n in nodes_to_run],
-                return_exceptions=True,
-            )
+            def emit(event: NodeEvent) -> None:
+                if event.kind is not EventKind.SUCCEEDED or run.state(event.node_id).restored:
+                    return
+                for signal_type in plan.nodes[plan.index[event.node_id]].emits:
+                    if signal_type not in consumed:
+                        bus.publish_nowait(Signal(signal_type, event.result or {}, source=event.node_id))
+            run.listeners.append(emit)
 
-            halt_reason = self._check_halt(layer_nodes)
-            if halt_reason:
-                halted = True
-            self._update_context(layer_nodes, context)
+        logger.info(f"📡 Signals {sorted(types)} → {len(targets)}/{len(plan)} nodes")
+        return await self._execute(run)
 
-        return self._compile_result(run_id, started_at, wall_start, halted, halt_reason)
+    async def serve(
+        self,
+        bus: SignalBus,
+        context: dict = None,
+        queue_size: int = 64,
+        coalesce_s: float = 0.0,
+        on_result: Optional[Callable[[OrchestrationResult], None]] = None,
+    ) -> None:
+        """
+        Run triggered subgraphs for signals from `bus` until cancelled.
+
+        There is one bounded subscription per signal type consumed by a node
+        registered when serve() starts. Each handles one batch at a time, so
+        signals that arrive while its subgraph is running are coalesced into
+        the next run, and a full queue pushes back on publishers. Returns at
+        once if no node consumes any signal type.
+        """
+        types = sorted({t for node in self.nodes.values() for t in node.consumes})
+        subscriptions = [bus.subscribe(t, maxsize=queue_size) for t in types]
+
+        async def pump(subscription):
+            while True:
+                signals = await subscription.next_batch(coalesce_s)
+                result = await self.run_signals(signals, context, bus=bus)
+                if on_result is not None:
+                    on_result(result)
+
+        try:
+            await asyncio.gather(*(pump(s) for s in subscriptions))
+        finally:
+            for subscription in subscriptions:
+                subscription.close()
+
+    async def _execute(self, run: DAGRun) -> OrchestrationResult:
+        """Drive a prepared DAGRun to completion and compile its result."""
+        plan = run.plan
+        logger.info(f"🚀 DAG Orchestration [{run.run_id}] — {len(plan)} nodes ({self.schedule.value})")
+
+        if not plan.acyclic:
+            self._publish(run)
+            return OrchestrationResult(
+                run_id=run.run_id, started_at=run.started_at,
+                completed_at=datetime.now(timezone.utc).isoformat(),
+                total_nodes=len(plan), succeeded=0, failed=0,
+                skipped=len(plan), total_duration_ms=0,
+                halted_early=True, halt_reason=plan.error,
+            )
+
+        if self.checkpoints is not None:
+            self.checkpoints.begin(run.run_id, run.context)
+        self._select_providers(run)
+        try:
+            run.halt_reason = await self._dispatch(run)
+        finally:
+            # Only non-empty if run() itself was cancelled or raised: don't leave nodes running behind it
+            for task in run.tasks.values():
+                task.cancel()
+            if run.segments is not None:
+                run.segments.close()
+        self.history.save()
+        self._publish(run)
+        return self._compile_result(run)
 
     def visualize(self) -> str:
         """Return a text representation of the DAG."""
-        deps = self._build_dependency_edges()
+        plan = self.compile()
         lines = ["RHNS DAG — Node Dependency Graph", "=" * 40]
         for node_id, node in self.nodes.items():
-            dep_str = " → ".join(deps.get(node_id, ["(no deps)"]))
+            dep_str = " → ".join(plan.provider_ids(node_id) or ["(no deps)"])
             lines.append(f"  [{node.priority}] {node_id}: {node.name}")
             lines.append(f"       deps: {dep_str}")
             lines.append(f"       provides: {node.provides}")
         return "\n".join(lines)
+
+    def analyze(self, max_parallelism: Optional[int] = None) -> PlanReport:
+        """
+        Pre-run plan: critical path, layer width, the parallelism needed to reach
+        the critical-path bound and the estimated makespan at `max_parallelism`
+        (default: the configured limit). Weights are historical mean run times,
+        falling back to timeout_s. Raises ValueError on a cyclic node set.
+        """
+        plan = self.compile()
+        weights = [self.history.estimate(n.node_id, n.timeout_s) for n in plan.nodes]
+        return analyze(
+            plan, weights, self._priority_keys(plan), max_parallelism or self.max_parallelism,
+            layered=self.schedule is ScheduleMode.LAYERED,
+            from_history=sum(1 for nid in plan.node_ids if nid in self.history),
+            schedule=self.schedule.value, priority_policy=self.priority_policy.value,
+        )
+
+    def simulate(
+        self,
+        runs: int = 1000,
+        profiles: Optional[dict[str, NodeProfile]] = None,
+        max_parallelism: Optional[int] = None,
+        schedule: Optional[ScheduleMode] = None,
+        priority_policy: Optional[PriorityPolicy] = None,
+        deadline_s: Optional[float] = None,
+        seed: int = 0,
+    ) -> SimulationReport:
+        """
+        Replay the node set `runs` times in virtual time and report makespan
+        percentiles, slot utilization, skip and failure rates. Durations come from
+        `profiles` (see profiles_from_results), else this orchestrator's duration
+        history, else timeout_s. Unset arguments default to the orchestrator's own
+        configuration, so a sweep changes one knob at a time.
+        """
+        plan = self.compile()
+        profiles = profiles or {}
+        node_profiles = [
+            profiles.get(nid) or NodeProfile(self.history.samples(nid)) for nid in plan.node_ids
+        ]
+        schedule = schedule or self.schedule
+        policy = priority_policy or self.priority_policy
+        return simulate(
+            plan, node_profiles, self._priority_keys(plan, policy), max_parallelism or self.max_parallelism,
+            runs=runs, layered=schedule is ScheduleMode.LAYERED, resource_limits=self.resources.limits,
+            deadline_s=deadline_s if deadline_s is not None else self.deadline_s, seed=seed,
+            first_seq=self._runs, schedule=schedule.value, priority_policy=policy.value,
+        )
@@ -0,0 +1,181 @@
+"""
+RHNS DAG Planner
+=================
+Static analysis of a compiled DAG before anything runs:
+
+    report = dag.analyze()
+    print(report.to_json())
+
+Each node is weighted by its historical mean run time where the
+orchestrator has one and by `timeout_s` (the longest it is allowed to
+take) otherwise. From those weights the report derives:
+
+- critical_path: the heaviest provider → dependent chain; no parallelism
+  limit can finish the DAG sooner than its length
+- max_width: the widest Kahn layer
+- parallelism_for_bound: the smallest max_parallelism at which READY list
+  scheduling reaches the critical-path bound; more slots buy nothing
+- estimated_makespan_s: a list-scheduling replay at the configured
+  max_parallelism, schedule mode and priority policy
+
+Estimates treat every provider as required and ignore resource pools,
+retries and hedges. They are for sizing parallelism and for comparing
+one node set against the next, not a promise about a particular run.
+"""
+
+import heapq
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+from .dag_scheduling import upward_ranks
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .dag_compiler import CompiledDAG
+
+
+def critical_path(plan: "CompiledDAG", weights: list[float]) -> tuple[list[int], float]:
+    """Heaviest chain of node indices through the plan, and its total weight."""
+    if not plan.nodes:
+        return [], 0.0
+    ranks = upward_ranks(plan.order, plan.dependents, weights)
+    i = max(plan.layers[0], key=ranks.__getitem__)
+    path = [i]
+    while plan.dependents[i]:
+        i = max(plan.dependents[i], key=ranks.__getitem__)
+        path.append(i)
+    return path, ranks[path[0]]
+
+
+def peak_concurrency(plan: "CompiledDAG", weights: list[float]) -> int:
+    """Most nodes running at once when every node starts the moment its providers finish."""
+    start = [0.0] * len(weights)
+    for i in plan.order:
+        end = start[i] + weights[i]
+        for d in plan.dependents[i]:
+            if end > start[d]:
+                start[d] = end
+    # Ends sort before starts at the same instant, so back-to-back nodes share a slot
+    events = sorted([(start[i] + w, -1) for i, w in enumerate(weights) if w > 0]
+                    + [(start[i], 1) for i, w in enumerate(weights) if w > 0])
+    peak = running = 0
+    for _, delta in events:
+        running += delta
+        peak = max(peak, running)
+    return max(peak, 1)
+
+
+def list_schedule(
+    plan: "CompiledDAG", weights: list[float], keys: list[tuple], limit: int, layered: bool = False,
+) -> float:
+    """
+    Makespan of greedy list scheduling on `limit` slots: whenever a slot is free
+    it goes to the ready node with the lowest key. `layered` adds the LAYERED
+    barrier (a layer starts only once the previous one has finished).
+    """
+    if layered:
+        now = 0.0
+        for layer in plan.layers:
+            slots = [now] * min(limit, len(layer))
+            end = now
+            for i in sorted(layer, key=keys.__getitem__):
+                finish = heapq.heappop(slots) + weights[i]
+                heapq.heappush(slots, finish)
+                end = max(end, finish)
+            now = end
+        return now
+
+    waiting = [len(p) for p in plan.providers]
+    ready = [(keys[i], i) for i in plan.layers[0]] if plan.layers else []
+    heapq.heapify(ready)
+    running: list[tuple[float, int]] = []
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < limit:
+            _, i = heapq.heappop(ready)
+            heapq.heappush(running, (now + weights[i], i))
+        now, i = heapq.heappop(running)
+        for d in plan.dependents[i]:
+            waiting[d] -= 1
+            if waiting[d] == 0:
+                heapq.heappush(ready, (keys[d], d))
+    return now
+
+
+@dataclass
+class PlanReport:
+    nodes: int
+    edges: int
+    layers: int
+    max_width: int
+    widest_layer: list[str]
+    total_work_s: float
+    critical_path: list[str]
+    critical_path_s: float
+    parallelism_for_bound: int
+    max_parallelism: int
+    schedule: str
+    priority_policy: str
+    estimated_makespan_s: float
+    lower_bound_s: float          # max(critical path, total work / max_parallelism)
+    utilization: float            # Busy fraction of max_parallelism slots over the estimated makespan
+    weight_sources: dict = field(default_factory=dict)   # {"history": n, "timeout_s": m}
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+
+def analyze(
+    plan: "CompiledDAG",
+    weights: list[float],
+    keys: list[tuple],
+    max_parallelism: int,
+    layered: bool = False,
+    from_history: int = 0,
+    schedule: str = "",
+    priority_policy: str = "",
+) -> PlanReport:
+    """Build a PlanReport for `plan` with one weight (seconds) and one priority key per node index."""
+    if not plan.acyclic:
+        raise ValueError(plan.error)
+    path, path_s = critical_path(plan, weights)
+    work = float(sum(weights))
+    makespan = list_schedule(plan, weights, keys, max_parallelism, layered)
+
+    # Smallest limit that reaches the critical-path bound. Fewer than work/path_s
+    # slots can't; at peak ASAP concurrency every node starts as soon as it is ready.
+    needed = 1
+    if path_s > 0:
+        lo = max(1, math.ceil(work / path_s - 1e-9))
+        hi = max(lo, peak_concurrency(plan, weights))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if list_schedule(plan, weights, keys, mid) <= path_s * (1 + 1e-9):
+                hi = mid
+            else:
+                lo = mid + 1
+        needed = lo
+
+    widest = max(plan.layers, key=len, default=[])
+    return PlanReport(
+        nodes=len(plan),
+        edges=sum(len(p) for p in plan.providers),
+        layers=len(plan.layers),
+        max_width=len(widest),
+        widest_layer=[plan.node_ids[i] for i in widest],
+        total_work_s=round(work, 6),
+        critical_path=[plan.node_ids[i] for i in path],
+        critical_path_s=round(path_s, 6),
+        parallelism_for_bound=needed,
+        max_parallelism=max_parallelism,
+        schedule=schedule,
+        priority_policy=priority_policy,
+        estimated_makespan_s=round(makespan, 6),
+        lower_bound_s=round(max(path_s, work / max_parallelism), 6),
+        utilization=round(work / (max_parallelism * makespan), 4) if makespan else 0.0,
+        weight_sources={"history": from_history, "timeout_s": len(plan) - from_history},
+    )
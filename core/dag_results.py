@@ -0,0 +1,214 @@
+"""
+RHNS DAG Result Store
+======================
+Keeps large node results out of the heap. Without a store every result
+stays in the run context as a plain dict until the run ends; with one:
+
+    dag = DAGOrchestrator(result_store=ResultStore(budget_bytes=256 << 20,
+                                                   spill_threshold_bytes=8 << 20))
+
+a result at or above `spill_threshold_bytes`, or one that would take the
+run's resident results past `budget_bytes`, is written to a spill file
+and replaced — in the context and in the node's state — by a
+SpilledResult: a read-only Mapping that maps the file only when a
+consumer first reads it.
+
+The file is pickle protocol 5 with bytes-like leaves (bytes, bytearray,
+memoryview of at least `blob_min_bytes`, and arrays that support
+out-of-band pickling) stored out-of-band. Those leaves come back as
+read-only memoryviews straight into the memory map: zero-copy, and
+paged in by the OS only as far as they are read. Everything else
+(dicts, lists, strings, numbers) is unpickled on first access.
+
+Once every dependent of a node has settled, the orchestrator calls
+release(): the loaded data is dropped and the next access maps the file
+again. The file itself is deleted when the last reference to its
+SpilledResult goes away. A SpilledResult pickles as its path, so PROCESS
+workers map the same file instead of receiving a copy.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import uuid
+import weakref
+from collections.abc import Iterator, Mapping
+from typing import Any, Optional
+
+_MAGIC = b"RHNS"
+_HEADER = struct.Struct("<4sQI")     # magic, skeleton length, buffer count
+_SPAN = struct.Struct("<QQ")         # buffer offset, length
+
+
+def estimate_size(obj: Any, limit: Optional[int] = None) -> int:
+    """
+    Rough in-memory size of a result: container overhead plus leaf sizes,
+    following dicts, lists, tuples and sets. Stops counting once past `limit`.
+    """
+    total, stack, seen = 0, [obj], set()
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, memoryview):
+            total += item.nbytes
+        else:
+            total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if limit is not None and total > limit:
+            break
+    return total
+
+
+def _out_of_band(obj: Any, min_bytes: int) -> Any:
+    """Copy of the result's containers with large bytes-like leaves wrapped for out-of-band pickling."""
+    if isinstance(obj, (bytes, bytearray, memoryview)) and len(obj) >= min_bytes:
+        return pickle.PickleBuffer(obj)
+    if isinstance(obj, dict):
+        return {k: _out_of_band(v, min_bytes) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_out_of_band(v, min_bytes) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_out_of_band(v, min_bytes) for v in obj)
+    return obj
+
+
+def write_spill(path: str, result: dict, blob_min_bytes: int = 4096) -> tuple[int, str]:
+    """Write `result` as a spill file. Returns (file size in bytes, content digest)."""
+    buffers: list[pickle.PickleBuffer] = []
+    skeleton = pickle.dumps(_out_of_band(result, blob_min_bytes), protocol=5, buffer_callback=buffers.append)
+    raws = [b.raw() for b in buffers]
+    offset = _HEADER.size + _SPAN.size * len(raws) + len(skeleton)
+    spans = []
+    for raw in raws:
+        spans.append(_SPAN.pack(offset, raw.nbytes))
+        offset += raw.nbytes
+    digest = hashlib.sha256(skeleton)
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, len(skeleton), len(raws)))
+        fh.write(b"".join(spans))
+        fh.write(skeleton)
+        for raw in raws:
+            fh.write(raw)
+            digest.update(raw)
+    return offset, digest.hexdigest()
+
+
+def read_spill(path: str) -> dict:
+    """Map a spill file and unpickle it; out-of-band leaves are memoryviews into the map."""
+    with open(path, "rb") as fh:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    magic, skeleton_len, count = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError(f"Not a result spill file: {path}")
+    start = _HEADER.size + _SPAN.size * count
+    buffers = []
+    for k in range(count):
+        offset, length = _SPAN.unpack_from(view, _HEADER.size + _SPAN.size * k)
+        buffers.append(view[offset:offset + length])
+    # The map stays open for as long as any returned memoryview refers to it
+    return pickle.loads(view[start:start + skeleton_len], buffers=buffers)
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SpilledResult(Mapping):
+    """Read-only, lazily mapped view of a node result spilled to disk."""
+
+    def __init__(self, path: str, nbytes: int, digest: str, keys: list, owner: bool = True):
+        self.path = path
+        self.nbytes = nbytes        # Spill file size
+        self.digest = digest        # Content hash; stands in for the data in cache keys and fingerprints
+        self._keys = keys
+        self._data: Optional[dict] = None
+        self.loads = 0              # Times the file was mapped
+        if owner:
+            weakref.finalize(self, _unlink, path)
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            self._data = read_spill(self.path)
+            self.loads += 1
+        return self._data
+
+    def release(self) -> None:
+        """Drop the loaded data; memoryviews a consumer still holds keep their pages mapped."""
+        self._data = None
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __reduce__(self):
+        # Another process maps the same file; only this process's view deletes it
+        return SpilledResult, (self.path, self.nbytes, self.digest, self._keys, False)
+
+    def __repr__(self) -> str:
+        return f"SpilledResult({self.digest}, {self.nbytes} bytes)"
+
+
+class ResultStore:
+    """Spill policy shared by every run on an orchestrator; budgets are per run."""
+
+    def __init__(
+        self,
+        budget_bytes: int = 256 << 20,
+        spill_threshold_bytes: int = 8 << 20,
+        path: Optional[str] = None,
+        blob_min_bytes: int = 4096,
+    ):
+        self.budget_bytes = budget_bytes
+        self.spill_threshold_bytes = spill_threshold_bytes
+        self.blob_min_bytes = blob_min_bytes
+        self.path = path
+        self.spills = 0
+        self.spilled_bytes = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def _dir(self) -> str:
+        if self.path is None:
+            self.path = tempfile.mkdtemp(prefix="rhns-results-")
+        return self.path
+
+    def size(self, result: dict) -> int:
+        """Estimated resident size, counted only up to the spill threshold."""
+        return estimate_size(result, limit=self.spill_threshold_bytes)
+
+    def should_spill(self, size: int, resident_bytes: int) -> bool:
+        return size >= self.spill_threshold_bytes or resident_bytes + size > self.budget_bytes
+
+    def spill(self, node_id: str, result: dict) -> SpilledResult:
+        """Write `result` to a new spill file and return the view that replaces it. Blocking I/O."""
+        path = os.path.join(self._dir(), f"{node_id}-{uuid.uuid4().hex[:12]}.spill")
+        nbytes, digest = write_spill(path, result, self.blob_min_bytes)
+        self.spills += 1
+        self.spilled_bytes += nbytes
+        return SpilledResult(path, nbytes, digest, list(result))
@@ -0,0 +1,397 @@
+"""
+RHNS DAG Scheduling Primitives
+===============================
+Building blocks the DAG orchestrator uses to decide *which* ready node
+gets the next execution slot.
+
+- DurationHistory: rolling per-node run-time samples, kept across runs
+- PrioritySemaphore: a counting semaphore that grants slots by key, not FIFO
+- ResourcePools: named PrioritySemaphores (github_api=4, local_llm=1, ...) with wait stats
+- DeadlineHeap: enforces every in-flight node's timeout_s with a single loop timer
+- AIMDController: adjusts a run's concurrency limit from node latency, errors and timeouts
+- upward_ranks: longest remaining path (own duration included) to a sink
+
+Research basis:
+- HEFT: upward-rank list scheduling (Topcuoglu et al., IEEE TPDS 2002)
+- AIMD: additive-increase/multiplicative-decrease congestion control (Chiu & Jain, 1989)
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+
+class PriorityPolicy(Enum):
+    STATIC = "static"                 # AgentNode.priority, then registration order
+    CRITICAL_PATH = "critical_path"   # Longest remaining path to a sink first
+
+
+class DurationHistory:
+    """
+    Rolling window of observed node run times (seconds), keyed by node_id.
+
+    The orchestrator records how long a successful attempt's execute_fn ran,
+    not the node's end-to-end duration: time spent waiting for a slot or a
+    pool, failed attempts and backoff depend on the run's load, not the node.
+
+    Estimates fall back to the caller-supplied default (usually timeout_s)
+    for nodes that have never completed.
+    """
+
+    def __init__(self, window: int = 20, path: Optional[str] = None):
+        self.window = window
+        self.path = path
+        # Plain lists trimmed on append: a bounded deque costs ~600 bytes even
+        # when nearly empty, which adds up across tens of thousands of nodes
+        self._samples: dict[str, list[float]] = {}
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def record(self, node_id: str, seconds: float) -> None:
+        samples = self._samples.get(node_id)
+        if samples is None:
+            samples = self._samples[node_id] = []
+        samples.append(seconds)
+        if len(samples) > self.window:
+            del samples[:-self.window]
+
+    def samples(self, node_id: str) -> list[float]:
+        return list(self._samples.get(node_id, ()))
+
+    def estimate(self, node_id: str, default: float) -> float:
+        """Mean of the recorded window, or `default` if nothing was recorded."""
+        samples = self._samples.get(node_id)
+        if not samples:
+            return default
+        return sum(samples) / len(samples)
+
+    def percentile(self, node_id: str, q: float, min_samples: int = 5) -> Optional[float]:
+        """Nearest-rank q-quantile (0 < q <= 1) of the window, or None with fewer than `min_samples`."""
+        samples = self._samples.get(node_id)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def __contains__(self, node_id: str) -> bool:
+        return bool(self._samples.get(node_id))
+
+    def save(self, path: Optional[str] = None) -> None:
+        target = path or self.path
+        if not target:
+            return
+        with open(target, "w") as fh:
+            json.dump({nid: list(s) for nid, s in self._samples.items()}, fh)
+
+    def load(self, path: str) -> None:
+        with open(path) as fh:
+            data = json.load(fh)
+        for node_id, samples in data.items():
+            self._samples[node_id] = list(samples[-self.window:])
+
+
+class PrioritySemaphore:
+    """
+    Counting semaphore whose waiters are woken lowest-key first.
+
+    asyncio.Semaphore wakes waiters in arrival order, which hands freed slots
+    to whichever node happened to become ready first. Here the scheduler
+    passes a sort key with each acquire so the most urgent waiter wins.
+    """
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError("PrioritySemaphore value must be >= 1")
+        self.limit = value
+        self._value = value     # Free slots; negative after a shrink while over the new limit
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    def set_limit(self, limit: int) -> None:
+        """
+        Resize while in use. Growing wakes waiters at once; shrinking takes
+        effect as holders release (nobody is interrupted).
+        """
+        if limit < 1:
+            raise ValueError("PrioritySemaphore limit must be >= 1")
+        self._value += limit - self.limit
+        self.limit = limit
+        while self._value > 0 and self._waiters:
+            self._value -= 1
+            self.release()
+
+    def locked(self) -> bool:
+        return self._value <= 0
+
+    async def acquire(self, key: tuple = ()) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (key, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted a slot in the same tick we were cancelled: hand it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        if self._value < 0:     # Over the limit after a shrink: retire this slot
+            self._value += 1
+            return
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+    @asynccontextmanager
+    async def slot(self, key: tuple = ()):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+@dataclass(slots=True)
+class PoolWait:
+    """How long acquisitions of one pool had to wait during a run."""
+    acquired: int = 0
+    wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    def add(self, waited_s: float) -> None:
+        waited_ms = waited_s * 1000
+        self.acquired += 1
+        self.wait_ms += waited_ms
+        self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "wait_ms": round(self.wait_ms, 3),
+            "mean_wait_ms": round(self.wait_ms / self.acquired, 3) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+class ResourcePools:
+    """
+    Named concurrency limits, e.g. {"github_api": 4, "local_llm": 1, "cpu": os.cpu_count()}.
+
+    Each pool is a PrioritySemaphore shared by every run on the orchestrator,
+    so a rate-limited API stays within its limit however many runs overlap.
+    A node holds one slot in each pool it names.
+    """
+
+    def __init__(self, limits: Optional[dict[str, int]] = None):
+        self.limits = dict(limits or {})
+        self._pools = {name: PrioritySemaphore(limit) for name, limit in self.limits.items()}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pools
+
+    def unknown(self, names) -> list[str]:
+        return sorted(set(names) - self._pools.keys())
+
+    @asynccontextmanager
+    async def hold(self, names: list[str], key: tuple, waits: dict[str, PoolWait]):
+        """
+        Acquire a slot in every named pool, always in sorted order so two nodes
+        needing overlapping pools can't deadlock, recording each wait in `waits`.
+        """
+        held = []
+        try:
+            for name in sorted(set(names)):
+                t0 = time.perf_counter()
+                await self._pools[name].acquire(key)
+                held.append(name)
+                waits.setdefault(name, PoolWait()).add(time.perf_counter() - t0)
+            yield
+        finally:
+            for name in reversed(held):
+                self._pools[name].release()
+
+
+class _Deadline:
+    """One attempt's entry on a DeadlineHeap; also the context manager that guards it."""
+
+    __slots__ = ("heap", "timeout_s", "when", "task", "cancelling", "expired", "done")
+
+    def __init__(self, heap: "DeadlineHeap", timeout_s: float):
+        self.heap = heap
+        self.timeout_s = timeout_s
+        self.expired = False
+        self.done = False
+
+    def __enter__(self) -> "_Deadline":
+        self.heap._add(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.done = True
+        self.heap._discard()
+        if not self.expired or exc_type is not asyncio.CancelledError:
+            return False
+        # Our cancel, unless someone else cancelled the task as well
+        uncancel = getattr(self.task, "uncancel", None)   # Python 3.11+
+        if uncancel is not None and uncancel() > self.cancelling:
+            return False
+        raise asyncio.TimeoutError from exc
+
+
+class DeadlineHeap:
+    """
+    Timeouts for every in-flight node attempt of a run, enforced with one timer.
+
+    asyncio.wait_for wraps each attempt in an extra task, a waiter future and a
+    timer handle of its own. Here the attempt runs in its node's task: the
+    `with heap.after(timeout_s):` block pushes its deadline onto a heap, and a
+    single loop timer, armed for the earliest deadline, cancels the tasks whose
+    time is up. The block turns that cancellation into asyncio.TimeoutError,
+    as wait_for would; a cancellation from anywhere else passes through.
+
+    The timer is armed on `resolution_s` boundaries (rounded up, so nothing
+    expires early) and one firing expires every attempt due by then, so a
+    burst of attempts started together costs one wake-up, not one each.
+    """
+
+    def __init__(self, resolution_s: float = 0.001):
+        self.resolution_s = resolution_s
+        self._heap: list = []          # (deadline, seq, _Deadline); finished entries removed lazily
+        self._seq = itertools.count()
+        self._live = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._armed_for = math.inf
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def after(self, timeout_s: float) -> _Deadline:
+        """Context manager: raise asyncio.TimeoutError in the current task after `timeout_s`."""
+        return _Deadline(self, timeout_s)
+
+    def _add(self, entry: _Deadline) -> None:
+        loop = asyncio.get_running_loop()
+        entry.task = asyncio.current_task()
+        entry.cancelling = entry.task.cancelling() if hasattr(entry.task, "cancelling") else 0
+        entry.when = loop.time() + entry.timeout_s
+        heapq.heappush(self._heap, (entry.when, next(self._seq), entry))
+        self._live += 1
+        if entry.when > self._armed_for:
+            return
+        self._arm(loop, entry.when)
+
+    def _discard(self) -> None:
+        self._live -= 1
+        if self._live == 0:
+            self._heap.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer, self._armed_for = None, math.inf
+        elif len(self._heap) > 64 and len(self._heap) > 2 * self._live:
+            self._heap = [item for item in self._heap if not item[2].done]
+            heapq.heapify(self._heap)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop, when: float) -> None:
+        tick = math.ceil(when / self.resolution_s) * self.resolution_s
+        if tick == self._armed_for:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._armed_for = tick
+        self._timer = loop.call_at(tick, self._fire)
+
+    def _fire(self) -> None:
+        # The loop may run a timer a hair before its time: whatever was due by the
+        # tick this one was armed for counts as expired
+        loop, heap = asyncio.get_running_loop(), self._heap
+        due = max(self._armed_for, loop.time())
+        self._timer, self._armed_for = None, math.inf
+        while heap and (heap[0][0] <= due or heap[0][2].done):
+            entry = heapq.heappop(heap)[2]
+            if not entry.done and not entry.expired:
+                entry.expired = True
+                self.expired += 1
+                entry.task.cancel()
+        if heap:
+            self._arm(loop, heap[0][0])
+
+
+@dataclass
+class AdaptiveConcurrency:
+    """Bounds and gains for auto-tuning a run's concurrency limit (see AIMDController)."""
+    min_limit: int = 1
+    max_limit: int = 32
+    backoff: float = 0.5             # Multiplicative decrease on a timeout, error or latency spike
+    latency_tolerance: float = 2.0   # Run time above this multiple of the node's mean run time = congestion
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease on a concurrency limit.
+
+    Every completion that ran within `latency_tolerance` of the node's usual
+    time adds 1/limit, i.e. about +1 per round of `limit` healthy completions.
+    A timeout, error or latency spike multiplies the limit by `backoff`, then
+    further congestion is ignored for one round so a single burst of failures
+    from the same saturated moment backs off once, not once per failure.
+    """
+
+    def __init__(self, config: AdaptiveConcurrency, initial: int):
+        self.config = config
+        self.limit = min(max(initial, config.min_limit), config.max_limit)
+        self.trace: list[dict] = [{"t_ms": 0.0, "limit": self.limit, "reason": "initial"}]
+        self._started = time.perf_counter()
+        self._credit = 0.0
+        self._cooldown = 0
+
+    def observe(self, congested: bool, reason: str = "") -> bool:
+        """Feed one completed attempt; returns True if the limit changed."""
+        if self._cooldown > 0:
+            self._cooldown -= 1
+        if congested:
+            if self._cooldown:
+                return False
+            self._cooldown = self.limit
+            self._credit = 0.0
+            return self._set(max(self.config.min_limit, int(self.limit * self.config.backoff)), reason)
+        self._credit += 1 / self.limit
+        if self._credit >= 1:
+            self._credit -= 1
+            return self._set(min(self.config.max_limit, self.limit + 1), "healthy")
+        return False
+
+    def _set(self, limit: int, reason: str) -> bool:
+        if limit == self.limit:
+            return False
+        self.limit = limit
+        t_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        self.trace.append({"t_ms": t_ms, "limit": limit, "reason": reason})
+        return True
+
+
+def upward_ranks(order: list[int], dependents: list[list[int]], weights: list[float]) -> list[float]:
+    """
+    Longest path from each node index to any sink, including the node's own weight.
+
+    `order` must be a topological order (providers before dependents).
+    """
+    ranks = [0.0] * len(weights)
+    for i in reversed(order):
+        tail = max((ranks[d] for d in dependents[i]), default=0.0)
+        ranks[i] = weights[i] + tail
+    return ranks
@@ -0,0 +1,242 @@
+"""
+RHNS DAG Shared Memory
+=======================
+Zero-copy result hand-off between PROCESS workers. Normally a PROCESS
+node's result is pickled back to the orchestrator and pickled again into
+every downstream worker. With
+
+    dag = DAGOrchestrator(shared_memory_min_bytes=1 << 20)
+
+the worker moves each buffer in its result of at least that size —
+bytes, bytearray, memoryview, array.array, NumPy arrays, anything
+C-contiguous that supports the buffer protocol — into a
+multiprocessing.shared_memory segment and returns a SharedBuffer handle
+in its place. Only the handle (a name, a size and a layout) travels
+through the context; consumers attach and read the segment in place:
+
+    samples = ctx["result_sampler"]["samples"]   # SharedBuffer
+    samples.view        # memoryview over the segment, cast to the original format/shape
+    samples.array()     # numpy.ndarray over the segment (needs numpy)
+
+Segments belong to the run that produced them. Once every dependent of
+a node has settled, the orchestrator unlinks its segments and the memory
+is freed as soon as no process has them mapped. A result nobody in the
+run depends on stays readable through node.result: the orchestrator maps
+it and the segment is unlinked when that SharedBuffer is garbage
+collected, as with a SpilledResult's file. A handle whose segment has
+been unlinked can no longer be attached, so incremental runs, serve()
+and the result cache execute such a node again rather than reuse its result.
+"""
+
+import asyncio
+import inspect
+import os
+import time
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Optional
+
+# Attached segments whose close() was refused because a caller still holds a view;
+# retried on later detaches so SharedMemory.__del__ never sees exported buffers.
+_lingering: list[shared_memory.SharedMemory] = []
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """Lifetimes here are explicit (the run unlinks), so keep the resource tracker out of it."""
+    if os.name == "posix":
+        try:
+            resource_tracker.unregister(getattr(shm, "_name", shm.name), "shared_memory")
+        except Exception:   # pragma: no cover — tracker already gone at interpreter shutdown
+            pass
+
+
+def _close(shm: shared_memory.SharedMemory) -> None:
+    for pending in list(_lingering):
+        try:
+            pending.close()
+            _lingering.remove(pending)
+        except BufferError:
+            pass
+    try:
+        shm.close()
+    except BufferError:
+        _lingering.append(shm)
+
+
+class SharedBuffer:
+    """Picklable handle to a buffer living in a shared memory segment."""
+
+    def __init__(self, name: str, nbytes: int, format: str = "B", shape: tuple = (), typestr: str = ""):
+        self.name = name
+        self.nbytes = nbytes
+        self.format = format        # struct format of the original buffer
+        self.shape = tuple(shape)   # Original shape (empty: flat bytes)
+        self.typestr = typestr      # NumPy __array_interface__ typestr, if it came from an array
+        self.released = False       # Unlinked by the run that created it
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    @property
+    def attached(self) -> bool:
+        return self._shm is not None
+
+    def attach(self) -> "SharedBuffer":
+        """Map the segment into this process (done lazily by `view`)."""
+        if self._shm is None:
+            shm = shared_memory.SharedMemory(name=self.name)
+            _untrack(shm)
+            self._shm = shm
+        return self
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy memoryview, cast back to the original format and shape where memoryview allows."""
+        raw = self.attach()._shm.buf[:self.nbytes]
+        if self.format in ("B", "") and len(self.shape) <= 1:
+            return raw
+        try:
+            return raw.cast(self.format, self.shape) if self.shape else raw.cast(self.format)
+        except (TypeError, ValueError):
+            return raw
+
+    def array(self):
+        """Zero-copy numpy.ndarray over the segment. Requires numpy."""
+        import numpy as np
+        flat = np.frombuffer(self.attach()._shm.buf[:self.nbytes], dtype=np.dtype(self.typestr or "u1"))
+        return flat.reshape(self.shape) if self.shape else flat
+
+    def tobytes(self) -> bytes:
+        return self.view.tobytes()
+
+    def detach(self) -> None:
+        """Unmap from this process; views still held elsewhere keep the mapping until released."""
+        if self._shm is not None:
+            shm, self._shm = self._shm, None
+            _close(shm)
+
+    def unlink(self) -> None:
+        """Destroy the segment's name; memory is freed once every process has detached."""
+        self.released = True
+        _destroy(self.name)
+
+    def own(self) -> None:
+        """Map the segment here and unlink it when this handle is garbage collected."""
+        self.attach()
+        weakref.finalize(self, _destroy, self.name)
+
+    def __reduce__(self):
+        return SharedBuffer, (self.name, self.nbytes, self.format, self.shape, self.typestr)
+
+    def __repr__(self) -> str:
+        return f"SharedBuffer({self.name!r}, {self.nbytes} bytes, format={self.format!r}, shape={self.shape})"
+
+    def __del__(self):
+        self.detach()
+
+
+def _destroy(name: str) -> None:
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    try:
+        shm.unlink()   # Also drops the tracker registration the attach made
+    except FileNotFoundError:   # pragma: no cover — raced with another unlink
+        pass
+    _close(shm)
+
+
+def _exportable(value: Any, min_bytes: int) -> Optional[memoryview]:
+    if isinstance(value, (str, SharedBuffer)):
+        return None
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return None
+    return view if view.nbytes >= min_bytes and view.c_contiguous else None
+
+
+def _share(view: memoryview, value: Any) -> SharedBuffer:
+    shm = shared_memory.SharedMemory(create=True, size=view.nbytes)
+    _untrack(shm)   # The orchestrator adopts it; this worker exiting must not destroy it
+    shm.buf[:view.nbytes] = view.cast("B")
+    interface = getattr(value, "__array_interface__", None)
+    handle = SharedBuffer(shm.name, view.nbytes, view.format, view.shape if view.ndim > 1 or interface else (),
+                          interface["typestr"] if interface else "")
+    _close(shm)
+    return handle
+
+
+def export_buffers(result: Any, min_bytes: int) -> Any:
+    """Copy of `result`'s dicts/lists/tuples with every large buffer moved into shared memory."""
+    view = _exportable(result, min_bytes)
+    if view is not None:
+        return _share(view, result)
+    if isinstance(result, dict):
+        return {k: export_buffers(v, min_bytes) for k, v in result.items()}
+    if isinstance(result, list):
+        return [export_buffers(v, min_bytes) for v in result]
+    if isinstance(result, tuple):
+        return tuple(export_buffers(v, min_bytes) for v in result)
+    return result
+
+
+def find_buffers(result: Any) -> list[SharedBuffer]:
+    """Every SharedBuffer handle inside a result."""
+    found, stack = [], [result]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, SharedBuffer):
+            found.append(item)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return found
+
+
+def invoke_sharing(fn: Callable, ctx: dict, min_bytes: int) -> tuple[float, object]:
+    """PROCESS worker entry point: invoke_timed() that returns large buffers as SharedBuffer handles."""
+    started = time.time()
+    result = fn(ctx)
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    return started, export_buffers(result, min_bytes)
+
+
+def discard_abandoned(future) -> None:
+    """Done-callback for a worker call whose caller gave up (timeout, hedge loser): unlink what it shared."""
+    if not future.cancelled() and future.exception() is None:
+        for buffer in find_buffers(future.result()[1]):
+            buffer.unlink()
+
+
+class SharedSegments:
+    """The shared memory segments created by one run's results, by producing node."""
+
+    def __init__(self):
+        self._buffers: dict[int, list[SharedBuffer]] = {}
+        self.created = 0
+        self.shared_bytes = 0
+
+    def adopt(self, i: int, result: Any) -> None:
+        """Take ownership of the segments behind node i's result."""
+        buffers = find_buffers(result)
+        if buffers:
+            self._buffers[i] = buffers
+            self.created += len(buffers)
+            self.shared_bytes += sum(b.nbytes for b in buffers)
+
+    def release(self, i: int) -> None:
+        """Every dependent of node i has settled: unlink its segments."""
+        for buffer in self._buffers.pop(i, ()):
+            buffer.unlink()
+
+    def keep(self, i: int) -> None:
+        """Node i's result outlives the run: hand each segment's lifetime to its handle."""
+        for buffer in self._buffers.pop(i, ()):
+            buffer.own()
+
+    def close(self) -> None:
+        """Run over: whatever was never released stays readable through its handles."""
+        for i in list(self._buffers):
+            self.keep(i)
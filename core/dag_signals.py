@@ -0,0 +1,106 @@
+"""
+RHNS DAG Signal Bus
+====================
+In-process async pub/sub that lets signals drive the DAG instead of a
+fixed full-run cycle:
+
+    bus = SignalBus()
+    server = asyncio.create_task(dag.serve(bus))
+    await bus.publish(Signal("payment_failed", {"invoice": "in_123"}))
+    # → only the nodes that consume "payment_failed", and their descendants, run
+
+Each subscription owns a bounded queue. `publish()` waits for room in
+every matching queue (backpressure: a flood of signals slows the
+publisher down instead of growing memory); `publish_nowait()` drops and
+counts instead. A subscriber takes signals in batches — everything that
+queued up while it was busy, optionally after a short coalescing
+window — so a burst triggers one run rather than one run per signal.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class Signal:
+    type: str
+    payload: dict = field(default_factory=dict)
+    source: Optional[str] = None          # Emitting node_id, or None for external publishers
+    timestamp: float = field(default_factory=time.time)
+
+
+class Subscription:
+    """A bounded queue of signals of one type, with delivery stats."""
+
+    def __init__(self, bus: "SignalBus", signal_type: str, maxsize: int):
+        self.signal_type = signal_type
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.received = 0     # Signals enqueued
+        self.dropped = 0      # Signals lost to a full queue (publish_nowait only)
+        self.batches = 0      # Batches handed out by next_batch()
+        self._bus = bus
+
+    async def next_batch(self, coalesce_s: float = 0.0) -> list[Signal]:
+        """
+        Wait for a signal, then also take everything else already queued (after
+        waiting `coalesce_s` for the rest of a burst to arrive).
+        """
+        batch = [await self.queue.get()]
+        if coalesce_s > 0:
+            await asyncio.sleep(coalesce_s)
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        self.batches += 1
+        return batch
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "type": self.signal_type, "queued": self.queue.qsize(), "received": self.received,
+            "dropped": self.dropped, "batches": self.batches,
+        }
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class SignalBus:
+    """Routes published signals to every subscription for their type."""
+
+    def __init__(self):
+        self._subscriptions: dict[str, list[Subscription]] = {}
+
+    def subscribe(self, signal_type: str, maxsize: int = 64) -> Subscription:
+        subscription = Subscription(self, signal_type, maxsize)
+        self._subscriptions.setdefault(signal_type, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscriptions.get(subscription.signal_type, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+
+    def subscribers(self, signal_type: str) -> int:
+        return len(self._subscriptions.get(signal_type, ()))
+
+    async def publish(self, signal: Signal) -> int:
+        """Deliver to every subscriber, waiting while a queue is full. Returns the number of deliveries."""
+        subscribers = list(self._subscriptions.get(signal.type, ()))
+        for subscription in subscribers:
+            await subscription.queue.put(signal)
+            subscription.received += 1
+        return len(subscribers)
+
+    def publish_nowait(self, signal: Signal) -> int:
+        """Deliver without waiting; full queues drop the signal (counted). Returns the number of deliveries."""
+        delivered = 0
+        for subscription in self._subscriptions.get(signal.type, ()):
+            try:
+                subscription.queue.put_nowait(signal)
+            except asyncio.QueueFull:
+                subscription.dropped += 1
+                continue
+            subscription.received += 1
+            delivered += 1
+        return delivered
@@ -0,0 +1,328 @@
+"""
+RHNS DAG Simulator
+===================
+Discrete-event replay of a node set in virtual time — no real sleeps, no
+API calls — so a change to max_parallelism, priorities, schedule mode or
+the node set can be sized before it touches production:
+
+    profiles = profiles_from_results(recent_results)     # or DurationHistory samples
+    report = dag.simulate(runs=2000, profiles=profiles, max_parallelism=4)
+    print(report.to_json())
+
+Each attempt draws its duration from the node's recorded samples (with
+replacement) and fails with the node's recorded per-attempt failure rate;
+an attempt that would outlive `timeout_s` is cut off there and counts as
+a timeout. The replay follows the engine's rules: retries with the same
+exponential backoff (no slot held while backing off), resource pools on
+top of the global limit, READY or LAYERED dispatch in priority-key order,
+provider policies (FIRST_SUCCESS supersedes redundant providers,
+ALL_REQUIRED, ROUND_ROBIN by run number), skips below lost capabilities,
+and a halt on a critical failure or an exceeded deadline.
+
+Not modelled: hedged attempts, the result cache, adaptive concurrency and
+scheduler overhead.
+"""
+
+import heapq
+import itertools
+import json
+import math
+import random
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from .dag_compiler import CapabilityLedger, ProviderPolicy
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .dag_compiler import CompiledDAG
+
+PENDING, RUNNING, SUCCESS, FAILED, SKIPPED, CANCELLED = range(6)
+_END, _RETRY = 0, 1
+
+
+@dataclass
+class NodeProfile:
+    durations: list[float] = field(default_factory=list)   # Seconds per attempt; empty: all of timeout_s
+    failure_rate: float = 0.0                               # Probability an attempt raises
+
+    def attempt(self, rng: random.Random, timeout_s: float) -> tuple[float, bool]:
+        """Draw one attempt: (seconds, succeeded)."""
+        seconds = rng.choice(self.durations) if self.durations else timeout_s
+        if seconds > timeout_s:
+            return timeout_s, False
+        return seconds, rng.random() >= self.failure_rate
+
+
+def profiles_from_results(results: Iterable[Any]) -> dict[str, NodeProfile]:
+    """
+    Build profiles from past OrchestrationResults: successful run_ms as duration
+    samples, and retry_count against successes as the per-attempt failure rate.
+    Nodes that didn't execute (cached, restored, reused, or without an
+    execute_fn) contribute nothing.
+    """
+    durations: dict[str, list[float]] = {}
+    attempts: dict[str, list[int]] = {}     # node_id → [failed attempts, succeeded attempts]
+    for result in results:
+        for node_id, summary in result.node_results.items():
+            if summary["status"] not in ("success", "failed") or summary["cached"] or summary["restored"]:
+                continue
+            if summary["reused"] or (summary["status"] == "success" and summary["run_ms"] is None):
+                continue
+            counts = attempts.setdefault(node_id, [0, 0])
+            counts[0] += summary["retry_count"]
+            if summary["status"] == "success":
+                counts[1] += 1
+                durations.setdefault(node_id, []).append(summary["run_ms"] / 1000)
+    return {
+        node_id: NodeProfile(durations.get(node_id, []), failed / (failed + ok) if failed + ok else 0.0)
+        for node_id, (failed, ok) in attempts.items()
+    }
+
+
+class _VirtualRun:
+    """One run of the plan in virtual time; mirrors DAGOrchestrator._dispatch."""
+
+    def __init__(self, plan: "CompiledDAG", profiles: list[NodeProfile], keys: list[tuple], limit: int,
+                 rng: random.Random, seq: int, layered: bool, pools: dict[str, int],
+                 deadline_s: Optional[float]):
+        n = len(plan)
+        self.plan, self.profiles, self.keys, self.rng = plan, profiles, keys, rng
+        self.layered, self.deadline_s = layered, deadline_s
+        self.status = [PENDING] * n
+        self.attempt = [0] * n
+        self.started = [0.0] * n
+        self.in_slot = [False] * n
+        self.released = [False] * n       # Its turn has come: queued, running or settled
+        self.token = [0] * n              # Bumped on cancel so stale events are ignored
+        self.waiting = [len(caps) for caps in plan.required_caps]
+        self.layer_left = [len(layer) for layer in plan.layers]
+        self.ledger = CapabilityLedger(plan, seq)
+        self.free, self.pool_free = limit, dict(pools)
+        self.ready: list[tuple[tuple, int]] = []
+        self.events: list = []
+        self.counter = itertools.count()
+        self.now = self.busy = 0.0
+        self.halted = ""
+
+        selected = self.ledger.selected
+        for p in {p for cap in selected for p in plan.capability_providers[cap]}:
+            provides = set(plan.nodes[p].provides)
+            if all(selected.get(cap, p) != p for cap in provides):
+                self.status[p] = SKIPPED      # Passed over by round-robin for every cap it provides
+
+    # ── Dispatch ──────────────────────────────────────────────────────────
+    def release(self, i: int) -> list[int]:
+        """A node's turn has come (providers or previous layer settled). Returns nodes that settle now."""
+        self.released[i] = True
+        if self.status[i] == PENDING:
+            required = self.plan.required_caps[i]
+            if self.plan.unprovided_caps[i] or any(cap not in self.ledger.caps for cap in required):
+                self.status[i] = SKIPPED
+            else:
+                heapq.heappush(self.ready, (self.keys[i], i))
+                return []
+        return [i]
+
+    def fill(self) -> None:
+        blocked = []
+        while self.ready and self.free > 0:
+            entry = heapq.heappop(self.ready)
+            i = entry[1]
+            if self.status[i] not in (PENDING, RUNNING):     # Superseded while queued
+                continue
+            names = self.plan.nodes[i].resources
+            if any(self.pool_free[name] <= 0 for name in names):
+                blocked.append(entry)
+                continue
+            for name in names:
+                self.pool_free[name] -= 1
+            self.free -= 1
+            self.status[i], self.in_slot[i], self.started[i] = RUNNING, True, self.now
+            node = self.plan.nodes[i]
+            seconds, ok = self.profiles[i].attempt(self.rng, node.timeout_s)
+            heapq.heappush(self.events, (self.now + seconds, next(self.counter), _END, i, self.token[i], ok))
+        for entry in blocked:
+            heapq.heappush(self.ready, entry)
+
+    def vacate(self, i: int) -> None:
+        """Give back the slot (and pool slots) of a node that was mid-attempt."""
+        if self.in_slot[i]:
+            self.in_slot[i] = False
+            self.busy += self.now - self.started[i]
+            self.free += 1
+            for name in self.plan.nodes[i].resources:
+                self.pool_free[name] += 1
+
+    # ── Settlement ────────────────────────────────────────────────────────
+    def settle(self, settled: list[int]) -> None:
+        plan = self.plan
+        while settled:
+            i = settled.pop()
+            if self.status[i] == FAILED and plan.nodes[i].critical:
+                return self.halt(f"critical:{plan.node_ids[i]}")
+            newly = self.ledger.settle(i, self.status[i] == SUCCESS)
+            for cap in newly:
+                if cap in self.ledger.caps and plan.policy(cap) is ProviderPolicy.FIRST_SUCCESS:
+                    settled += self.supersede(cap)
+            settled += self.unblock(i, newly)
+
+    def unblock(self, i: int, newly: list[str]) -> list[int]:
+        """Release what node i settling unblocks (next layer, or consumers of `newly`); return what settles now."""
+        plan, settled = self.plan, []
+        if self.layered:
+            layer = plan.layer_of[i]
+            self.layer_left[layer] -= 1
+            if self.layer_left[layer] == 0 and layer + 1 < len(plan.layers):
+                for j in plan.layers[layer + 1]:
+                    settled += self.release(j)
+            return settled
+        for cap in newly:
+            for consumer in plan.capability_consumers.get(cap, ()):
+                self.waiting[consumer] -= 1
+                if self.waiting[consumer] == 0:
+                    settled += self.release(consumer)
+        return settled
+
+    def supersede(self, cap: str) -> list[int]:
+        """FIRST_SUCCESS: skip redundant providers. Returns those already released, which settle now."""
+        superseded = []
+        for p in self.plan.capability_providers[cap]:
+            if self.status[p] not in (PENDING, RUNNING):
+                continue
+            if not all(c in self.ledger.caps for c in self.plan.nodes[p].provides):
+                continue
+            self.vacate(p)
+            self.token[p] += 1
+            self.status[p] = SKIPPED
+            if self.released[p]:
+                superseded.append(p)
+        return superseded
+
+    def halt(self, reason: str) -> None:
+        self.halted = reason
+        for i, status in enumerate(self.status):
+            if status == RUNNING:
+                self.vacate(i)
+                self.status[i] = CANCELLED
+            elif status == PENDING:
+                self.status[i] = SKIPPED
+
+    # ── Event loop ────────────────────────────────────────────────────────
+    def run(self) -> "_VirtualRun":
+        plan = self.plan
+        if self.layered:
+            first = plan.layers[0] if plan.layers else []
+        else:
+            first = [i for i, count in enumerate(self.waiting) if count == 0]
+        settled = [j for i in first for j in self.release(i)]
+        self.settle(settled)
+        self.fill()
+        while self.events and not self.halted:
+            t, _, kind, i, token, ok = heapq.heappop(self.events)
+            if token != self.token[i] or self.status[i] != RUNNING:
+                continue
+            if self.deadline_s is not None and t > self.deadline_s:
+                self.now = self.deadline_s
+                self.halt("deadline")
+                break
+            self.now = t
+            if kind == _RETRY:
+                heapq.heappush(self.ready, (self.keys[i], i))
+            else:
+                self.vacate(i)
+                if ok:
+                    self.status[i] = SUCCESS
+                    self.settle([i])
+                elif self.attempt[i] < plan.nodes[i].max_retries:
+                    backoff = 2 ** self.attempt[i]
+                    self.attempt[i] += 1
+                    heapq.heappush(self.events, (t + backoff, next(self.counter), _RETRY, i, token, False))
+                else:
+                    self.status[i] = FAILED
+                    self.settle([i])
+            if not self.halted:
+                self.fill()
+        return self
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank q-quantile of an already sorted list."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@dataclass
+class SimulationReport:
+    runs: int
+    nodes: int
+    max_parallelism: int
+    schedule: str
+    priority_policy: str
+    makespan_s: dict            # mean, p50, p90, p95, p99, max
+    utilization: float          # Mean busy fraction of max_parallelism slots over each run
+    skip_rate: float            # Skipped nodes / (runs × nodes)
+    failure_rate: float         # Failed nodes / (runs × nodes)
+    halt_rate: float            # Runs halted by a critical failure or the deadline
+    node_skip_rates: dict = field(default_factory=dict)      # Only nodes that were ever skipped
+    node_failure_rates: dict = field(default_factory=dict)   # Only nodes that ever failed
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+
+def simulate(
+    plan: "CompiledDAG",
+    profiles: list[NodeProfile],
+    keys: list[tuple],
+    max_parallelism: int,
+    runs: int = 1000,
+    layered: bool = False,
+    resource_limits: Optional[dict[str, int]] = None,
+    deadline_s: Optional[float] = None,
+    seed: int = 0,
+    first_seq: int = 0,
+    schedule: str = "",
+    priority_policy: str = "",
+) -> SimulationReport:
+    """Replay `plan` `runs` times with one profile and one priority key per node index."""
+    if not plan.acyclic:
+        raise ValueError(plan.error)
+    rng = random.Random(seed)
+    n = len(plan)
+    makespans, utilization = [], 0.0
+    skipped, failed = [0] * n, [0] * n
+    halts = 0
+    for r in range(runs):
+        run = _VirtualRun(plan, profiles, keys, max_parallelism, rng, first_seq + r,
+                          layered, resource_limits or {}, deadline_s).run()
+        makespans.append(run.now)
+        if run.now > 0:
+            utilization += run.busy / (max_parallelism * run.now)
+        halts += bool(run.halted)
+        for i, status in enumerate(run.status):
+            skipped[i] += status == SKIPPED
+            failed[i] += status == FAILED
+
+    ordered = sorted(makespans)
+    cells = max(1, runs * n)
+    return SimulationReport(
+        runs=runs,
+        nodes=n,
+        max_parallelism=max_parallelism,
+        schedule=schedule,
+        priority_policy=priority_policy,
+        makespan_s={
+            "mean": round(sum(ordered) / len(ordered), 6) if ordered else 0.0,
+            **{f"p{round(q * 100)}": round(_percentile(ordered, q), 6) if ordered else 0.0
+               for q in (0.5, 0.9, 0.95, 0.99)},
+            "max": round(ordered[-1], 6) if ordered else 0.0,
+        },
+        utilization=round(utilization / runs, 4) if runs else 0.0,
+        skip_rate=round(sum(skipped) / cells, 4),
+        failure_rate=round(sum(failed) / cells, 4),
+        halt_rate=round(halts / runs, 4) if runs else 0.0,
+        node_skip_rates={plan.node_ids[i]: round(c / runs, 4) for i, c in enumerate(skipped) if c},
+        node_failure_rates={plan.node_ids[i]: round(c / runs, 4) for i, c in enumerate(failed) if c},
+    )
@@ -0,0 +1,85 @@
+"""
+RHNS DAG Run Streaming
+=======================
+Node lifecycle events emitted while a run is in progress, and the
+async-iterator wrapper behind DAGOrchestrator.run_stream():
+
+    stream = dag.run_stream(ctx)
+    async for event in stream:
+        if event.kind is EventKind.SUCCEEDED and event.node_id == "defender_os":
+            ...                      # react before the rest of the DAG finishes
+    result = stream.result           # OrchestrationResult, once iteration ends
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional
+
+
+class EventKind(Enum):
+    STARTED = "started"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class NodeEvent:
+    """One node lifecycle transition within a run."""
+    kind: EventKind
+    run_id: str
+    node_id: str
+    timestamp: float = field(default_factory=time.time)
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[dict] = None    # Set on SUCCEEDED
+
+
+_DONE = object()
+
+
+class RunStream:
+    """
+    Async iterator over a run's NodeEvents.
+
+    The run starts on first iteration (or on wait()) and keeps going even if the
+    consumer stops iterating early; `result` is set once it has finished.
+    """
+
+    def __init__(self, start: Callable[[Callable[[NodeEvent], None]], Awaitable[Any]]):
+        self._start = start
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.result = None
+
+    def _ensure_started(self) -> asyncio.Task:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._drive())
+        return self._task
+
+    async def _drive(self):
+        try:
+            self.result = await self._start(self._queue.put_nowait)
+            return self.result
+        finally:
+            self._queue.put_nowait(_DONE)
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        self._ensure_started()
+        while True:
+            event = await self._queue.get()
+            if event is _DONE:
+                break
+            yield event
+        await self._task  # surface errors from the run itself
+
+    async def wait(self):
+        """Wait for the run to finish (without consuming events) and return its result."""
+        return await self._ensure_started()
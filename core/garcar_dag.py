@@ -14,15 +14,22 @@ Node categories (matching the 176-repo ecosystem):
 import asyncio
 import logging
 import os
+import sys
 import requests
+from .dag_cache import ResultCache
+from .dag_executors import ExecutionMode
 from .dag_orchestrator import DAGOrchestrator, AgentNode
+from .dag_scheduling import AdaptiveConcurrency
 
 logger = logging.getLogger(__name__)
 
 
 # ─── Node execution functions ──────────────────────────────────────────────
+# Functions that make blocking HTTP calls are plain `def` and registered with
+# ExecutionMode.THREAD so they run on the orchestrator's thread pool instead of
+# stalling the event loop for up to their request timeout.
 
-async def run_defender_os(ctx: dict) -> dict:
+def run_defender_os(ctx: dict) -> dict:
     """Trigger Defender OS health check via GitHub Actions API."""
     token = os.getenv("GH_PAT", "")
     if not token:
@@ -39,7 +46,7 @@ async def run_defender_os(ctx: dict) -> dict:
         return {"status": "error", "error": str(e)}
 
 
-async def run_revenue_intelligence(ctx: dict) -> dict:
+def run_revenue_intelligence(ctx: dict) -> dict:
     """Trigger RHNS Revenue Intelligence cycle."""
     token = os.getenv("GH_PAT", "")
     if not token:
@@ -73,7 +80,7 @@ async def run_market_intelligence(ctx: dict) -> dict:
     return {"status": "ok", "threats_detected": 0, "opportunities": 0}
 
 
-async def run_slack_broadcast(ctx: dict) -> dict:
+def run_slack_broadcast(ctx: dict) -> dict:
     """Post orchestration summary to Slack."""
     webhook = os.getenv("DEFENDER_SLACK_WEBHOOK", "")
     if not webhook:
@@ -95,7 +102,12 @@ async def run_slack_broadcast(ctx: dict) -> dict:
 def build_garcar_dag() -> DAGOrchestrator:
     """Build and return the fully-wired Garcar Enterprise DAG."""
 
-    dag = DAGOrchestrator(max_parallelism=8)
+    dag = DAGOrchestrator(
+        max_parallelism=8,                   # Starting point; AIMD tunes it per run within the bounds
+        adaptive=AdaptiveConcurrency(min_limit=2, max_limit=16),
+        cache=ResultCache(max_entries=256),
+        resource_limits={"github_api": 4},   # workflow_dispatch calls share one rate limit
+    )
 
     # ── LAYER 0: Security & Infrastructure (no dependencies) ──────────────
     dag.register(AgentNode(
@@ -109,6 +121,8 @@ def build_garcar_dag() -> DAGOrchestrator:
         priority=1,
         critical=True,
         timeout_s=15,
+        execution=ExecutionMode.THREAD,
+        resources=["github_api"],
         execute_fn=run_defender_os,
     ))
 
@@ -122,6 +136,7 @@ def build_garcar_dag() -> DAGOrchestrator:
         emits=["market_signals"],
         priority=2,
         timeout_s=20,
+        cache_ttl_s=900,
         execute_fn=run_market_intelligence,
     ))
 
@@ -132,10 +147,12 @@ def build_garcar_dag() -> DAGOrchestrator:
         description="Hourly revenue cycle: Stripe + HubSpot signal processing",
         provides=["revenue_signals", "payment_state"],
         requires=["defense_state"],
-        consumes=["market_signals"],
+        consumes=["market_signals", "payment_failed"],   # payment_failed re-runs revenue → harmony → slack
         emits=["revenue_signals"],
         priority=1,
         timeout_s=30,
+        execution=ExecutionMode.THREAD,
+        resources=["github_api"],
         execute_fn=run_revenue_intelligence,
     ))
 
@@ -164,6 +181,7 @@ def build_garcar_dag() -> DAGOrchestrator:
         emits=[],
         priority=3,
         timeout_s=8,
+        execution=ExecutionMode.THREAD,
         execute_fn=run_slack_broadcast,
     ))
 
@@ -174,6 +192,9 @@ if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(asctime)s — %(message)s")
 
     dag = build_garcar_dag()
+    if "--plan" in sys.argv:
+        print(dag.analyze().to_json())
+        sys.exit(0)
     print(dag.visualize())
 
     result = asyncio.run(dag.run())
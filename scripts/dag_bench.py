@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+RHNS DAG Orchestrator Benchmarks
+================================
+Synthetic workloads for measuring DAGOrchestrator scheduling behaviour.
+
+Subcommands:
+    policies   Compare STATIC vs CRITICAL_PATH slot hand-off on a contended DAG
+    cores      Scale a CPU-bound node set across process-pool sizes
+    suite      Scheduler overhead on random/layered/wide/deep graphs of 100..100k nodes:
+               compile time, per-node overhead, hot-path phase timings, memory per
+               node, and makespan vs the critical-path ideal
+    memory     tracemalloc profile of declarations, plan, run and result on one large graph
+    halt       Time-to-halt and node work wasted after a critical node fails mid-run
+    adaptive   Fixed vs AIMD concurrency against a simulated upstream, healthy and saturated
+    timeouts   Per-attempt cost of asyncio.wait_for vs one DeadlineHeap timer, alone and in a run
+
+Usage:
+    python scripts/dag_bench.py policies --nodes 60 --parallelism 4 --runs 3
+    python scripts/dag_bench.py cores --nodes 16 --work 2000000
+    python scripts/dag_bench.py suite --sizes 100,1000,10000 --output bench_output.txt
+    python scripts/dag_bench.py memory --nodes 100000
+    python scripts/dag_bench.py halt --nodes 60 --parallelism 8
+    python scripts/dag_bench.py adaptive --nodes 300 --unit-ms 10
+    python scripts/dag_bench.py timeouts --nodes 10000 --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dag_executors import ExecutionMode  # noqa: E402
+from core.dag_orchestrator import AgentNode, DAGOrchestrator, ScheduleMode  # noqa: E402
+from core.dag_scheduling import (  # noqa: E402
+    AdaptiveConcurrency, DeadlineHeap, DurationHistory, PriorityPolicy, upward_ranks,
+)
+
+
+# ── Workloads ──────────────────────────────────────────────────────────────────
+
+async def noop(ctx: dict) -> None:
+    return None
+
+
+def sleep_fn(seconds: float):
+    async def fn(ctx: dict) -> dict:
+        await asyncio.sleep(seconds)
+        return {"status": "ok"}
+    return fn
+
+
+def cpu_burn(ctx: dict) -> dict:
+    """CPU-bound synthetic node: module-level so PROCESS workers can unpickle it."""
+    total = 0
+    for i in range(ctx["work"]):
+        total += i * i
+    return {"checksum": total % 1_000_003}
+
+
+def contended_nodes(n_nodes: int, seed: int, unit_s: float) -> list[AgentNode]:
+    """
+    A few long chains hidden behind misleading static priorities, plus a
+    crowd of short high-priority leaves competing for the same slots.
+    """
+    rng = random.Random(seed)
+    nodes: list[AgentNode] = []
+    n_chains = max(1, n_nodes // 30)
+    chain_len = 8
+    for c in range(n_chains):
+        for i in range(chain_len):
+            nodes.append(AgentNode(
+                node_id=f"chain{c}_{i}", name=f"chain{c}_{i}", description="",
+                provides=[f"chain{c}_{i}"],
+                requires=[f"chain{c}_{i - 1}"] if i else [],
+                priority=4, timeout_s=30.0, max_retries=0,
+                execute_fn=sleep_fn(unit_s * rng.uniform(1.0, 2.0)),
+            ))
+    for i in range(max(0, n_nodes - len(nodes))):
+        nodes.append(AgentNode(
+            node_id=f"leaf_{i}", name=f"leaf_{i}", description="",
+            priority=1, timeout_s=30.0, max_retries=0,
+            execute_fn=sleep_fn(unit_s * rng.uniform(0.5, 1.0)),
+        ))
+    return nodes
+
+
+# ── Graph shapes ───────────────────────────────────────────────────────────────
+# Each generator returns, per node index, the indices it requires. Node i
+# provides capability "c{i}", so requirements always point at lower indices.
+
+def shape_random(n: int, rng: random.Random) -> list[list[int]]:
+    return [rng.sample(range(i), min(i, rng.randint(0, 3))) for i in range(n)]
+
+
+def shape_layered(n: int, rng: random.Random) -> list[list[int]]:
+    width = max(1, int(n ** 0.5))
+    reqs = []
+    for i in range(n):
+        layer_start = (i // width) * width
+        prev = range(max(0, layer_start - width), layer_start)
+        reqs.append(rng.sample(prev, min(len(prev), rng.randint(1, 3))) if prev else [])
+    return reqs
+
+
+def shape_wide(n: int, rng: random.Random) -> list[list[int]]:
+    """One root fanning out to n-2 leaves that all feed a single sink."""
+    if n < 3:
+        return [[] for _ in range(n)]
+    return [[]] + [[0] for _ in range(n - 2)] + [list(range(1, n - 1))]
+
+
+def shape_deep(n: int, rng: random.Random) -> list[list[int]]:
+    return [[i - 1] if i else [] for i in range(n)]
+
+
+SHAPES = {
+    "random": shape_random,
+    "layered": shape_layered,
+    "wide": shape_wide,
+    "deep": shape_deep,
+}
+
+
+def build_dag(reqs: list[list[int]], fns: list, **kwargs) -> DAGOrchestrator:
+    dag = DAGOrchestrator(**kwargs)
+    for i, (req, fn) in enumerate(zip(reqs, fns)):
+        dag.register(AgentNode(
+            node_id=f"n{i}", name=f"n{i}", description="",
+            provides=[f"c{i}"], requires=[f"c{r}" for r in req],
+            timeout_s=60.0, max_retries=0, execute_fn=fn,
+        ))
+    return dag
+
+
+class PhaseTimer:
+    """Accumulates wall time spent in selected DAGOrchestrator methods on one instance."""
+
+    def __init__(self, dag: DAGOrchestrator, names: list[str]):
+        self.totals = {name: 0.0 for name in names}
+        for name in names:
+            if hasattr(dag, name):
+                setattr(dag, name, self._wrap(name, getattr(dag, name)))
+
+    def _wrap(self, name, method):
+        if asyncio.iscoroutinefunction(method):
+            async def timed_async(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self.totals[name] += time.perf_counter() - t0
+            return timed_async
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - t0
+        return timed
+
+    def report_ms(self) -> dict:
+        return {name: round(total * 1000, 3) for name, total in self.totals.items()}
+
+
+# Hot-path methods whose regressions the suite should surface
+HOT_PATHS = ["compile", "_filter_layer", "_settle", "_skip_descendants", "_update_context", "_compile_result"]
+
+
+# ── Benchmarks ─────────────────────────────────────────────────────────────────
+
+async def bench_policies(args) -> dict:
+    nodes = contended_nodes(args.nodes, args.seed, args.unit_ms / 1000)
+    history = DurationHistory()
+
+    # Warm-up run so CRITICAL_PATH ranks use observed durations, not timeout_s.
+    warm = DAGOrchestrator(max_parallelism=args.parallelism, schedule=ScheduleMode.READY, history=history)
+    for node in nodes:
+        warm.register(node)
+    await warm.run()
+
+    report: dict = {
+        "benchmark": "policies",
+        "nodes": len(nodes),
+        "max_parallelism": args.parallelism,
+        "runs": args.runs,
+        "policies": {},
+    }
+    for policy in PriorityPolicy:
+        dag = DAGOrchestrator(
+            max_parallelism=args.parallelism, schedule=ScheduleMode.READY,
+            priority_policy=policy, history=history,
+        )
+        for node in nodes:
+            dag.register(node)
+        makespans = []
+        for _ in range(args.runs):
+            result = await dag.run()
+            makespans.append(round(result.total_duration_ms, 1))
+        report["policies"][policy.value] = {
+            "makespan_ms": makespans,
+            "mean_makespan_ms": round(sum(makespans) / len(makespans), 1),
+        }
+
+    static = report["policies"][PriorityPolicy.STATIC.value]["mean_makespan_ms"]
+    critical = report["policies"][PriorityPolicy.CRITICAL_PATH.value]["mean_makespan_ms"]
+    report["critical_path_speedup"] = round(static / critical, 3) if critical else None
+    return report
+
+
+async def bench_cores(args) -> dict:
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    report: dict = {
+        "benchmark": "cores",
+        "nodes": args.nodes,
+        "work_per_node": args.work,
+        "cpu_count": cpus,
+        "modes": {},
+    }
+
+    def build(mode: ExecutionMode, workers: int) -> DAGOrchestrator:
+        dag = DAGOrchestrator(max_parallelism=args.nodes, schedule=ScheduleMode.READY, process_workers=workers)
+        for i in range(args.nodes):
+            dag.register(AgentNode(
+                node_id=f"cpu_{i}", name=f"cpu_{i}", description="",
+                timeout_s=600.0, max_retries=0, execution=mode, execute_fn=cpu_burn,
+            ))
+        return dag
+
+    async def makespan_ms(dag: DAGOrchestrator) -> float:
+        result = await dag.run({"work": args.work})
+        assert result.succeeded == args.nodes, result.node_results
+        return round(result.total_duration_ms, 1)
+
+    inline = build(ExecutionMode.THREAD, 1)
+    report["modes"]["thread_1_worker"] = await makespan_ms(inline)
+    inline.close()
+
+    for workers in worker_counts:
+        dag = build(ExecutionMode.PROCESS, workers)
+        await makespan_ms(dag)  # warm the pool so worker start-up isn't measured
+        report["modes"][f"process_{workers}_workers"] = await makespan_ms(dag)
+        dag.close()
+
+    baseline = report["modes"]["thread_1_worker"]
+    report["speedup_vs_single_thread"] = {
+        mode: round(baseline / ms, 2) for mode, ms in report["modes"].items() if ms
+    }
+    return report
+
+
+async def suite_case(shape: str, n: int, args) -> dict:
+    rng = random.Random(args.seed)
+    reqs = SHAPES[shape](n, rng)
+    record: dict = {"shape": shape, "nodes": n, "edges": sum(len(r) for r in reqs)}
+    big = max(n, 1)
+
+    # Memory: declarations + compiled plan, then the peak during a no-op run
+    tracemalloc.start()
+    dag = build_dag(reqs, [noop] * n, max_parallelism=big, schedule=ScheduleMode.READY)
+    dag.compile()
+    declared, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await dag.run()
+    _, run_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    record["declared_bytes_per_node"] = round(declared / n, 1)
+    record["run_peak_bytes_per_node"] = round(max(0, run_peak - declared) / n, 1)
+
+    # Compile time on a fresh orchestrator
+    dag = build_dag(reqs, [noop] * n, max_parallelism=big, schedule=ScheduleMode.READY)
+    t0 = time.perf_counter()
+    dag.compile()
+    record["compile_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+
+    # Scheduling overhead: no-op nodes, so the whole run is orchestrator cost
+    for schedule in ScheduleMode:
+        dag.schedule = schedule
+        timer = PhaseTimer(dag, HOT_PATHS)
+        t0 = time.perf_counter()
+        result = await dag.run()
+        elapsed = time.perf_counter() - t0
+        assert result.succeeded == n, f"{shape}/{n}: {result.failed} failed, {result.skipped} skipped"
+        record[f"{schedule.value}_run_ms"] = round(elapsed * 1000, 3)
+        record[f"{schedule.value}_overhead_us_per_node"] = round(elapsed * 1e6 / n, 2)
+        record[f"{schedule.value}_phases_ms"] = timer.report_ms()
+
+    # Makespan vs ideal: sleep nodes, unbounded parallelism, READY scheduling
+    if n <= args.sleep_max_nodes:
+        durations = [rng.uniform(1.0, 5.0) * args.sleep_ms / 1000 for _ in range(n)]
+        dag = build_dag(reqs, [sleep_fn(d) for d in durations],
+                        max_parallelism=big, schedule=ScheduleMode.READY)
+        plan = dag.compile()
+        ideal = max(upward_ranks(plan.order, plan.dependents, durations), default=0.0)
+        result = await dag.run()
+        record["ideal_makespan_ms"] = round(ideal * 1000, 1)
+        record["makespan_ms"] = round(result.total_duration_ms, 1)
+        record["makespan_vs_ideal"] = round(result.total_duration_ms / (ideal * 1000), 3) if ideal else None
+    return record
+
+
+async def bench_suite(args) -> dict:
+    sizes = [int(x) for x in args.sizes.split(",")]
+    shapes = args.shapes.split(",")
+    report: dict = {
+        "benchmark": "suite",
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "results": [],
+    }
+    for shape in shapes:
+        for n in sizes:
+            record = await suite_case(shape, n, args)
+            print(
+                f"{shape:>8} n={n:<7} compile={record['compile_ms']:.1f}ms "
+                f"ready={record['ready_overhead_us_per_node']:.1f}us/node "
+                f"layered={record['layered_overhead_us_per_node']:.1f}us/node",
+                file=sys.stderr,
+            )
+            report["results"].append(record)
+    return report
+
+
+async def bench_memory(args) -> dict:
+    n = args.nodes
+    reqs = shape_random(n, random.Random(args.seed))
+    report: dict = {"benchmark": "memory", "shape": "random", "nodes": n}
+
+    def mib(nbytes: int) -> float:
+        return round(nbytes / 2 ** 20, 2)
+
+    tracemalloc.start()
+    dag = build_dag(reqs, [noop] * n, max_parallelism=n, schedule=ScheduleMode.READY)
+    declared, _ = tracemalloc.get_traced_memory()
+    dag.compile()
+    planned, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    result = await dag.run()
+    run_s = time.perf_counter() - t0
+    retained, peak = tracemalloc.get_traced_memory()
+
+    t0 = time.perf_counter()
+    statuses = [result.node_results[nid]["status"] for nid in dag.nodes]
+    view_s = time.perf_counter() - t0
+    tracemalloc.stop()
+    assert statuses.count("success") == n
+
+    report.update({
+        "declarations_mib": mib(declared),
+        "declarations_bytes_per_node": round(declared / n, 1),
+        "plan_mib": mib(planned - declared),
+        "run_peak_mib": mib(peak - planned),
+        "retained_after_run_mib": mib(retained - planned),
+        "run_bytes_per_node": round((retained - planned) / n, 1),
+        "run_s_traced": round(run_s, 3),
+        "read_all_node_results_s_traced": round(view_s, 3),
+    })
+    return report
+
+
+def halt_nodes(n: int, unit_s: float, busy: list) -> list[AgentNode]:
+    """
+    A critical node that fails after one unit, next to n siblings that each
+    need 10 units and feed one downstream consumer. `busy` collects the
+    seconds every execute_fn actually ran, cancelled or not.
+    """
+    def tracked(seconds: float, fail: bool = False):
+        async def fn(ctx: dict) -> dict:
+            t0 = time.perf_counter()
+            try:
+                await asyncio.sleep(seconds)
+                if fail:
+                    raise RuntimeError("critical dependency down")
+                return {"status": "ok"}
+            finally:
+                busy.append(time.perf_counter() - t0)
+        return fn
+
+    nodes = [AgentNode(node_id="critical", name="critical", description="", priority=1,
+                       critical=True, max_retries=0, execute_fn=tracked(unit_s, fail=True))]
+    for i in range(n):
+        nodes.append(AgentNode(node_id=f"s{i}", name=f"s{i}", description="", provides=[f"c{i}"],
+                               max_retries=0, execute_fn=tracked(unit_s * 10)))
+    nodes.append(AgentNode(node_id="sink", name="sink", description="",
+                           requires=[f"c{i}" for i in range(n)], execute_fn=tracked(unit_s)))
+    return nodes
+
+
+async def bench_halt(args) -> dict:
+    unit_s = args.unit_ms / 1000
+    report: dict = {
+        "benchmark": "halt", "nodes": args.nodes, "parallelism": args.parallelism,
+        "unit_ms": args.unit_ms, "runs": args.runs, "results": {},
+    }
+    for schedule in (ScheduleMode.LAYERED, ScheduleMode.READY):
+        halt_ms, busy_s = [], []
+        for _ in range(args.runs):
+            busy: list = []
+            dag = DAGOrchestrator(max_parallelism=args.parallelism, schedule=schedule)
+            for node in halt_nodes(args.nodes, unit_s, busy):
+                dag.register(node)
+            result = await dag.run()
+            assert result.halted_early, result.halt_reason
+            halt_ms.append(result.total_duration_ms)
+            busy_s.append(sum(busy))
+        report["results"][schedule.value] = {
+            "time_to_halt_ms": round(sum(halt_ms) / len(halt_ms), 1),
+            "node_busy_s": round(sum(busy_s) / len(busy_s), 3),
+        }
+    return report
+
+
+class Upstream:
+    """
+    Simulated shared service: requests beyond `capacity` in flight slow every
+    new request down quadratically, the way a saturated API or model server does.
+    """
+
+    def __init__(self, capacity: int, base_s: float):
+        self.capacity = capacity
+        self.base_s = base_s
+        self.inflight = 0
+
+    def call_fn(self):
+        async def fn(ctx: dict) -> dict:
+            self.inflight += 1
+            try:
+                await asyncio.sleep(self.base_s * max(1.0, self.inflight / self.capacity) ** 2)
+                return {"status": "ok"}
+            finally:
+                self.inflight -= 1
+        return fn
+
+
+async def bench_adaptive(args) -> dict:
+    base_s = args.unit_ms / 1000
+    configs = {
+        "fixed_4": dict(max_parallelism=4),
+        "fixed_32": dict(max_parallelism=32),
+        "adaptive_from_4": dict(max_parallelism=4, adaptive=AdaptiveConcurrency(min_limit=1, max_limit=32)),
+        "adaptive_from_32": dict(max_parallelism=32, adaptive=AdaptiveConcurrency(min_limit=1, max_limit=32)),
+    }
+    report: dict = {"benchmark": "adaptive", "nodes": args.nodes, "unit_ms": args.unit_ms, "results": {}}
+    for scenario, capacity in (("healthy", 64), ("saturated", 6)):
+        rows = report["results"][scenario] = {}
+        for name, kwargs in configs.items():
+            upstream = Upstream(capacity, base_s)
+            dag = DAGOrchestrator(schedule=ScheduleMode.READY, **kwargs)
+            for i in range(args.nodes):
+                dag.register(AgentNode(node_id=f"n{i}", name=f"n{i}", description="", max_retries=0,
+                                       timeout_s=base_s * 4, execute_fn=upstream.call_fn()))
+            result = await dag.run()
+            rows[name] = {
+                "makespan_ms": round(result.total_duration_ms, 1),
+                "throughput_per_s": round(result.succeeded / (result.total_duration_ms / 1000), 1),
+                "timeouts": result.failed,
+                "final_limit": result.parallelism_limit,
+                "adjustments": max(0, len(result.parallelism_trace) - 1),
+            }
+            print(f"{scenario:>9} {name:<17} {rows[name]}", file=sys.stderr)
+    return report
+
+
+async def guarded_attempts(n: int, guard: str) -> float:
+    """Seconds for n concurrent lightweight attempts, each under the given timeout guard."""
+    heap = DeadlineHeap()
+
+    async def attempt() -> None:
+        if guard == "wait_for":
+            await asyncio.wait_for(asyncio.sleep(0), timeout=30.0)
+        elif guard == "deadline_heap":
+            with heap.after(30.0):
+                await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(attempt() for _ in range(n)))
+    return time.perf_counter() - t0
+
+
+async def bench_timeouts(args) -> dict:
+    report: dict = {"benchmark": "timeouts", "nodes": args.nodes, "runs": args.runs, "results": {}}
+    guards = ("none", "wait_for", "deadline_heap")
+    best = {guard: min([await guarded_attempts(args.nodes, guard) for _ in range(args.runs)]) for guard in guards}
+    per_attempt = {guard: best[guard] / args.nodes * 1e6 for guard in guards}
+    report["results"]["attempts"] = {
+        guard: {
+            "us_per_attempt": round(per_attempt[guard], 2),
+            "timeout_overhead_us": round(per_attempt[guard] - per_attempt["none"], 2),
+        }
+        for guard in guards
+    }
+
+    # The same guard inside the engine: a wide DAG of no-op nodes, all in flight at once
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, max_parallelism=args.nodes)
+    for i in range(args.nodes):
+        dag.register(AgentNode(node_id=f"n{i}", name="", description="", max_retries=0, execute_fn=noop))
+    dag.compile()
+    runs = []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        result = await dag.run()
+        runs.append(time.perf_counter() - t0)
+    assert result.succeeded == args.nodes
+    report["results"]["engine"] = {"us_per_node": round(min(runs) / args.nodes * 1e6, 2)}
+    return report
+
+
+BENCHMARKS = {
+    "policies": bench_policies,
+    "cores": bench_cores,
+    "suite": bench_suite,
+    "memory": bench_memory,
+    "halt": bench_halt,
+    "adaptive": bench_adaptive,
+    "timeouts": bench_timeouts,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RHNS DAG orchestrator")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--nodes", type=int, default=60)
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--unit-ms", type=float, default=20.0, help="Base sleep per node")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--work", type=int, default=2_000_000, help="Loop iterations per CPU node")
+    parser.add_argument("--sizes", default="100,1000", help="Comma-separated node counts (suite)")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="Comma-separated graph shapes (suite)")
+    parser.add_argument("--sleep-max-nodes", type=int, default=2000,
+                        help="Largest graph that also gets a sleep-based makespan run (suite)")
+    parser.add_argument("--sleep-ms", type=float, default=1.0,
+                        help="Base sleep for the makespan run; nodes sleep 1-5x this (suite)")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    started = time.time()
+    report = asyncio.run(BENCHMARKS[args.benchmark](args))
+    report["wall_s"] = round(time.time() - started, 3)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Tests for the RHNS DAG result cache
+====================================
+Covers key derivation, TTL expiry, LRU eviction, disk persistence,
+invalidation, cache hits/misses through DAGOrchestrator, and fingerprint-
+based incremental runs.
+"""
+
+import functools
+import time
+
+import pytest
+
+from core.dag_cache import ResultCache, cache_key, code_identity
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, MapNode, ScheduleMode
+
+
+def counting_node(node_id, calls: list, provides=None, requires=None, ttl=60.0, version="", value=None):
+    async def fn(ctx: dict) -> dict:
+        calls.append(node_id)
+        return {"value": value if value is not None else len(calls)}
+    return AgentNode(
+        node_id=node_id, name=node_id, description="",
+        provides=provides or [], requires=requires or [],
+        max_retries=0, cache_ttl_s=ttl, version=version, execute_fn=fn,
+    )
+
+
+# ─── ResultCache ──────────────────────────────────────────────────────────
+
+def test_cache_key_depends_on_identity_version_and_inputs():
+    base = cache_key("a", "v1", {"result_x": {"n": 1}})
+    assert base == cache_key("a", "v1", {"result_x": {"n": 1}})
+    assert base != cache_key("b", "v1", {"result_x": {"n": 1}})
+    assert base != cache_key("a", "v2", {"result_x": {"n": 1}})
+    assert base != cache_key("a", "v1", {"result_x": {"n": 2}})
+
+
+def test_cache_ttl_expiry():
+    cache = ResultCache()
+    cache.put("k", "a", {"v": 1}, ttl_s=0.01)
+    assert cache.get("k") == {"v": 1}
+    time.sleep(0.02)
+    assert cache.get("k") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("k1", "a", {}, 60)
+    cache.put("k2", "b", {}, 60)
+    cache.get("k1")
+    cache.put("k3", "c", {}, 60)
+    assert cache.get("k2") is None
+    assert cache.get("k1") == {}
+    assert cache.get("k3") == {}
+
+
+def test_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "cache")
+    ResultCache(path=path).put("k", "a", {"v": 1}, 60)
+    ResultCache(path=path).put("bad", "a", {"v": object()}, 60)  # not JSON: memory-only
+    reloaded = ResultCache(path=path)
+    assert reloaded.get("k") == {"v": 1}
+    assert reloaded.get("bad") is None
+
+    (tmp_path / "cache" / "corrupt.json").write_text("{not json")
+    assert reloaded.get("corrupt") is None
+
+
+def test_cache_invalidate_by_node(tmp_path):
+    cache = ResultCache(path=str(tmp_path))
+    cache.put("k1", "a", {}, 60)
+    cache.put("k2", "b", {}, 60)
+    assert cache.invalidate("a") == 1
+    assert cache.get("k1") is None
+    assert cache.get("k2") == {}
+
+    cache.put("k3", "b", {}, 60)
+    fresh = ResultCache(path=str(tmp_path))  # entries only on disk
+    assert fresh.invalidate() == 2
+    assert fresh.get("k2") is None
+
+
+# ─── Orchestrator integration ─────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_execution_but_feeds_downstream():
+    calls = []
+    seen = []
+
+    async def reader(ctx):
+        seen.append(ctx["result_src"]["value"])
+        return {"status": "ok"}
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, cache=ResultCache())
+    dag.register(counting_node("src", calls, provides=["cap_s"], value=42))
+    dag.register(AgentNode(node_id="reader", name="reader", description="",
+                           requires=["cap_s"], execute_fn=reader))
+
+    first = await dag.run()
+    second = await dag.run()
+    assert calls == ["src"]
+    assert seen == [42, 42]
+    assert first.cache_hits == 0
+    assert second.cache_hits == 1
+    assert second.node_results["src"]["cached"] is True
+    assert second.succeeded == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_misses_when_upstream_result_or_version_changes():
+    calls = []
+    dag = DAGOrchestrator(cache=ResultCache())
+    dag.register(counting_node("src", calls, provides=["cap_s"], ttl=None))   # not cached: value changes
+    dag.register(counting_node("dep", calls, requires=["cap_s"]))
+
+    await dag.run()
+    await dag.run()
+    assert calls.count("dep") == 2
+
+    dag.nodes["src"].execute_fn = counting_node("src", [], value=7).execute_fn
+    await dag.run()
+    await dag.run()
+    assert calls.count("dep") == 3
+
+    dag.nodes["dep"].version = "v2"
+    await dag.run()
+    assert calls.count("dep") == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_key_covers_the_seed_context():
+    calls = []
+
+    async def greet(ctx):
+        calls.append(ctx["tenant"])
+        return {"tenant": ctx["tenant"]}
+
+    dag = DAGOrchestrator(cache=ResultCache())
+    dag.register(AgentNode(node_id="greet", name="greet", description="", cache_ttl_s=60.0, execute_fn=greet))
+    await dag.run({"tenant": "acme"})
+    await dag.run({"tenant": "globex"})
+    assert dag.nodes["greet"].result == {"tenant": "globex"}
+    await dag.run({"tenant": "acme"})
+    assert calls == ["acme", "globex"] and dag.nodes["greet"].last_run.cached
+
+
+@pytest.mark.asyncio
+async def test_nodes_without_ttl_or_cache_always_execute():
+    calls = []
+    dag = DAGOrchestrator()
+    dag.register(counting_node("a", calls))
+    await dag.run()
+    await dag.run()
+    assert calls == ["a", "a"]
+
+
+# ─── Incremental runs ─────────────────────────────────────────────────────
+
+def test_code_identity_tracks_code_and_bound_values():
+    def make(n):
+        def fn(ctx):
+            return n
+        return fn
+
+    def one(ctx):
+        return 1
+
+    def two(ctx):
+        return 2
+
+    def fetch(ctx, region="us", *, retries=1):
+        return region
+
+    assert code_identity(make(1)) == code_identity(make(1))
+    assert code_identity(make(1)) != code_identity(make(99))   # Captured values are part of the code
+    assert code_identity(one) != code_identity(two)
+    assert code_identity(functools.partial(fetch, region="us")) == code_identity(functools.partial(fetch, region="us"))
+    assert code_identity(functools.partial(fetch, region="us")) != code_identity(functools.partial(fetch, region="eu"))
+    assert code_identity(functools.partial(one)) != code_identity(one)
+    fetch.__kwdefaults__ = {"retries": 3}
+    assert code_identity(fetch) != code_identity(make(1)) and code_identity(None) == ""
+
+    state, other = [1], [1]
+    assert code_identity(make(state)) == code_identity(make(state))
+    assert code_identity(make(state)) != code_identity(make(other))   # Other objects count by identity
+
+    def recursive(ctx):
+        return recursive(ctx)
+    assert code_identity(recursive).startswith(f"{__name__}.")
+
+
+@pytest.mark.asyncio
+async def test_incremental_reruns_when_bound_arguments_change():
+    calls = []
+
+    async def fetch(ctx, region):
+        calls.append(region)
+        return {"region": region}
+
+    dag = DAGOrchestrator(incremental=True)
+    dag.register(AgentNode(node_id="fetch", name="fetch", description="",
+                           execute_fn=functools.partial(fetch, region="us")))
+    await dag.run()
+    await dag.run()
+    dag.nodes["fetch"].execute_fn = functools.partial(fetch, region="eu")
+    result = await dag.run()
+    assert calls == ["us", "eu"] and result.reused == 0
+    assert dag.nodes["fetch"].result == {"region": "eu"}
+
+
+def pricing_dag(calls: list, **kwargs) -> DAGOrchestrator:
+    """fetch (reads ctx["prices"]) → analyze → report, plus an independent audit node."""
+    def node(node_id, fn, **decl):
+        async def run(ctx):
+            calls.append(node_id)
+            return fn(ctx)
+        return AgentNode(node_id=node_id, name=node_id, description="", max_retries=0, execute_fn=run, **decl)
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, incremental=True, **kwargs)
+    dag.register(node("fetch", lambda ctx: {"total": sum(ctx["prices"])}, provides=["prices"]))
+    dag.register(node("analyze", lambda ctx: {"high": ctx["result_fetch"]["total"] > 10},
+                      provides=["analysis"], requires=["prices"]))
+    dag.register(node("report", lambda ctx: {"text": str(ctx["result_analyze"])}, requires=["analysis"]))
+    dag.register(node("audit", lambda ctx: {"ok": True}))
+    return dag
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_executes_only_the_changed_subgraph():
+    calls = []
+    dag = pricing_dag(calls)
+    first = await dag.run({"prices": [1, 2]})
+    assert sorted(calls) == ["analyze", "audit", "fetch", "report"] and first.reused == 0
+
+    calls.clear()
+    steady = await dag.run({"prices": [1, 2]})
+    assert calls == [] and steady.reused == 4 and steady.succeeded == 4
+    assert steady.node_results["report"]["reused"] is True
+    assert dag.nodes["report"].result == {"text": "{'high': False}"}
+
+    # fetch re-ran but its result didn't change: its dependents stay reused
+    calls.clear()
+    dag.mark_dirty("fetch")
+    await dag.run({"prices": [1, 2]})
+    assert calls == ["fetch"]
+
+    # Every node sees the caller's context, so changing it re-runs them all
+    calls.clear()
+    result = await dag.run({"prices": [5, 9]})
+    assert sorted(calls) == ["analyze", "audit", "fetch", "report"] and result.reused == 0
+    assert dag.nodes["report"].result == {"text": "{'high': True}"}
+
+
+@pytest.mark.asyncio
+async def test_incremental_reruns_when_only_the_seed_context_changes():
+    dag = DAGOrchestrator(incremental=True)
+    dag.register(AgentNode(node_id="tenant", name="tenant", description="",
+                           execute_fn=lambda ctx: {"tenant": ctx["tenant"]}))
+    await dag.run({"tenant": 1})
+    result = await dag.run({"tenant": 2})
+    assert result.reused == 0 and dag.nodes["tenant"].result == {"tenant": 2}
+    assert (await dag.run({"tenant": 2})).reused == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_reruns_dirty_versioned_and_failed_nodes():
+    calls = []
+    dag = pricing_dag(calls)
+    await dag.run({"prices": [1]})
+
+    calls.clear()
+    dag.mark_dirty("audit")
+    dag.nodes["analyze"].version = "v2"
+    await dag.run({"prices": [1]})
+    assert sorted(calls) == ["analyze", "audit"]
+
+    calls.clear()
+    await dag.run({"prices": [1]})
+    assert calls == []                      # Dirty flag cleared by the successful run
+
+    # A run that fails leaves nothing to reuse
+    calls.clear()
+    result = await dag.run({})
+    assert sorted(calls) == ["audit", "fetch"]
+    assert result.failed == 1 and result.skipped == 2 and result.reused == 0
+    calls.clear()
+    result = await dag.run({})
+    assert calls == ["fetch"] and result.reused == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_map_node_tracks_its_collection():
+    seen = []
+
+    async def check(item, ctx):
+        seen.append(item)
+        return item
+
+    dag = DAGOrchestrator(incremental=True)
+    dag.register(MapNode(node_id="m", name="m", description="", items_from="repos", execute_fn=check))
+    await dag.run({"repos": ["a", "b"]})
+    await dag.run({"repos": ["a", "b"]})
+    assert seen == ["a", "b"]
+    await dag.run({"repos": ["a", "c"]})
+    assert seen == ["a", "b", "a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_non_incremental_runs_always_execute():
+    calls = []
+    dag = pricing_dag(calls)
+    dag.incremental = False
+    await dag.run({"prices": [1]})
+    await dag.run({"prices": [1]})
+    assert len(calls) == 8
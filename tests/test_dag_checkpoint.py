@@ -0,0 +1,113 @@
+"""
+Tests for RHNS DAG checkpoints
+===============================
+Covers the JSONL checkpoint store and DAGOrchestrator.resume():
+only failed/skipped/unsettled nodes re-execute; successful ones are restored.
+"""
+
+import pytest
+
+from core.dag_checkpoint import CheckpointStore
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, NodeStatus, ScheduleMode
+
+
+def tracked_node(node_id, calls: list, provides=None, requires=None, fail_while=None):
+    async def fn(ctx: dict) -> dict:
+        calls.append(node_id)
+        if fail_while is not None and fail_while():
+            raise RuntimeError(f"{node_id} upstream unavailable")
+        return {"node": node_id, "seed": ctx.get("seed")}
+    return AgentNode(node_id=node_id, name=node_id, description="",
+                     provides=provides or [], requires=requires or [],
+                     max_retries=0, execute_fn=fn)
+
+
+# ─── CheckpointStore ──────────────────────────────────────────────────────
+
+def test_store_round_trip(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.begin("run1", {"seed": 1})
+    store.record("run1", "a", "success", {"v": 1})
+    store.record("run1", "b", "failed", None, "boom")
+    store.record("run1", "c", "success", {"v": object()})   # not JSON: payload dropped
+    with open(tmp_path / "run1.jsonl", "a") as fh:
+        fh.write('{"node_id": "d", "sta')                   # torn final line
+
+    checkpoint = store.load("run1")
+    assert checkpoint.context == {"seed": 1}
+    assert checkpoint.reusable("a") == {"v": 1}
+    assert checkpoint.reusable("b") is None
+    assert checkpoint.reusable("c") is None
+    assert checkpoint.reusable("d") is None
+    assert store.runs() == ["run1"]
+    store.delete("run1")
+    assert store.runs() == []
+
+
+def test_store_rejects_path_like_run_ids(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.load("../etc/passwd")
+    with pytest.raises(FileNotFoundError):
+        store.load("never_ran")
+
+
+def test_store_unserializable_context_recorded_as_none(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.begin("run1", {"client": object()})
+    assert store.load("run1").context is None
+
+
+# ─── resume() ─────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", [ScheduleMode.LAYERED, ScheduleMode.READY])
+async def test_resume_reexecutes_only_failed_subgraph(tmp_path, schedule):
+    calls = []
+    outage = {"on": True}
+    dag = DAGOrchestrator(schedule=schedule, checkpoints=CheckpointStore(str(tmp_path)))
+    dag.register(tracked_node("expensive", calls, provides=["cap_e"]))
+    dag.register(tracked_node("flaky", calls, provides=["cap_f"], requires=["cap_e"],
+                              fail_while=lambda: outage["on"]))
+    dag.register(tracked_node("report", calls, requires=["cap_f", "cap_e"]))
+    dag.register(tracked_node("side", calls, requires=["cap_e"]))
+
+    first = await dag.run({"seed": 5})
+    assert (first.succeeded, first.failed, first.skipped) == (2, 1, 1)
+
+    outage["on"] = False
+    calls.clear()
+    resumed = await dag.resume(first.run_id)
+
+    assert sorted(calls) == ["flaky", "report"]
+    assert resumed.run_id == first.run_id
+    assert resumed.succeeded == 4
+    assert resumed.restored == 2
+    assert resumed.node_results["expensive"]["restored"] is True
+    assert dag.nodes["report"].status == NodeStatus.SUCCESS
+    # Restored results and the original seed context reach re-executed nodes
+    assert dag.nodes["flaky"].result["seed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_resume_after_interrupted_run(tmp_path):
+    """A crash leaves only some nodes recorded; resume runs the rest."""
+    store = CheckpointStore(str(tmp_path))
+    store.begin("crashed", {"seed": 9})
+    store.record("crashed", "expensive", "success", {"node": "expensive"})
+
+    calls = []
+    dag = DAGOrchestrator(checkpoints=store)
+    dag.register(tracked_node("expensive", calls, provides=["cap_e"]))
+    dag.register(tracked_node("downstream", calls, requires=["cap_e"]))
+
+    result = await dag.resume("crashed")
+    assert calls == ["downstream"]
+    assert result.succeeded == 2
+    assert store.load("crashed").reusable("downstream") == {"node": "downstream", "seed": 9}
+
+
+@pytest.mark.asyncio
+async def test_resume_requires_checkpoint_store():
+    with pytest.raises(ValueError):
+        await DAGOrchestrator().resume("anything")
@@ -0,0 +1,142 @@
+"""
+Tests for the RHNS DAG compiler
+================================
+Covers index/adjacency construction, multi-provider capabilities, Kahn
+layering, cycle reporting, the capability ledger's provider policies and
+the orchestrator's plan cache (reuse + invalidation).
+"""
+
+import pytest
+
+from core.dag_compiler import CYCLE_ERROR, CapabilityLedger, ProviderPolicy, compile_dag
+from core.dag_orchestrator import DAGOrchestrator, AgentNode
+
+
+def make_node(node_id: str, provides=None, requires=None) -> AgentNode:
+    return AgentNode(node_id=node_id, name=node_id, description="",
+                     provides=provides or [], requires=requires or [])
+
+
+def diamond() -> dict[str, AgentNode]:
+    nodes = [
+        make_node("a", provides=["x"]),
+        make_node("b", provides=["y"], requires=["x"]),
+        make_node("c", provides=["z"], requires=["x"]),
+        make_node("d", requires=["y", "z", "x"]),
+    ]
+    return {n.node_id: n for n in nodes}
+
+
+def test_compile_builds_index_adjacency():
+    plan = compile_dag(diamond())
+    assert plan.node_ids == ["a", "b", "c", "d"]
+    assert plan.index["c"] == 2
+    assert plan.providers == [[], [0], [0], [1, 2, 0]]
+    assert plan.dependents == [[1, 2, 3], [3], [3], []]
+    assert plan.provider_ids("d") == ["b", "c", "a"]
+
+
+def test_compile_keeps_every_provider_of_a_capability():
+    nodes = [
+        make_node("r1", provides=["x"]),
+        make_node("r2", provides=["x", "x"]),
+        make_node("use", requires=["x", "x"]),
+    ]
+    plan = compile_dag({n.node_id: n for n in nodes}, {"x": ProviderPolicy.ALL_REQUIRED})
+    assert plan.capability_providers == {"x": [0, 1]}
+    assert plan.providers[2] == [0, 1]
+    assert plan.required_caps == [[], [], ["x"]]
+    assert plan.capability_consumers == {"x": [2]}
+    assert plan.layer_ids() == [["r1", "r2"], ["use"]]
+    assert plan.policy("x") is ProviderPolicy.ALL_REQUIRED
+    assert plan.policy("other") is ProviderPolicy.ALL_SETTLED
+
+
+def test_ledger_settles_capabilities_by_policy():
+    nodes = [make_node(f"{cap}{k}", provides=[cap]) for cap in ("s", "r", "f", "o") for k in (1, 2)]
+    policies = {"r": ProviderPolicy.ALL_REQUIRED, "f": ProviderPolicy.FIRST_SUCCESS, "o": ProviderPolicy.ROUND_ROBIN}
+    plan = compile_dag({n.node_id: n for n in nodes}, policies)
+    ledger = CapabilityLedger(plan, seq=3)
+    assert ledger.selected == {"o": 7}
+    # ALL_SETTLED waits for every provider and is satisfied if any succeeded
+    assert ledger.settle(0, False) == [] and ledger.settle(1, True) == ["s"]
+    # ALL_REQUIRED is lost on the first failure; FIRST_SUCCESS is satisfied on the first success
+    assert ledger.settle(2, False) == ["r"] and ledger.settle(4, True) == ["f"]
+    assert ledger.settle(3, True) == [] and ledger.settle(5, True) == []
+    # ROUND_ROBIN only counts this run's provider
+    assert ledger.settle(6, True) == [] and ledger.settle(7, False) == ["o"]
+    assert ledger.caps == {"s", "f"} and ledger.resolved == {"s", "r", "f", "o"}
+
+
+def test_compile_layers_and_order():
+    plan = compile_dag(diamond())
+    assert plan.acyclic
+    assert plan.layer_ids() == [["a"], ["b", "c"], ["d"]]
+    assert plan.order == [0, 1, 2, 3]
+    assert plan.layer_of == [0, 1, 1, 2]
+
+
+def test_compile_ignores_self_and_unknown_requirements():
+    plan = compile_dag({"solo": make_node("solo", provides=["x"], requires=["x", "nobody"])})
+    assert plan.providers == [[]]
+    assert plan.layers == [[0]]
+    assert plan.unprovided_caps == [["x", "nobody"]]   # Never met, so the node is skipped
+
+
+def test_compile_reports_cycle_without_raising():
+    nodes = {
+        "a": make_node("a", provides=["x"], requires=["y"]),
+        "b": make_node("b", provides=["y"], requires=["x"]),
+    }
+    plan = compile_dag(nodes)
+    assert not plan.acyclic
+    assert plan.error == CYCLE_ERROR
+
+
+def test_orchestrator_reuses_plan_until_node_set_changes():
+    dag = DAGOrchestrator()
+    for node in diamond().values():
+        dag.register(node)
+    plan = dag.compile()
+    assert dag.compile() is plan
+    dag.visualize()
+    assert dag.compile() is plan
+
+    dag.register(make_node("e", requires=["y"]))
+    replanned = dag.compile()
+    assert replanned is not plan
+    assert len(replanned) == 5
+
+    assert dag.unregister("e").node_id == "e"
+    assert dag.unregister("missing") is None
+    assert len(dag.compile()) == 4
+
+    dag.invalidate()
+    assert dag.compile() is not replanned
+
+    plan = dag.compile()
+    dag.set_provider_policy("x", ProviderPolicy.ROUND_ROBIN)
+    assert dag.compile() is not plan
+    assert dag.compile().policy("x") is ProviderPolicy.ROUND_ROBIN
+
+
+@pytest.mark.asyncio
+async def test_run_uses_cached_plan(monkeypatch):
+    dag = DAGOrchestrator()
+    for node in diamond().values():
+        dag.register(node)
+    dag.compile()
+
+    def boom(nodes, policies=None):
+        raise AssertionError("plan should not be rebuilt")
+
+    monkeypatch.setattr("core.dag_orchestrator.compile_dag", boom)
+    result = await dag.run()
+    assert result.succeeded == 4
+
+
+def test_visualize_handles_cycles():
+    dag = DAGOrchestrator()
+    dag.register(make_node("a", provides=["x"], requires=["y"]))
+    dag.register(make_node("b", provides=["y"], requires=["x"]))
+    assert "a" in dag.visualize()
@@ -0,0 +1,196 @@
+"""
+Tests for RHNS DAG executors
+=============================
+Covers THREAD and PROCESS execution modes: overlap of blocking work,
+picklable context slices, pool timeouts, retry after a worker crash,
+opt-in offload of sync execute_fns and queue-wait/run-time reporting.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+
+import pytest
+
+from core.dag_executors import ExecutionMode, ExecutorPools, effective_mode, invoke
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, NodeStatus, ScheduleMode
+from core.garcar_dag import build_garcar_dag
+
+
+# ─── Module-level node functions (picklable for PROCESS mode) ─────────────
+
+def blocking_sleep(ctx: dict) -> dict:
+    time.sleep(0.2)
+    return {"status": "ok"}
+
+
+def square(ctx: dict) -> dict:
+    return {"value": ctx["n"] ** 2, "pid": os.getpid()}
+
+
+async def async_in_worker(ctx: dict) -> dict:
+    return {"status": "ok", "keys": sorted(ctx)}
+
+
+def report_keys(ctx: dict) -> dict:
+    return {"keys": sorted(ctx)}
+
+
+def crash_once(ctx: dict) -> dict:
+    marker = ctx["marker"]
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return {"status": "recovered"}
+
+
+def make_node(node_id, fn, mode, provides=None, requires=None, timeout_s=10.0, max_retries=0):
+    return AgentNode(
+        node_id=node_id, name=node_id, description="",
+        provides=provides or [], requires=requires or [],
+        timeout_s=timeout_s, max_retries=max_retries,
+        execution=mode, execute_fn=fn,
+    )
+
+
+@pytest.fixture
+def dag():
+    orchestrator = DAGOrchestrator(schedule=ScheduleMode.READY, thread_workers=4, process_workers=2)
+    yield orchestrator
+    orchestrator.close()
+
+
+# ─── Tests ────────────────────────────────────────────────────────────────
+
+def test_invoke_runs_sync_and_coroutine_functions():
+    assert invoke(square, {"n": 3})["value"] == 9
+    assert invoke(async_in_worker, {"a": 1}) == {"status": "ok", "keys": ["a"]}
+
+
+def test_executor_pools_reject_async_mode():
+    pools = ExecutorPools(thread_workers=1, process_workers=1)
+    with pytest.raises(ValueError):
+        pools.get(ExecutionMode.ASYNC)
+    assert pools.get(ExecutionMode.THREAD) is pools.get(ExecutionMode.THREAD)
+    pools.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_overlaps_blocking_nodes(dag):
+    for i in range(3):
+        dag.register(make_node(f"blocking_{i}", blocking_sleep, ExecutionMode.THREAD))
+    result = await dag.run()
+    assert result.succeeded == 3
+    assert result.total_duration_ms < 500
+
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_in_worker_process(dag):
+    dag.register(make_node("sq", square, ExecutionMode.PROCESS))
+    ctx = {"n": 7}
+    result = await dag.run(ctx)
+    assert result.succeeded == 1
+    assert ctx["result_sq"]["value"] == 49
+    assert ctx["result_sq"]["pid"] != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_receives_context_slice(dag):
+    dag.register(make_node("src", async_in_worker, ExecutionMode.PROCESS, provides=["cap_s"]))
+    dag.register(make_node("other", async_in_worker, ExecutionMode.ASYNC))
+    dag.register(make_node("reader", report_keys, ExecutionMode.PROCESS, requires=["cap_s"]))
+    ctx = {"seed": 1}
+    result = await dag.run(ctx)
+    assert result.succeeded == 3
+    # Seed keys + its own provider's result; nothing from unrelated nodes
+    assert ctx["result_reader"]["keys"] == ["result_src", "seed"]
+
+
+@pytest.mark.asyncio
+async def test_process_mode_enforces_timeout(dag):
+    dag.register(make_node("slow", blocking_sleep, ExecutionMode.PROCESS, timeout_s=0.05))
+    result = await dag.run()
+    assert result.failed == 1
+    assert "Timeout" in result.node_results["slow"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_process_mode_retries_after_worker_crash(dag, tmp_path):
+    dag.register(make_node("fragile", crash_once, ExecutionMode.PROCESS, max_retries=1))
+    ctx = {"marker": str(tmp_path / "crashed")}
+    result = await dag.run(ctx)
+    assert dag.nodes["fragile"].status == NodeStatus.SUCCESS
+    assert result.node_results["fragile"]["retry_count"] == 1
+    assert ctx["result_fragile"] == {"status": "recovered"}
+
+
+# ─── Blocking-node offload ────────────────────────────────────────────────
+
+class AsyncCallable:
+    async def __call__(self, ctx: dict) -> dict:
+        return {"status": "ok"}
+
+
+def test_effective_mode_offloads_only_when_asked():
+    assert effective_mode(ExecutionMode.ASYNC, blocking_sleep) is ExecutionMode.ASYNC
+    assert effective_mode(ExecutionMode.ASYNC, blocking_sleep, offload_sync=True) is ExecutionMode.THREAD
+    assert effective_mode(ExecutionMode.PROCESS, blocking_sleep, offload_sync=True) is ExecutionMode.PROCESS
+    assert effective_mode(ExecutionMode.ASYNC, None, offload_sync=True) is ExecutionMode.ASYNC
+    for fn in (async_in_worker, AsyncCallable(), functools.partial(async_in_worker)):
+        assert effective_mode(ExecutionMode.ASYNC, fn, offload_sync=True) is ExecutionMode.ASYNC
+
+
+@pytest.mark.asyncio
+async def test_async_mode_awaits_what_any_callable_returns():
+    dag = DAGOrchestrator()
+    dag.register(make_node("loop_bound", lambda ctx: asyncio.sleep(0, {"loop": id(asyncio.get_running_loop())}),
+                           ExecutionMode.ASYNC))
+    dag.register(make_node("instance", AsyncCallable(), ExecutionMode.ASYNC))
+    dag.register(make_node("plain", report_keys, ExecutionMode.ASYNC))
+    result = await dag.run()
+    assert result.succeeded == 3
+    assert dag.nodes["loop_bound"].result == {"loop": id(asyncio.get_running_loop())}
+    assert dag.nodes["instance"].result == {"status": "ok"} and "keys" in dag.nodes["plain"].result
+
+
+@pytest.mark.asyncio
+async def test_sync_execute_fn_is_offloaded_with_offload_sync():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, thread_workers=4, offload_sync=True)
+    for i in range(3):
+        dag.register(make_node(f"sync_{i}", blocking_sleep, ExecutionMode.ASYNC))
+
+    # A wrapper that returns a coroutine runs in a worker, but its coroutine runs on this loop
+    async def on_loop(ctx):
+        return {"loop": id(asyncio.get_running_loop()), "thread": threading.current_thread().name}
+    dag.register(make_node("wrapper", lambda ctx: on_loop(ctx), ExecutionMode.ASYNC))
+    try:
+        result = await dag.run()
+    finally:
+        dag.close()
+    assert result.succeeded == 4
+    assert result.total_duration_ms < 500
+    assert dag.nodes["wrapper"].result == {"loop": id(asyncio.get_running_loop()),
+                                           "thread": threading.current_thread().name}
+
+
+@pytest.mark.asyncio
+async def test_executor_queue_wait_is_reported():
+    dag = DAGOrchestrator(max_parallelism=4, schedule=ScheduleMode.READY, thread_workers=1)
+    dag.register(make_node("first", blocking_sleep, ExecutionMode.THREAD))
+    dag.register(make_node("second", blocking_sleep, ExecutionMode.THREAD))
+    result = await dag.run()
+    dag.close()
+
+    stats = result.node_results
+    waits = sorted(stats[n]["queue_wait_ms"] for n in ("first", "second"))
+    assert waits[0] < 100 <= waits[1]
+    assert all(stats[n]["run_ms"] >= 150 for n in ("first", "second"))
+
+
+def test_garcar_blocking_nodes_run_on_thread_pool():
+    dag = build_garcar_dag()
+    for node_id in ("defender_os", "revenue_intelligence", "slack_broadcast"):
+        assert dag.nodes[node_id].execution is ExecutionMode.THREAD
+    assert dag.executors.thread_workers >= dag.max_parallelism
@@ -0,0 +1,155 @@
+"""
+Tests for RHNS DAG map nodes
+=============================
+Covers collection lookup, per-item failure isolation and retries, result
+aggregation, bounded concurrency and batching, and MapNode end to end on
+the ASYNC, THREAD and PROCESS execution modes.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from core.dag_executors import ExecutionMode
+from core.dag_map import aggregate, resolve_items, run_batch, run_map
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, MapNode, NodeStatus, ScheduleMode
+
+
+# ─── Module-level item functions (picklable for PROCESS mode) ─────────────
+
+def check_repo(repo: str, ctx: dict) -> dict:
+    if repo.startswith("broken"):
+        raise RuntimeError(f"{repo}: 404")
+    return {"repo": repo, "owner": ctx.get("owner"), "pid": os.getpid()}
+
+
+def discovery_node(repos: list) -> AgentNode:
+    async def discover(ctx):
+        return {"repos": repos}
+    return AgentNode(node_id="discovery", name="discovery", description="",
+                     provides=["repo_list"], max_retries=0, execute_fn=discover)
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────
+
+def test_resolve_items_follows_dotted_path():
+    ctx = {"seed": ("a", "b"), "result_scan": {"found": {"repos": ["x"]}}}
+    assert resolve_items(ctx, "seed") == ["a", "b"]
+    assert resolve_items(ctx, "result_scan.found.repos") == ["x"]
+    with pytest.raises(KeyError, match="not found"):
+        resolve_items(ctx, "result_scan.missing")
+    with pytest.raises(TypeError, match="not a collection"):
+        resolve_items(ctx, "result_scan.found")
+
+
+def test_run_batch_isolates_and_retries_items():
+    attempts = []
+
+    def flaky(item, ctx):
+        attempts.append(item)
+        if item == "bad" or (item == "flaky" and attempts.count("flaky") == 1):
+            raise ValueError(f"{item} failed")
+        return item.upper()
+
+    outcomes = run_batch(flaky, ["ok", "bad", "flaky"], {}, retries=1)
+    assert outcomes == [(True, "OK"), (False, "bad failed"), (True, "FLAKY")]
+    assert attempts.count("bad") == 2
+
+
+def test_aggregate_summarizes_and_enforces_failure_budget():
+    outcomes = [(True, 1), (False, "boom"), (True, 3)]
+    summary = aggregate(outcomes)
+    assert summary == {
+        "items": 3, "succeeded": 2, "failed": 1,
+        "results": [1, None, 3], "errors": [{"index": 1, "error": "boom"}],
+    }
+    assert aggregate(outcomes, max_item_failures=1)["failed"] == 1
+    with pytest.raises(RuntimeError, match="1/3 items failed"):
+        aggregate(outcomes, max_item_failures=0)
+
+
+@pytest.mark.asyncio
+async def test_run_map_bounds_concurrency_and_keeps_order():
+    active, peak = [0], [0]
+
+    async def fn(item, ctx):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return item * 10
+
+    outcomes = await run_map(fn, list(range(23)), {}, concurrency=3, batch_size=2)
+    assert [value for _, value in outcomes] == [i * 10 for i in range(23)]
+    assert peak[0] == 3
+
+
+# ─── MapNode end to end ───────────────────────────────────────────────────
+
+def test_map_node_validates_config():
+    with pytest.raises(ValueError, match="items_from"):
+        MapNode(node_id="m", name="m", description="")
+    with pytest.raises(ValueError, match="batch_size"):
+        MapNode(node_id="m", name="m", description="", items_from="x", batch_size=0)
+
+
+@pytest.mark.asyncio
+async def test_map_node_aggregates_into_one_capability():
+    seen = {}
+
+    async def check(repo, ctx):
+        if repo == "broken":
+            raise RuntimeError("archived")
+        return {"repo": repo}
+
+    async def report(ctx):
+        seen.update(ctx["result_repo_health"])
+        return {"status": "ok"}
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(discovery_node(["a", "broken", "c"]))
+    dag.register(MapNode(node_id="repo_health", name="Repo Health", description="",
+                         requires=["repo_list"], provides=["repo_health"], max_retries=0,
+                         items_from="result_discovery.repos", execute_fn=check))
+    dag.register(AgentNode(node_id="report", name="report", description="",
+                           requires=["repo_health"], execute_fn=report))
+
+    result = await dag.run()
+    assert result.succeeded == 3
+    assert seen["items"] == 3 and seen["failed"] == 1
+    assert seen["results"] == [{"repo": "a"}, None, {"repo": "c"}]
+    assert seen["errors"] == [{"index": 1, "error": "archived"}]
+
+
+@pytest.mark.asyncio
+async def test_map_node_fails_on_missing_input_or_failure_budget():
+    dag = DAGOrchestrator()
+    dag.register(MapNode(node_id="m", name="m", description="", max_retries=0,
+                         items_from="repos", execute_fn=check_repo, max_item_failures=0))
+    result = await dag.run()
+    assert dag.nodes["m"].status == NodeStatus.FAILED
+    assert "not found in context" in result.node_results["m"]["error"]
+
+    result = await dag.run({"repos": ["fine", "broken-1"]})
+    assert dag.nodes["m"].status == NodeStatus.FAILED
+    assert "1/2 items failed" in dag.nodes["m"].error
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", [ExecutionMode.THREAD, ExecutionMode.PROCESS])
+async def test_map_node_batches_on_executor_pools(mode):
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, thread_workers=2, process_workers=2)
+    try:
+        dag.register(MapNode(node_id="m", name="m", description="", execution=mode, max_retries=0,
+                             items_from="repos", execute_fn=check_repo,
+                             map_concurrency=2, batch_size=4))
+        repos = [f"repo{i}" for i in range(10)] + ["broken-x"]
+        await dag.run({"repos": repos, "owner": "garcar"})
+        summary = dag.nodes["m"].result
+        assert summary["succeeded"] == 10 and summary["failed"] == 1
+        assert summary["results"][3]["repo"] == "repo3"
+        assert summary["results"][3]["owner"] == "garcar"
+        assert summary["errors"] == [{"index": 10, "error": "broken-x: 404"}]
+    finally:
+        dag.close()
@@ -1,7 +1,7 @@
 """
 Tests for RHNS DAG Orchestrator
 ================================
-7 unit tests covering:
+Unit tests covering:
 1. Single node execution
 2. Dependency order enforcement
 3. Cycle detection
@@ -9,11 +9,23 @@ Tests for RHNS DAG Orchestrator
 5. Critical node halts DAG
 6. Parallel layer concurrency
 7. Visualize returns string
+8. READY scheduling: critical-path makespan, skip propagation, critical halt
+9. Concurrent runs on one orchestrator keep isolated state
+10. Incremental capability tracking and one-pass descendant skipping
+11. Lazy node_results view (and its JSON/copy round trip) and AgentNode last-run snapshot
+12. Multiple providers per capability: first-success, all-required, round-robin
+13. Run deadline and cancellation of in-flight nodes on halt
 """
 
 import asyncio
+import copy
+import dataclasses
+import json
+import pickle
+
 import pytest
-from core.dag_orchestrator import DAGOrchestrator, AgentNode, NodeStatus
+from core.dag_compiler import ProviderPolicy
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, NodeStatus, ScheduleMode
 
 
 # ─── Helpers ──────────────────────────────────────────────────────────────
@@ -155,3 +167,389 @@ def test_visualize_returns_string():
     assert isinstance(output, str)
     assert len(output) > 0
     assert "vis_a" in output or "vis_b" in output
+
+
+# ─── READY scheduling ─────────────────────────────────────────────────────
+
+def make_sleep_fn(seconds: float, record: list = None, tag: str = ""):
+    async def fn(ctx: dict) -> dict:
+        await asyncio.sleep(seconds)
+        if record is not None:
+            record.append(tag)
+        return {"status": "ok"}
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_ready_mode_does_not_wait_for_slow_sibling():
+    """fast → downstream must finish while slow (same layer as fast) is still running."""
+    order = []
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("slow", execute_fn=make_sleep_fn(0.3, order, "slow")))
+    dag.register(make_node("fast", provides=["cap_f"], execute_fn=make_sleep_fn(0.01, order, "fast")))
+    dag.register(make_node("downstream", requires=["cap_f"],
+                           execute_fn=make_sleep_fn(0.1, order, "downstream")))
+
+    result = await dag.run()
+    assert result.succeeded == 3
+    assert order == ["fast", "downstream", "slow"]
+    # Makespan tracks the critical path (0.3s), not slow + downstream (0.4s)
+    assert result.total_duration_ms < 380
+
+
+@pytest.mark.asyncio
+async def test_layered_mode_keeps_layer_barrier():
+    order = []
+    dag = DAGOrchestrator(schedule="layered")
+    dag.register(make_node("slow", execute_fn=make_sleep_fn(0.1, order, "slow")))
+    dag.register(make_node("fast", provides=["cap_f"], execute_fn=make_sleep_fn(0.01, order, "fast")))
+    dag.register(make_node("downstream", requires=["cap_f"],
+                           execute_fn=make_sleep_fn(0.01, order, "downstream")))
+
+    await dag.run()
+    assert order == ["fast", "slow", "downstream"]
+
+
+@pytest.mark.asyncio
+async def test_ready_mode_propagates_skips_transitively():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("a", provides=["cap_a"], execute_fn=fail_fn))
+    dag.register(make_node("b", provides=["cap_b"], requires=["cap_a"], execute_fn=ok_fn))
+    dag.register(make_node("c", requires=["cap_b"], execute_fn=ok_fn))
+    dag.register(make_node("d", execute_fn=ok_fn))
+
+    result = await dag.run()
+    assert result.failed == 1
+    assert result.skipped == 2
+    assert result.succeeded == 1
+    assert dag.nodes["c"].status == NodeStatus.SKIPPED
+
+
+@pytest.mark.asyncio
+async def test_ready_mode_merges_context_and_halts_on_critical():
+    seen = {}
+
+    async def read_ctx(ctx):
+        seen.update(ctx)
+        return {"status": "ok"}
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("src", provides=["cap_s"], execute_fn=ok_fn))
+    dag.register(make_node("reader", requires=["cap_s"], execute_fn=read_ctx))
+    result = await dag.run({"seed": 1})
+    assert seen["seed"] == 1
+    assert seen["result_src"] == {"status": "ok"}
+    assert result.succeeded == 2
+
+    halting = DAGOrchestrator(schedule=ScheduleMode.READY)
+    halting.register(make_node("boom", provides=["cap_b"], critical=True, execute_fn=fail_fn))
+    halting.register(make_node("slow", provides=["cap_s"], execute_fn=make_sleep_fn(0.05)))
+    halting.register(make_node("after_slow", requires=["cap_s"], execute_fn=ok_fn))
+    result = await halting.run()
+    assert result.halted_early is True
+    assert "boom" in result.halt_reason
+    assert halting.nodes["after_slow"].status == NodeStatus.SKIPPED
+
+
+# ─── Per-run isolation ────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_keep_isolated_state():
+    """Overlapping run() calls on one orchestrator must not see each other's state."""
+    async def echo_tenant(ctx):
+        await asyncio.sleep(0.05)
+        if ctx["tenant"] % 2:
+            raise RuntimeError(f"tenant {ctx['tenant']} failed")
+        return {"tenant": ctx["tenant"]}
+
+    async def downstream(ctx):
+        return {"saw": ctx["result_source"]["tenant"]}
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("source", provides=["cap_t"], execute_fn=echo_tenant))
+    dag.register(make_node("sink", requires=["cap_t"], execute_fn=downstream))
+
+    contexts = [{"tenant": t} for t in range(20)]
+    results = await asyncio.gather(*[dag.run(ctx) for ctx in contexts])
+
+    assert len({r.run_id for r in results}) == 20
+    for ctx, result in zip(contexts, results):
+        if ctx["tenant"] % 2:
+            assert result.failed == 1 and result.skipped == 1
+            assert "result_sink" not in ctx
+        else:
+            assert result.succeeded == 2
+            assert ctx["result_sink"] == {"saw": ctx["tenant"]}
+    # Twenty 50ms runs overlap instead of queueing behind each other
+    assert max(r.total_duration_ms for r in results) < 500
+
+
+@pytest.mark.asyncio
+async def test_run_ids_unique_within_same_second():
+    dag = DAGOrchestrator()
+    dag.register(make_node("alpha", execute_fn=ok_fn))
+    first, second = await dag.run(), await dag.run()
+    assert first.run_id != second.run_id
+    assert first.run_id.startswith("dag_")
+
+
+# ─── Incremental capability tracking ──────────────────────────────────────
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", [ScheduleMode.LAYERED, ScheduleMode.READY])
+async def test_failure_skips_whole_descendant_chain(schedule):
+    dag = DAGOrchestrator(schedule=schedule)
+    dag.register(make_node("n0", provides=["c0"], execute_fn=fail_fn))
+    for i in range(1, 2000):
+        dag.register(make_node(f"n{i}", provides=[f"c{i}"], requires=[f"c{i - 1}"], execute_fn=ok_fn))
+    dag.register(make_node("independent", execute_fn=ok_fn))
+
+    result = await dag.run()
+    assert result.failed == 1
+    assert result.skipped == 1999
+    assert result.succeeded == 1
+    assert result.node_results["n1500"]["error"] == "Skipped: upstream provider failed for caps ['c1499']"
+    assert result.total_duration_ms < 2000
+
+
+@pytest.mark.asyncio
+async def test_skip_spares_nodes_whose_caps_are_still_available():
+    """A dependent keeps running if a lost cap was already provided by another successful node."""
+    async def slow_fail(ctx):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("primary down")
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("backup", provides=["shared"], execute_fn=ok_fn))
+    dag.register(make_node("slow_primary", provides=["shared", "extra"], execute_fn=slow_fail))
+    dag.register(make_node("needs_shared", requires=["shared"], execute_fn=ok_fn))
+    dag.register(make_node("needs_extra", requires=["extra"], execute_fn=ok_fn))
+
+    result = await dag.run()
+    assert dag.nodes["needs_shared"].status == NodeStatus.SUCCESS
+    assert dag.nodes["needs_extra"].status == NodeStatus.SKIPPED
+    assert result.skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_unprovided_requirement_is_skipped():
+    dag = DAGOrchestrator()
+    dag.register(make_node("orphan", requires=["nobody_provides_this"], execute_fn=ok_fn))
+    result = await dag.run()
+    assert result.skipped == 1
+    assert "nobody_provides_this" in result.node_results["orphan"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_node_results_is_a_lazy_read_only_mapping():
+    dag = DAGOrchestrator()
+    dag.register(make_node("a", provides=["x"], execute_fn=ok_fn))
+    dag.register(make_node("b", requires=["x"], execute_fn=fail_fn))
+    result = await dag.run()
+
+    assert len(result.node_results) == 2
+    assert list(result.node_results) == ["a", "b"]
+    assert "a" in result.node_results and "zzz" not in result.node_results
+    assert result.node_results["a"]["status"] == "success"
+    assert result.node_results["a"]["result_keys"] == ["status"]
+    assert result.node_results["b"]["error"] == "Deliberate test failure"
+    assert dict(result.node_results)["b"]["status"] == "failed"
+    with pytest.raises(TypeError):
+        result.node_results["a"] = {}
+
+
+@pytest.mark.asyncio
+async def test_result_round_trips_through_json():
+    dag = DAGOrchestrator()
+    dag.register(make_node("a", provides=["x"], execute_fn=ok_fn))
+    dag.register(make_node("b", requires=["x"], execute_fn=fail_fn))
+    result = await dag.run()
+
+    expected = {"a": result.node_results["a"], "b": result.node_results["b"]}
+    assert json.loads(result.to_json())["node_results"] == expected
+    assert json.loads(json.dumps(dataclasses.asdict(result))) == result.as_dict()
+    assert result.as_dict()["failed"] == 1
+    for clone in (copy.deepcopy(result.node_results), pickle.loads(pickle.dumps(result.node_results))):
+        assert type(clone) is dict and clone == expected
+
+
+@pytest.mark.asyncio
+async def test_agent_node_exposes_last_run_without_instance_dict():
+    node = make_node("a", execute_fn=ok_fn)
+    assert not hasattr(node, "__dict__")
+    assert node.status == NodeStatus.PENDING and node.result == {} and node.duration_ms is None
+
+    dag = DAGOrchestrator()
+    dag.register(node)
+    result = await dag.run()
+    assert node.status == NodeStatus.SUCCESS
+    assert node.result == {"status": "ok"}
+    assert node.duration_ms is not None and node.retry_count == 0
+    assert node.last_run is not None and result.node_results["a"]["duration_ms"] == node.duration_ms
+
+
+# ─── Multiple providers per capability ────────────────────────────────────
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", [ScheduleMode.LAYERED, ScheduleMode.READY])
+async def test_every_provider_runs_by_default(schedule):
+    """Without a policy nobody is cancelled; dependents wait for every provider, one success suffices."""
+    order = []
+    dag = DAGOrchestrator(schedule=schedule)
+    dag.register(make_node("audit_db", provides=["audit_logged"], execute_fn=make_sleep_fn(0.05, order, "db")))
+    dag.register(make_node("audit_file", provides=["audit_logged"], execute_fn=make_sleep_fn(0.01, order, "file")))
+    dag.register(make_node("feed_a", provides=["feed"], execute_fn=fail_fn))
+    dag.register(make_node("feed_b", provides=["feed"], execute_fn=make_sleep_fn(0.03, order, "feed_b")))
+    dag.register(make_node("report", requires=["feed"], execute_fn=make_sleep_fn(0, order, "report")))
+
+    result = await dag.run()
+    assert dag.nodes["audit_db"].status == dag.nodes["audit_file"].status == NodeStatus.SUCCESS
+    assert order.index("report") > order.index("feed_b")
+    assert dag.nodes["report"].status == NodeStatus.SUCCESS
+    assert result.succeeded == 4 and result.failed == 1 and result.skipped == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", [ScheduleMode.LAYERED, ScheduleMode.READY])
+async def test_first_success_hedges_across_replicas(schedule):
+    """The consumer runs off the fast replica; the slow one is cancelled, not awaited."""
+    order = []
+    dag = DAGOrchestrator(schedule=schedule, provider_policies={"market": ProviderPolicy.FIRST_SUCCESS})
+    dag.register(make_node("intel_a", provides=["market"], execute_fn=make_sleep_fn(2.0, order, "a")))
+    dag.register(make_node("intel_b", provides=["market"], execute_fn=make_sleep_fn(0.01, order, "b")))
+    dag.register(make_node("consumer", requires=["market"], execute_fn=make_sleep_fn(0.01, order, "c")))
+
+    result = await dag.run()
+    assert order == ["b", "c"]
+    assert result.total_duration_ms < 1000
+    assert dag.nodes["consumer"].status == NodeStatus.SUCCESS
+    assert dag.nodes["intel_a"].status == NodeStatus.SKIPPED
+    assert "Superseded" in dag.nodes["intel_a"].error
+    assert result.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_first_success_tolerates_failed_replica_until_all_fail():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, provider_policies={"x": ProviderPolicy.FIRST_SUCCESS})
+    dag.register(make_node("a", provides=["x"], execute_fn=fail_fn))
+    dag.register(make_node("b", provides=["x"], execute_fn=make_sleep_fn(0.05)))
+    dag.register(make_node("uses_x", requires=["x"], execute_fn=ok_fn))
+    result = await dag.run()
+    assert dag.nodes["uses_x"].status == NodeStatus.SUCCESS
+    assert result.failed == 1
+
+    dag.register(make_node("b", provides=["x"], execute_fn=fail_fn))
+    result = await dag.run()
+    assert dag.nodes["uses_x"].status == NodeStatus.SKIPPED
+    assert result.failed == 2 and result.skipped == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", [ScheduleMode.LAYERED, ScheduleMode.READY])
+async def test_all_required_waits_for_every_provider(schedule):
+    order = []
+    dag = DAGOrchestrator(schedule=schedule, provider_policies={"shards": ProviderPolicy.ALL_REQUIRED})
+    dag.register(make_node("s1", provides=["shards"], execute_fn=make_sleep_fn(0.01, order, "s1")))
+    dag.register(make_node("s2", provides=["shards"], execute_fn=make_sleep_fn(0.1, order, "s2")))
+    dag.register(make_node("merge", requires=["shards"], execute_fn=make_sleep_fn(0, order, "merge")))
+    await dag.run()
+    assert order == ["s1", "s2", "merge"]
+
+    dag.register(make_node("s2", provides=["shards"], execute_fn=fail_fn))
+    result = await dag.run()
+    assert dag.nodes["merge"].status == NodeStatus.SKIPPED
+    assert result.node_results["merge"]["error"] == "Skipped: upstream provider failed for caps ['shards']"
+
+
+@pytest.mark.asyncio
+async def test_round_robin_rotates_provider_across_runs():
+    calls = []
+
+    def replica(tag):
+        async def fn(ctx):
+            calls.append(tag)
+            return {"replica": tag}
+        return fn
+
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.set_provider_policy("intel", ProviderPolicy.ROUND_ROBIN)
+    dag.register(make_node("r0", provides=["intel"], execute_fn=replica("r0")))
+    dag.register(make_node("r1", provides=["intel"], execute_fn=replica("r1")))
+    dag.register(make_node("r2", provides=["intel", "extra"], execute_fn=replica("r2")))
+    dag.register(make_node("consumer", requires=["intel"], execute_fn=ok_fn))
+
+    for _ in range(3):
+        result = await dag.run()
+        assert dag.nodes["consumer"].status == NodeStatus.SUCCESS
+        assert result.failed == 0
+    # r2 also provides "extra", so it runs every time; r0/r1 only on their turn
+    assert calls == ["r0", "r2", "r1", "r2", "r2"]
+    assert "round-robin" in result.node_results["r0"]["error"]
+
+
+# ─── Deadline and cancellation ────────────────────────────────────────────
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", [ScheduleMode.LAYERED, ScheduleMode.READY])
+async def test_critical_failure_cancels_in_flight_siblings(schedule):
+    dag = DAGOrchestrator(schedule=schedule)
+    dag.register(make_node("boom", provides=["cap_b"], critical=True, execute_fn=fail_fn))
+    dag.register(make_node("sibling", provides=["cap_s"], execute_fn=make_sleep_fn(2.0)))
+    dag.register(make_node("after", requires=["cap_s"], execute_fn=ok_fn))
+
+    result = await dag.run()
+    assert result.halted_early is True
+    assert result.total_duration_ms < 500
+    assert dag.nodes["sibling"].status == NodeStatus.CANCELLED
+    assert dag.nodes["sibling"].error.startswith("Cancelled: Critical node [boom] failed")
+    assert dag.nodes["after"].status == NodeStatus.SKIPPED
+    assert (result.failed, result.cancelled, result.skipped) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_run_deadline_halts_and_frees_slots():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, max_parallelism=1, deadline_s=5.0)
+    dag.register(make_node("hog", provides=["cap_h"], priority=1, execute_fn=make_sleep_fn(2.0)))
+    dag.register(make_node("queued", priority=2, execute_fn=make_sleep_fn(2.0)))
+    dag.register(make_node("downstream", requires=["cap_h"], execute_fn=ok_fn))
+
+    result = await dag.run(deadline_s=0.1)
+    assert result.halted_early is True
+    assert result.halt_reason == "Run deadline of 0.1s exceeded"
+    assert result.total_duration_ms < 500
+    assert result.node_results["hog"]["status"] == "cancelled"
+    assert result.node_results["queued"]["status"] == "cancelled"   # was waiting for a slot
+    assert result.node_results["downstream"]["status"] == "skipped"
+    assert result.succeeded == 0
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_deadline_is_default_and_unhit_deadline_is_harmless():
+    dag = DAGOrchestrator(deadline_s=0.05)
+    dag.register(make_node("slow", execute_fn=make_sleep_fn(1.0)))
+    assert (await dag.run()).cancelled == 1
+
+    dag = DAGOrchestrator(deadline_s=5.0)
+    dag.register(make_node("fast", execute_fn=ok_fn))
+    result = await dag.run()
+    assert result.succeeded == 1 and not result.halted_early
+
+
+@pytest.mark.asyncio
+async def test_cancelling_run_cancels_its_nodes():
+    stopped = asyncio.Event()
+
+    async def long_fn(ctx):
+        try:
+            await asyncio.sleep(10)
+        finally:
+            stopped.set()
+
+    dag = DAGOrchestrator()
+    dag.register(make_node("long", execute_fn=long_fn))
+    runner = asyncio.create_task(dag.run())
+    await asyncio.sleep(0.05)
+    runner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await runner
+    await asyncio.wait_for(stopped.wait(), timeout=1)
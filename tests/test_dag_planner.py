@@ -0,0 +1,91 @@
+"""
+Tests for the RHNS DAG planner
+===============================
+Covers critical-path extraction, list-scheduling estimates in both
+schedule modes, the parallelism needed to reach the critical-path bound,
+and DAGOrchestrator.analyze() weights and JSON export.
+"""
+
+import json
+
+import pytest
+
+from core.dag_compiler import compile_dag
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, ScheduleMode
+from core.dag_planner import critical_path, list_schedule, peak_concurrency
+from core.dag_scheduling import DurationHistory, PriorityPolicy
+
+
+def make_node(node_id, provides=None, requires=None, timeout_s=1.0, priority=3):
+    return AgentNode(node_id=node_id, name=node_id, description="", provides=provides or [],
+                     requires=requires or [], timeout_s=timeout_s, priority=priority)
+
+
+def fork_join(dag: DAGOrchestrator) -> DAGOrchestrator:
+    """src(1) → {a(4), b(1), c(1), d(1)} → sink(1)"""
+    dag.register(make_node("src", provides=["s"]))
+    for branch, t in (("a", 4.0), ("b", 1.0), ("c", 1.0), ("d", 1.0)):
+        dag.register(make_node(branch, provides=[branch], requires=["s"], timeout_s=t))
+    dag.register(make_node("sink", requires=["a", "b", "c", "d"]))
+    return dag
+
+
+def test_critical_path_and_schedules():
+    dag = fork_join(DAGOrchestrator())
+    plan = dag.compile()
+    weights = [n.timeout_s for n in plan.nodes]
+    keys = [(i,) for i in range(len(plan))]
+
+    path, length = critical_path(plan, weights)
+    assert [plan.node_ids[i] for i in path] == ["src", "a", "sink"] and length == 6.0
+    assert peak_concurrency(plan, weights) == 4
+    assert list_schedule(plan, weights, keys, limit=1) == 9.0
+    # Two slots: a runs alongside b, c and d in turn
+    assert list_schedule(plan, weights, keys, limit=2) == 6.0
+    assert list_schedule(plan, weights, keys, limit=2, layered=True) == 6.0
+    assert critical_path(compile_dag({}), []) == ([], 0.0)
+
+
+def test_layered_barrier_costs_more_than_ready():
+    dag = DAGOrchestrator()
+    dag.register(make_node("slow", provides=["x"], timeout_s=5.0))
+    dag.register(make_node("fast", provides=["y"], timeout_s=1.0))
+    dag.register(make_node("after_fast", requires=["y"], timeout_s=4.0))
+    plan = dag.compile()
+    weights, keys = [5.0, 1.0, 4.0], [(0,), (1,), (2,)]
+    assert list_schedule(plan, weights, keys, limit=4) == 5.0
+    assert list_schedule(plan, weights, keys, limit=4, layered=True) == 9.0
+
+
+def test_analyze_reports_bound_and_estimate():
+    dag = fork_join(DAGOrchestrator(max_parallelism=1, schedule=ScheduleMode.READY,
+                                    priority_policy=PriorityPolicy.CRITICAL_PATH))
+    report = dag.analyze()
+    assert report.critical_path == ["src", "a", "sink"] and report.critical_path_s == 6.0
+    assert report.max_width == 4 and report.widest_layer == ["a", "b", "c", "d"]
+    assert report.parallelism_for_bound == 2
+    assert report.estimated_makespan_s == 9.0 and report.lower_bound_s == 9.0
+    assert report.utilization == 1.0
+    assert dag.analyze(max_parallelism=8).estimated_makespan_s == 6.0
+
+    data = json.loads(report.to_json())
+    assert data["schedule"] == "ready" and data["priority_policy"] == "critical_path"
+    assert data["weight_sources"] == {"history": 0, "timeout_s": 6}
+
+
+def test_analyze_prefers_history_over_timeouts():
+    history = DurationHistory()
+    history.record("a", 0.5)
+    dag = fork_join(DAGOrchestrator(history=history))
+    report = dag.analyze()
+    assert report.weight_sources == {"history": 1, "timeout_s": 5}
+    assert report.critical_path_s == 3.0          # src, then any 1s branch, then sink
+    assert report.total_work_s == 5.5
+
+
+def test_analyze_rejects_cycles():
+    dag = DAGOrchestrator()
+    dag.register(make_node("x", provides=["x"], requires=["y"]))
+    dag.register(make_node("y", provides=["y"], requires=["x"]))
+    with pytest.raises(ValueError, match="Cycle"):
+        dag.analyze()
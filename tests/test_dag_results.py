@@ -0,0 +1,159 @@
+"""
+Tests for the RHNS DAG result store
+====================================
+Covers spill files and zero-copy views, the size threshold and per-run
+budget, unloading once dependents have settled, spill-file lifetime, and
+spilled results flowing to ASYNC, PROCESS and MapNode consumers.
+"""
+
+import gc
+import os
+import pickle
+
+import pytest
+
+from core.dag_executors import ExecutionMode
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, MapNode, ScheduleMode
+from core.dag_results import ResultStore, SpilledResult, estimate_size, read_spill, write_spill
+
+BLOB = bytes(range(256)) * 4096     # 1 MiB
+
+
+def blob_len(ctx: dict) -> dict:
+    """Module-level so PROCESS workers can unpickle it."""
+    payload = ctx["result_producer"]["payload"]
+    return {"length": len(payload), "view": type(payload).__name__, "pid": os.getpid()}
+
+
+def producer(node_id="producer", size=len(BLOB), provides=("blob",)) -> AgentNode:
+    async def fn(ctx):
+        return {"payload": BLOB[:size], "meta": {"rows": size}}
+    return AgentNode(node_id=node_id, name=node_id, description="", provides=list(provides),
+                     max_retries=0, execute_fn=fn)
+
+
+# ─── Spill files ──────────────────────────────────────────────────────────
+
+def test_spill_round_trip_serves_blobs_as_views(tmp_path):
+    path = str(tmp_path / "r.spill")
+    result = {"payload": BLOB, "small": b"xy", "nested": [{"raw": bytearray(BLOB[:8192])}], "n": 3}
+    nbytes, digest = write_spill(path, result)
+    assert nbytes == os.path.getsize(path) and len(digest) == 64
+
+    loaded = read_spill(path)
+    assert isinstance(loaded["payload"], memoryview) and loaded["payload"].readonly
+    assert loaded["payload"] == BLOB
+    assert loaded["small"] == b"xy"                          # Below blob_min_bytes: stays in-band
+    assert bytes(loaded["nested"][0]["raw"]) == BLOB[:8192] and loaded["n"] == 3
+    assert write_spill(str(tmp_path / "again.spill"), result)[1] == digest
+
+    (tmp_path / "bad.spill").write_bytes(b"JUNK" + bytes(12))
+    with pytest.raises(ValueError, match="Not a result spill file"):
+        read_spill(str(tmp_path / "bad.spill"))
+
+
+def test_estimate_size_stops_past_limit():
+    assert estimate_size({"payload": BLOB}) > len(BLOB)
+    assert estimate_size([BLOB, BLOB, BLOB], limit=10) < 2 * len(BLOB)
+
+
+def test_spilled_result_is_lazy_and_owns_its_file(tmp_path):
+    store = ResultStore(path=str(tmp_path))
+    view = store.spill("node", {"payload": BLOB, "meta": {"rows": 1}})
+    assert list(view) == ["payload", "meta"] and len(view) == 2 and "meta" in view
+    assert not view.loaded and view.loads == 0
+    assert view["meta"] == {"rows": 1} and view.loaded
+    view.release()
+    assert not view.loaded and view["payload"] == BLOB and view.loads == 2
+    assert repr(view) == f"SpilledResult({view.digest}, {view.nbytes} bytes)"
+
+    # A pickled copy (what a PROCESS worker gets) maps the same file but doesn't own it
+    copy = pickle.loads(pickle.dumps(view))
+    assert copy == {"payload": BLOB, "meta": {"rows": 1}}
+    del copy
+    gc.collect()
+    assert os.path.exists(view.path)
+    path = view.path
+    del view
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+# ─── Orchestrator integration ─────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_large_results_spill_and_small_ones_stay(tmp_path):
+    store = ResultStore(spill_threshold_bytes=64 << 10, path=str(tmp_path))
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, result_store=store)
+    dag.register(producer())
+    dag.register(producer("tiny", size=16, provides=["tiny"]))
+    dag.register(AgentNode(node_id="consumer", name="consumer", description="", requires=["blob", "tiny"],
+                           execute_fn=lambda ctx: blob_len(ctx), execution=ExecutionMode.THREAD))
+    try:
+        result = await dag.run()
+    finally:
+        dag.close()
+    assert result.succeeded == 3 and store.spills == 1
+    spilled = dag.nodes["producer"].last_run.result
+    assert isinstance(spilled, SpilledResult)
+    assert dag.nodes["consumer"].result["view"] == "memoryview"
+    assert not spilled.loaded                                 # Released once its only dependent settled
+    assert type(dag.nodes["tiny"].last_run.result) is dict
+    assert result.node_results["producer"]["result_keys"] == ["payload", "meta"]
+    assert dag.nodes["producer"].result["meta"] == {"rows": len(BLOB)}   # Still readable after the run
+
+
+@pytest.mark.asyncio
+async def test_budget_spills_once_resident_results_exceed_it(tmp_path):
+    store = ResultStore(budget_bytes=300 << 10, spill_threshold_bytes=1 << 20, path=str(tmp_path))
+    dag = DAGOrchestrator(max_parallelism=1, result_store=store)
+    for k in range(4):
+        dag.register(producer(f"p{k}", size=128 << 10, provides=[f"c{k}"]))
+    await dag.run()
+    kinds = [type(dag.nodes[f"p{k}"].last_run.result) for k in range(4)]
+    assert kinds == [dict, dict, SpilledResult, SpilledResult]
+
+
+@pytest.mark.asyncio
+async def test_process_worker_maps_the_spill_file(tmp_path):
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, process_workers=1,
+                          result_store=ResultStore(spill_threshold_bytes=1, path=str(tmp_path)))
+    dag.register(producer())
+    dag.register(AgentNode(node_id="worker", name="worker", description="", requires=["blob"],
+                           execution=ExecutionMode.PROCESS, max_retries=0, execute_fn=blob_len))
+    try:
+        result = await dag.run()
+    finally:
+        dag.close()
+    assert result.succeeded == 2
+    assert dag.nodes["worker"].result["length"] == len(BLOB)
+    assert dag.nodes["worker"].result["view"] == "memoryview"
+    assert dag.nodes["worker"].result["pid"] != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_map_node_reads_items_from_a_spilled_result(tmp_path):
+    async def discover(ctx):
+        return {"repos": [f"r{n}" for n in range(50)]}
+
+    async def check(repo, ctx):
+        return repo.upper()
+
+    dag = DAGOrchestrator(result_store=ResultStore(spill_threshold_bytes=1, path=str(tmp_path)))
+    dag.register(AgentNode(node_id="discovery", name="d", description="", provides=["repos"],
+                           execute_fn=discover))
+    dag.register(MapNode(node_id="m", name="m", description="", requires=["repos"],
+                         items_from="result_discovery.repos", execute_fn=check))
+    await dag.run()
+    assert dag.nodes["m"].result["results"][:2] == ["R0", "R1"]
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_result_stays_in_memory(tmp_path):
+    async def fn(ctx):
+        return {"callback": lambda: None}
+
+    dag = DAGOrchestrator(result_store=ResultStore(spill_threshold_bytes=1, path=str(tmp_path)))
+    dag.register(AgentNode(node_id="odd", name="odd", description="", execute_fn=fn))
+    result = await dag.run()
+    assert result.succeeded == 1 and type(dag.nodes["odd"].last_run.result) is dict
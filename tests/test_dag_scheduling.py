@@ -0,0 +1,452 @@
+"""
+Tests for RHNS DAG scheduling primitives
+=========================================
+Covers DurationHistory, PrioritySemaphore, ResourcePools, AIMDController,
+DeadlineHeap, upward_ranks, and the CRITICAL_PATH priority policy, named resource pools,
+p95 hedging and adaptive concurrency end to end through DAGOrchestrator.
+"""
+
+import asyncio
+import pytest
+
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, ScheduleMode
+from core.dag_scheduling import (
+    AdaptiveConcurrency, AIMDController, DeadlineHeap, DurationHistory, PoolWait, PriorityPolicy, PrioritySemaphore,
+    ResourcePools, upward_ranks,
+)
+
+
+def sleep_node(node_id: str, seconds: float, provides=None, requires=None, priority=3) -> AgentNode:
+    async def fn(ctx: dict) -> dict:
+        await asyncio.sleep(seconds)
+        return {"status": "ok"}
+    return AgentNode(
+        node_id=node_id, name=node_id, description="",
+        provides=provides or [], requires=requires or [],
+        priority=priority, timeout_s=5.0, max_retries=0, execute_fn=fn,
+    )
+
+
+# ─── DurationHistory ──────────────────────────────────────────────────────
+
+def test_history_estimate_and_window():
+    history = DurationHistory(window=2)
+    assert history.estimate("a", default=7.0) == 7.0
+    assert "a" not in history
+    for seconds in (1.0, 2.0, 4.0):
+        history.record("a", seconds)
+    assert history.samples("a") == [2.0, 4.0]
+    assert history.estimate("a", default=7.0) == 3.0
+
+
+def test_history_percentile_needs_enough_samples():
+    history = DurationHistory()
+    for seconds in (0.4, 0.1, 0.3, 0.2):
+        history.record("a", seconds)
+    assert history.percentile("a", 0.95) is None
+    history.record("a", 0.5)
+    assert history.percentile("a", 0.95) == 0.5
+    assert history.percentile("a", 0.5) == 0.3
+    assert history.percentile("a", 0.5, min_samples=10) is None
+
+
+def test_history_persists_to_json(tmp_path):
+    path = str(tmp_path / "durations.json")
+    history = DurationHistory(path=path)
+    history.record("a", 0.5)
+    history.save()
+    assert DurationHistory(path=path).samples("a") == [0.5]
+
+
+# ─── PrioritySemaphore ────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_wakes_lowest_key_first():
+    sem = PrioritySemaphore(1)
+    order = []
+    await sem.acquire()
+
+    async def waiter(key):
+        async with sem.slot(key):
+            order.append(key)
+
+    tasks = [asyncio.create_task(waiter((k,))) for k in (3, 1, 2)]
+    await asyncio.sleep(0)
+    sem.release()
+    await asyncio.gather(*tasks)
+    assert order == [(1,), (2,), (3,)]
+    assert not sem.locked()
+
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_skips_cancelled_waiters():
+    sem = PrioritySemaphore(1)
+    await sem.acquire()
+    cancelled = asyncio.create_task(sem.acquire((0,)))
+    survivor = asyncio.create_task(sem.acquire((1,)))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    sem.release()
+    await asyncio.wait_for(survivor, timeout=1)
+    assert sem.locked()
+
+
+def test_priority_semaphore_rejects_zero():
+    with pytest.raises(ValueError):
+        PrioritySemaphore(0)
+
+
+# ─── upward_ranks ─────────────────────────────────────────────────────────
+
+def test_upward_ranks_longest_remaining_path():
+    # a → (b, c) → d
+    weights = [1.0, 2.0, 5.0, 1.0]
+    dependents = [[1, 2], [3], [3], []]
+    ranks = upward_ranks([0, 1, 2, 3], dependents, weights)
+    assert ranks == [7.0, 3.0, 6.0, 1.0]
+
+
+# ─── CRITICAL_PATH policy ─────────────────────────────────────────────────
+
+def build_contended_dag(policy: PriorityPolicy) -> DAGOrchestrator:
+    """Two high-priority leaves compete with a low-priority two-node chain for 2 slots."""
+    dag = DAGOrchestrator(max_parallelism=2, schedule=ScheduleMode.READY, priority_policy=policy)
+    dag.register(sleep_node("short_1", 0.1, priority=1))
+    dag.register(sleep_node("short_2", 0.1, priority=1))
+    dag.register(sleep_node("chain_head", 0.1, provides=["cap_h"], priority=4))
+    dag.register(sleep_node("chain_tail", 0.1, requires=["cap_h"], priority=4))
+    return dag
+
+
+@pytest.mark.asyncio
+async def test_critical_path_policy_beats_static_under_contention():
+    static = await build_contended_dag(PriorityPolicy.STATIC).run()
+    critical = await build_contended_dag("critical_path").run()
+    assert static.succeeded == critical.succeeded == 4
+    assert static.total_duration_ms >= 290
+    assert critical.total_duration_ms < 280
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_records_durations_across_runs():
+    history = DurationHistory()
+    dag = DAGOrchestrator(priority_policy=PriorityPolicy.CRITICAL_PATH, history=history)
+    dag.register(sleep_node("a", 0.01))
+    await dag.run()
+    await dag.run()
+    assert len(history.samples("a")) == 2
+    assert history.estimate("a", default=99.0) < 1.0
+
+
+# ─── Hedging ──────────────────────────────────────────────────────────────
+
+def flaky_upstream_node(calls: list, hedge: bool = True) -> AgentNode:
+    """First call hangs on a 'slow upstream'; any later call answers quickly."""
+    async def fn(ctx: dict) -> dict:
+        calls.append(len(calls))
+        await asyncio.sleep(0.5 if len(calls) == 1 else 0.01)
+        return {"call": len(calls)}
+    return AgentNode(node_id="api", name="api", description="", timeout_s=5.0,
+                     max_retries=0, hedge=hedge, execute_fn=fn)
+
+
+def warm_history(seconds: float = 0.02) -> DurationHistory:
+    history = DurationHistory()
+    for _ in range(5):
+        history.record("api", seconds)
+    return history
+
+
+@pytest.mark.asyncio
+async def test_hedge_races_second_attempt_past_p95():
+    calls = []
+    dag = DAGOrchestrator(history=warm_history())
+    dag.register(flaky_upstream_node(calls))
+    result = await dag.run()
+
+    assert result.succeeded == 1
+    assert result.total_duration_ms < 300
+    assert calls == [0, 1]
+    assert result.hedges == 1 and result.hedge_wins == 1
+    assert result.node_results["api"]["hedged"] is True
+    assert dag.nodes["api"].result == {"call": 2}
+
+
+@pytest.mark.asyncio
+async def test_history_records_run_time_not_queue_wait():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, max_parallelism=1)
+    for i in range(4):
+        dag.register(sleep_node(f"n{i}", 0.03))
+    result = await dag.run()
+    last = dag.nodes["n3"].last_run
+    assert last.queue_wait_ms > 60 and result.node_results["n3"]["duration_ms"] > 80
+    assert dag.history.samples("n3") == [pytest.approx(0.03, abs=0.015)]   # What the hedge p95 is drawn from
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_opt_in_or_learned_p95():
+    calls = []
+    dag = DAGOrchestrator()
+    dag.register(flaky_upstream_node(calls))
+    result = await dag.run()
+    assert calls == [0] and result.hedges == 0
+    assert result.total_duration_ms >= 500
+
+    calls = []
+    dag = DAGOrchestrator(history=warm_history())
+    dag.register(flaky_upstream_node(calls, hedge=False))
+    result = await dag.run()
+    assert calls == [0] and result.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_falls_back_to_original_when_hedge_fails():
+    calls = []
+
+    async def fn(ctx: dict) -> dict:
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(0.1)
+            return {"from": "original"}
+        raise RuntimeError("hedge hit a bad replica")
+
+    dag = DAGOrchestrator(history=warm_history())
+    dag.register(AgentNode(node_id="api", name="api", description="", max_retries=0,
+                           hedge=True, execute_fn=fn))
+    result = await dag.run()
+    assert result.succeeded == 1
+    assert result.hedges == 1 and result.hedge_wins == 0
+    assert dag.nodes["api"].result == {"from": "original"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 2])
+async def test_hedge_takes_its_own_pool_slot(limit):
+    calls, active = [], {"now": 0, "max": 0}
+    inner = flaky_upstream_node(calls).execute_fn
+
+    async def fn(ctx: dict) -> dict:
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        try:
+            return await inner(ctx)
+        finally:
+            active["now"] -= 1
+
+    dag = DAGOrchestrator(history=warm_history(), resource_limits={"api": limit})
+    dag.register(AgentNode(node_id="api", name="api", description="", max_retries=0,
+                           hedge=True, resources=["api"], execute_fn=fn))
+    result = await dag.run()
+    assert result.succeeded == 1 and result.hedges == 1
+    assert active["max"] == limit and result.resource_waits["api"]["acquired"] == limit
+    # With one slot the hedge waits behind the original and is dropped when it finishes
+    assert calls == list(range(limit)) and result.hedge_wins == (limit == 2)
+
+
+# ─── Resource pools ───────────────────────────────────────────────────────
+
+def pooled_node(node_id: str, resources: list, active: dict, seconds: float = 0.05) -> AgentNode:
+    """Tracks peak concurrency per resource name in `active`."""
+    async def fn(ctx: dict) -> dict:
+        for name in resources:
+            active[name] = active.get(name, 0) + 1
+            active[f"peak_{name}"] = max(active.get(f"peak_{name}", 0), active[name])
+        await asyncio.sleep(seconds)
+        for name in resources:
+            active[name] -= 1
+        return {"status": "ok"}
+    return AgentNode(node_id=node_id, name=node_id, description="", resources=resources,
+                     timeout_s=5.0, max_retries=0, execute_fn=fn)
+
+
+@pytest.mark.asyncio
+async def test_resource_pools_record_waits_and_release_on_cancel():
+    pools = ResourcePools({"api": 1, "gpu": 1})
+    waits: dict = {}
+    async with pools.hold(["gpu", "api", "api"], (), waits):
+        blocked = asyncio.create_task(pools.hold(["api"], (), waits).__aenter__())
+        await asyncio.sleep(0.02)
+        assert not blocked.done()
+        blocked.cancel()
+    async with pools.hold(["api", "gpu"], (), waits):
+        pass
+    assert waits["api"].acquired == 2 and waits["gpu"].acquired == 2
+    assert pools.unknown(["api", "db"]) == ["db"]
+    assert PoolWait().as_dict()["mean_wait_ms"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_resource_pool_caps_heavy_nodes_without_starving_light_ones():
+    active: dict = {}
+    dag = DAGOrchestrator(max_parallelism=8, resource_limits={"local_llm": 1})
+    for i in range(4):
+        dag.register(pooled_node(f"llm{i}", ["local_llm"], active))
+    dag.register(pooled_node("light", [], active, seconds=0.01))
+
+    result = await dag.run()
+    assert result.succeeded == 5
+    assert active["peak_local_llm"] == 1
+    waits = result.resource_waits
+    assert waits["local_llm"]["acquired"] == 4
+    assert waits["local_llm"]["max_wait_ms"] >= 100       # the 4th call queued behind three others
+    assert waits["max_parallelism"]["acquired"] == 5
+    assert waits["max_parallelism"]["max_wait_ms"] < 50   # nobody waited on the global limit
+    assert result.node_results["light"]["duration_ms"] < 50
+
+
+@pytest.mark.asyncio
+async def test_resource_pool_is_shared_across_concurrent_runs():
+    active: dict = {}
+    dag = DAGOrchestrator(resource_limits={"github_api": 2})
+    for i in range(3):
+        dag.register(pooled_node(f"dispatch{i}", ["github_api"], active, seconds=0.02))
+    results = await asyncio.gather(dag.run(), dag.run())
+    assert all(r.succeeded == 3 for r in results)
+    assert active["peak_github_api"] == 2
+
+
+def test_register_rejects_undeclared_resource_pool():
+    dag = DAGOrchestrator(resource_limits={"cpu": 2})
+    dag.register(AgentNode(node_id="ok", name="ok", description="", resources=["cpu"]))
+    with pytest.raises(ValueError, match="undeclared resource pools \\['gpu'\\]"):
+        dag.register(AgentNode(node_id="bad", name="bad", description="", resources=["gpu", "cpu"]))
+
+
+# ─── Adaptive concurrency ─────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_set_limit_grows_and_shrinks():
+    sem = PrioritySemaphore(1)
+    await sem.acquire()
+    waiters = [asyncio.create_task(sem.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+    sem.set_limit(3)                     # Growing admits both waiters at once
+    await asyncio.sleep(0)
+    assert all(w.done() for w in waiters)
+
+    sem.set_limit(1)                     # Shrinking waits for holders to drain
+    late = asyncio.create_task(sem.acquire())
+    for _ in range(2):
+        sem.release()
+        await asyncio.sleep(0)
+        assert not late.done()
+    sem.release()
+    await asyncio.sleep(0)
+    assert late.done()
+    with pytest.raises(ValueError):
+        sem.set_limit(0)
+
+
+def test_aimd_controller_increases_backs_off_and_cools_down():
+    aimd = AIMDController(AdaptiveConcurrency(min_limit=2, max_limit=6, backoff=0.5), initial=4)
+    for _ in range(3):
+        assert not aimd.observe(False)
+    assert aimd.observe(False) and aimd.limit == 5          # +1 after one round of 4
+
+    assert aimd.observe(True, "timeout") and aimd.limit == 2
+    assert not aimd.observe(True, "timeout")                # Same burst: cooldown
+    assert aimd.limit == 2
+    for _ in range(20):
+        aimd.observe(False)
+    assert aimd.limit == 6                                  # Capped at max_limit
+    assert [e["reason"] for e in aimd.trace[:3]] == ["initial", "healthy", "timeout"]
+    assert AIMDController(AdaptiveConcurrency(min_limit=2, max_limit=6), initial=50).limit == 6
+
+
+def wide_dag(n: int, seconds: float, timeout_s: float = 5.0, **kwargs) -> DAGOrchestrator:
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, **kwargs)
+    for i in range(n):
+        node = sleep_node(f"n{i}", seconds)
+        node.timeout_s = timeout_s
+        dag.register(node)
+    return dag
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_grows_while_nodes_stay_healthy():
+    dag = wide_dag(40, 0.002, max_parallelism=2, adaptive=AdaptiveConcurrency(max_limit=8))
+    result = await dag.run()
+    assert result.succeeded == 40
+    assert result.parallelism_limit > 2
+    assert result.parallelism_trace[0] == {"t_ms": 0.0, "limit": 2, "reason": "initial"}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_backs_off_on_timeouts():
+    dag = wide_dag(12, 0.2, timeout_s=0.02, max_parallelism=8, adaptive=AdaptiveConcurrency(min_limit=1))
+    result = await dag.run()
+    assert result.failed == 12
+    assert result.parallelism_limit < 8
+    assert "timeout" in {e["reason"] for e in result.parallelism_trace}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_latency_baseline_ignores_queueing():
+    # A saturated first run queues nodes for up to ~10x their run time ...
+    history = DurationHistory()
+    await wide_dag(10, 0.01, max_parallelism=1, history=history).run()
+    assert max(history.estimate(f"n{i}", 0) for i in range(10)) < 0.03
+    # ... which must not raise the baseline enough to hide a 4x run-time spike
+    result = await wide_dag(10, 0.04, history=history, max_parallelism=4,
+                            adaptive=AdaptiveConcurrency(min_limit=1, max_limit=4)).run()
+    assert "latency" in {e["reason"] for e in result.parallelism_trace}
+
+
+@pytest.mark.asyncio
+async def test_fixed_limit_reported_without_adaptive():
+    result = await wide_dag(3, 0.0, max_parallelism=5).run()
+    assert result.parallelism_limit == 5 and result.parallelism_trace == []
+
+
+# ─── DeadlineHeap ─────────────────────────────────────────────────────────
+
+async def guarded(heap: DeadlineHeap, timeout_s: float, seconds: float) -> str:
+    try:
+        with heap.after(timeout_s):
+            await asyncio.sleep(seconds)
+        return "ok"
+    except asyncio.TimeoutError:
+        return "timeout"
+
+
+@pytest.mark.asyncio
+async def test_deadline_heap_expires_only_overdue_attempts_with_one_timer(monkeypatch):
+    loop, heap, armed = asyncio.get_running_loop(), DeadlineHeap(), []
+    call_at = loop.call_at
+
+    def counting_call_at(when, callback, *args, **kwargs):
+        if callback == heap._fire:
+            armed.append(when)
+        return call_at(when, callback, *args, **kwargs)
+
+    monkeypatch.setattr(loop, "call_at", counting_call_at)
+    outcomes = await asyncio.gather(*(guarded(heap, 0.05, 0.1 if k % 2 else 0.0) for k in range(200)))
+    assert outcomes.count("timeout") == 100 and outcomes.count("ok") == 100
+    assert len(armed) < 10 and heap.expired == 100 and len(heap) == 0   # A few 1ms ticks, not 200 timers
+
+
+@pytest.mark.asyncio
+async def test_deadline_heap_rearms_for_an_earlier_deadline():
+    heap = DeadlineHeap()
+    slow = asyncio.ensure_future(guarded(heap, 5.0, 1.0))
+    await asyncio.sleep(0)
+    t0 = asyncio.get_running_loop().time()
+    assert await guarded(heap, 0.02, 1.0) == "timeout"
+    assert asyncio.get_running_loop().time() - t0 < 0.5
+    slow.cancel()
+    with pytest.raises(asyncio.CancelledError):   # An outside cancel is not turned into a timeout
+        await slow
+    assert len(heap) == 0 and heap._timer is None
+
+
+@pytest.mark.asyncio
+async def test_deadline_heap_drops_finished_entries():
+    heap = DeadlineHeap()
+    blocker = asyncio.ensure_future(guarded(heap, 60.0, 0.2))
+    await asyncio.sleep(0)
+    for _ in range(1000):
+        assert await guarded(heap, 60.0, 0.0) == "ok"
+    assert len(heap) == 1 and len(heap._heap) <= 130
+    blocker.cancel()
+    await asyncio.gather(blocker, return_exceptions=True)
@@ -0,0 +1,224 @@
+"""
+Tests for RHNS DAG shared memory
+=================================
+Covers exporting buffers into segments and attaching to them, handle
+pickling, per-run lifetime (unlink after the last dependent, sinks kept
+readable), PROCESS consumers reading in place, and reuse rules.
+"""
+
+import asyncio
+import gc
+import os
+import pickle
+import time
+from array import array
+
+import pytest
+
+from core.dag_cache import ResultCache
+from core.dag_executors import ExecutionMode
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, ScheduleMode
+from core.dag_shm import SharedBuffer, SharedSegments, export_buffers, find_buffers, invoke_sharing
+
+N = 50_000
+
+
+def segment_exists(name: str) -> bool:
+    return os.path.exists(f"/dev/shm/{name}")
+
+
+def segments_exists_any(buffers) -> bool:
+    return any(segment_exists(b.name) for b in buffers)
+
+
+def sampler(ctx: dict) -> dict:
+    """Module-level so PROCESS workers can unpickle it."""
+    return {"samples": array("d", range(N)), "raw": bytes(200_000), "label": "s", "tiny": b"xy"}
+
+
+def summer(ctx: dict) -> dict:
+    result = ctx["result_sampler"]
+    samples = result["samples"]
+    return {"total": sum(samples.view), "kind": type(samples).__name__,
+            "raw": len(result["raw"].view), "tiny": result["tiny"], "pid": os.getpid()}
+
+
+def doubler(ctx: dict) -> dict:
+    return {"doubled": array("d", (2 * x for x in ctx["result_sampler"]["samples"].view))}
+
+
+def slow_sampler(ctx: dict) -> dict:
+    time.sleep(0.3)
+    return sampler(ctx)
+
+
+def process_node(node_id, fn, provides=(), requires=()) -> AgentNode:
+    return AgentNode(node_id=node_id, name=node_id, description="", provides=list(provides),
+                     requires=list(requires), execution=ExecutionMode.PROCESS, max_retries=0, execute_fn=fn)
+
+
+# ─── Handles ──────────────────────────────────────────────────────────────
+
+def test_export_moves_large_buffers_and_keeps_the_rest():
+    result = export_buffers({"a": [array("i", range(1000))], "b": (bytearray(5000),), "s": "x" * 5000,
+                             "small": b"ab", "n": 1}, min_bytes=4000)
+    buffers = find_buffers(result)
+    try:
+        assert [type(v) for v in (result["a"][0], result["b"][0])] == [SharedBuffer, SharedBuffer]
+        assert result["s"] == "x" * 5000 and result["small"] == b"ab" and result["n"] == 1
+        ints = result["a"][0]
+        assert ints.format == "i" and ints.nbytes == 4000 and ints.view.tolist() == list(range(1000))
+        assert result["b"][0].tobytes() == bytes(5000)
+        assert repr(ints) == f"SharedBuffer({ints.name!r}, 4000 bytes, format='i', shape=())"
+    finally:
+        for buffer in buffers:
+            buffer.unlink()
+    assert not any(segment_exists(b.name) for b in buffers)
+    assert all(b.released for b in buffers)
+
+
+def test_handle_pickles_by_name_and_attaches_lazily():
+    started, result = invoke_sharing(lambda ctx: {"blob": bytes(range(256)) * 64}, {}, 1024)
+    handle = result["blob"]
+    try:
+        copy = pickle.loads(pickle.dumps(handle))
+        assert len(pickle.dumps(handle)) < 200 and not copy.attached
+        view = copy.view
+        assert copy.attached and view[:3].tolist() == [0, 1, 2]
+        del view
+        copy.detach()
+        assert not copy.attached
+    finally:
+        handle.unlink()
+    with pytest.raises(FileNotFoundError):
+        SharedBuffer(handle.name, handle.nbytes).attach()
+
+
+def test_multidimensional_views_keep_their_shape():
+    grid = memoryview(bytearray(range(24))).cast("B", (4, 6))
+    handle = export_buffers(grid, min_bytes=1)
+    try:
+        assert handle.shape == (4, 6) and handle.view.tolist()[1] == list(range(6, 12))
+    finally:
+        handle.unlink()
+
+
+def test_numpy_arrays_round_trip():
+    np = pytest.importorskip("numpy")
+    handle = export_buffers(np.arange(12, dtype=np.float32).reshape(3, 4), min_bytes=1)
+    try:
+        restored = handle.array()
+        assert restored.dtype == np.float32 and restored.shape == (3, 4) and restored[2, 3] == 11
+    finally:
+        handle.unlink()
+
+
+def test_segments_release_or_hand_lifetime_to_handles():
+    segments = SharedSegments()
+    first, second = export_buffers([bytes(4096), bytes(4096)], min_bytes=1)
+    segments.adopt(0, {"x": first})
+    segments.adopt(1, {"y": second})
+    assert segments.created == 2 and segments.shared_bytes == 8192
+    segments.release(0)
+    assert first.released and not segments_exists_any([first])
+    segments.close()
+    assert second.attached and segment_exists(second.name)
+    name = second.name
+    del second
+    gc.collect()
+    assert not segment_exists(name)
+
+
+# ─── Orchestrator integration ─────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_process_consumers_read_shared_results_in_place():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, process_workers=2, shared_memory_min_bytes=4096)
+    dag.register(process_node("sampler", sampler, provides=["samples"]))
+    dag.register(process_node("summer", summer, requires=["samples"]))
+    dag.register(process_node("doubler", doubler, requires=["samples"]))
+    try:
+        result = await dag.run()
+    finally:
+        dag.close()
+    assert result.succeeded == 3
+    summary = dag.nodes["summer"].result
+    assert summary["total"] == sum(range(N)) and summary["kind"] == "SharedBuffer"
+    assert summary["raw"] == 200_000 and summary["tiny"] == b"xy" and summary["pid"] != os.getpid()
+
+    # The sampler's segments went away with its last dependent ...
+    shared = find_buffers(dag.nodes["sampler"].result)
+    assert len(shared) == 2 and all(b.released for b in shared)
+    assert not segments_exists_any(shared)
+    # ... while the sink's result stays readable after the run
+    doubled = dag.nodes["doubler"].result["doubled"]
+    assert doubled.attached and doubled.view[N - 1] == 2 * (N - 1)
+
+
+@pytest.mark.asyncio
+async def test_off_by_default_and_for_non_process_nodes():
+    dag = DAGOrchestrator(process_workers=1)
+    dag.register(process_node("sampler", sampler))
+    dag.register(AgentNode(node_id="local", name="local", description="", execute_fn=sampler,
+                           execution=ExecutionMode.THREAD))
+    try:
+        await dag.run()
+    finally:
+        dag.close()
+    assert type(dag.nodes["sampler"].result["samples"]) is array
+    dag.shared_memory_min_bytes = 1
+    await dag.run()
+    assert type(dag.nodes["local"].result["samples"]) is array
+
+
+@pytest.mark.asyncio
+async def test_unlinked_results_are_not_reused():
+    dag = DAGOrchestrator(process_workers=1, shared_memory_min_bytes=4096, incremental=True)
+    dag.register(process_node("sampler", sampler, provides=["samples"]))
+    dag.register(process_node("summer", summer, requires=["samples"]))
+    dag.register(process_node("solo", sampler))
+    try:
+        await dag.run()
+        result = await dag.run()
+    finally:
+        dag.close()
+    # The sampler's segments were unlinked, so it runs again (and so does its consumer);
+    # nothing consumed solo's, so they are still alive and its result is reused
+    assert result.succeeded == 3 and result.reused == 1
+    assert dag.nodes["solo"].last_run.reused and not dag.nodes["sampler"].last_run.reused
+    assert dag.nodes["solo"].result["samples"].view[N - 1] == N - 1
+    assert dag.nodes["summer"].result["total"] == sum(range(N))
+
+
+@pytest.mark.asyncio
+async def test_abandoned_attempt_does_not_leak_segments():
+    before = set(os.listdir("/dev/shm"))
+    dag = DAGOrchestrator(process_workers=1, shared_memory_min_bytes=4096)
+    dag.register(AgentNode(node_id="slow", name="slow", description="", execution=ExecutionMode.PROCESS,
+                           timeout_s=0.05, max_retries=0, execute_fn=slow_sampler))
+    try:
+        result = await dag.run()
+        await asyncio.sleep(0.6)   # The worker finishes, shares its result, and nobody wants it
+    finally:
+        dag.close()
+    assert result.failed == 1
+    assert set(os.listdir("/dev/shm")) <= before
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_with_unlinked_segments_is_a_miss():
+    cache = ResultCache()
+    dag = DAGOrchestrator(process_workers=1, shared_memory_min_bytes=4096, cache=cache)
+    producer = process_node("sampler", sampler, provides=["samples"])
+    producer.cache_ttl_s = 60.0
+    dag.register(producer)
+    dag.register(process_node("summer", summer, requires=["samples"]))
+    try:
+        await dag.run()
+        result = await dag.run()
+    finally:
+        dag.close()
+    # The cached result's segments were unlinked after the first run's summer settled
+    assert result.succeeded == 2 and not dag.nodes["sampler"].last_run.cached
+    assert dag.nodes["summer"].result["total"] == sum(range(N))
+    assert (cache.hits, cache.misses) == (0, 2) and len(cache) == 1
@@ -0,0 +1,159 @@
+"""
+Tests for the RHNS DAG signal bus
+==================================
+Covers SignalBus delivery, bounded queues (backpressure and drops), burst
+coalescing, signal-triggered subgraph runs and DAGOrchestrator.serve().
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, NodeStatus, ScheduleMode
+from core.dag_signals import Signal, SignalBus
+
+
+def make_node(node_id, provides=None, requires=None, consumes=None, emits=None, calls=None, delay=0.0):
+    async def fn(ctx):
+        if calls is not None:
+            calls.append((node_id, [s.type for s in ctx.get("signals", [])]))
+        await asyncio.sleep(delay)
+        return {"node": node_id}
+    return AgentNode(node_id=node_id, name=node_id, description="", max_retries=0,
+                     provides=provides or [], requires=requires or [],
+                     consumes=consumes or [], emits=emits or [], execute_fn=fn)
+
+
+def billing_dag(calls: list, delay: float = 0.0) -> DAGOrchestrator:
+    """defender → revenue (consumes payment_failed) → harmony; market is independent."""
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("defender", provides=["defense"], calls=calls))
+    dag.register(make_node("market", provides=["market"], emits=["market_signals"], calls=calls))
+    dag.register(make_node("revenue", provides=["revenue"], requires=["defense"],
+                           consumes=["payment_failed"], emits=["revenue_signals"], calls=calls, delay=delay))
+    dag.register(make_node("harmony", requires=["revenue"], consumes=["revenue_signals"], calls=calls))
+    return dag
+
+
+# ─── SignalBus ────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_bus_routes_by_type_and_drops_when_full():
+    bus = SignalBus()
+    a, b = bus.subscribe("x", maxsize=1), bus.subscribe("x", maxsize=5)
+    assert await bus.publish(Signal("x")) == 2
+    assert await bus.publish(Signal("other")) == 0
+    assert bus.publish_nowait(Signal("x")) == 1          # a is full
+    assert a.stats()["dropped"] == 1 and b.stats()["received"] == 2
+
+    a.close()
+    assert bus.subscribers("x") == 1
+    a.close()   # idempotent
+
+
+@pytest.mark.asyncio
+async def test_publish_applies_backpressure_until_consumed():
+    bus = SignalBus()
+    sub = bus.subscribe("x", maxsize=1)
+    await bus.publish(Signal("x", {"n": 1}))
+    blocked = asyncio.create_task(bus.publish(Signal("x", {"n": 2})))
+    await asyncio.sleep(0.02)
+    assert not blocked.done()
+
+    assert [s.payload["n"] for s in await sub.next_batch()] == [1]
+    await asyncio.wait_for(blocked, timeout=1)
+    assert [s.payload["n"] for s in await sub.next_batch()] == [2]
+
+
+@pytest.mark.asyncio
+async def test_next_batch_coalesces_a_burst():
+    bus = SignalBus()
+    sub = bus.subscribe("x")
+
+    async def burst():
+        for n in range(5):
+            await bus.publish(Signal("x", {"n": n}))
+            await asyncio.sleep(0.005)
+
+    publisher = asyncio.create_task(burst())
+    batch = await sub.next_batch(coalesce_s=0.1)
+    await publisher
+    assert [s.payload["n"] for s in batch] == [0, 1, 2, 3, 4]
+    assert sub.batches == 1
+
+
+# ─── Signal-triggered runs ────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_signal_runs_only_the_triggered_subgraph():
+    calls = []
+    dag = billing_dag(calls)
+    await dag.run()
+    calls.clear()
+
+    started = time.perf_counter()
+    result = await dag.run_signals([Signal("payment_failed", {"invoice": "in_1"})])
+    assert time.perf_counter() - started < 0.1
+    assert calls == [("revenue", ["payment_failed"]), ("harmony", ["payment_failed"])]
+    assert result.succeeded == 4 and result.restored == 2
+    assert result.node_results["defender"]["restored"] is True
+    assert dag.nodes["market"].status == NodeStatus.SUCCESS
+
+
+@pytest.mark.asyncio
+async def test_signal_without_earlier_upstream_result_skips_dependents():
+    calls = []
+    dag = billing_dag(calls)
+    result = await dag.run_signals([Signal("payment_failed")])
+    assert calls == []
+    assert dag.nodes["defender"].error == "Skipped: not triggered and no earlier result to reuse"
+    assert dag.nodes["revenue"].status == NodeStatus.SKIPPED
+    assert result.skipped == 4
+
+
+@pytest.mark.asyncio
+async def test_serve_coalesces_bursts_and_routes_emits():
+    calls, results = [], []
+    dag = billing_dag(calls, delay=0.05)
+    dag.register(make_node("pricing", consumes=["market_signals"], calls=calls))
+    await dag.run()
+    calls.clear()
+
+    bus = SignalBus()
+    server = asyncio.create_task(dag.serve(bus, on_result=results.append))
+    await asyncio.sleep(0)
+    try:
+        for n in range(5):
+            await bus.publish(Signal("payment_failed", {"n": n}))
+        # revenue_signals is emitted but consumed inside the same subgraph: no re-trigger
+        await bus.publish(Signal("market_signals"))
+        for _ in range(100):
+            revenue_signals = sum(len(signals) for node, signals in calls if node == "revenue")
+            if revenue_signals == 5 and ("pricing", ["market_signals"]) in calls and len(results) >= 2:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        server.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await server
+
+    revenue_runs = [signals for node, signals in calls if node == "revenue"]
+    assert 1 <= len(revenue_runs) <= 2 and sum(len(s) for s in revenue_runs) == 5
+    assert ("pricing", ["market_signals"]) in calls
+    assert bus.subscribers("payment_failed") == 0
+
+
+@pytest.mark.asyncio
+async def test_emitted_signal_triggers_consumers_outside_the_subgraph():
+    calls = []
+    dag = DAGOrchestrator()
+    dag.register(make_node("ingest", consumes=["webhook"], emits=["refresh"], calls=calls))
+    dag.register(make_node("cache_warm", consumes=["refresh"], calls=calls))
+    bus = SignalBus()
+    refresh = bus.subscribe("refresh")
+
+    await dag.run_signals([Signal("webhook")], bus=bus)
+    assert calls == [("ingest", ["webhook"])]
+    emitted = await refresh.next_batch()
+    assert emitted[0].source == "ingest" and emitted[0].payload == {"node": "ingest"}
@@ -0,0 +1,195 @@
+"""
+Tests for the RHNS DAG simulator
+=================================
+Covers virtual-time replay against the real engine, retries and timeouts,
+skips and halts, provider policies, resource pools, deadlines, and
+building profiles from recorded OrchestrationResults.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from core.dag_compiler import ProviderPolicy
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, ScheduleMode
+from core.dag_simulator import NodeProfile, profiles_from_results
+
+
+def make_node(node_id, provides=None, requires=None, seconds=0.0, timeout_s=5.0, **kwargs):
+    async def fn(ctx):
+        await asyncio.sleep(seconds)
+        return {"node": node_id}
+    return AgentNode(node_id=node_id, name=node_id, description="", provides=provides or [],
+                     requires=requires or [], timeout_s=timeout_s, execute_fn=fn, **kwargs)
+
+
+def fixed(seconds: float, failure_rate: float = 0.0) -> NodeProfile:
+    return NodeProfile([seconds], failure_rate)
+
+
+def diamond(**kwargs) -> DAGOrchestrator:
+    """root → {slow, fast} → join, plus an independent side node."""
+    dag = DAGOrchestrator(**kwargs)
+    dag.register(make_node("root", provides=["r"], seconds=0.02, max_retries=0))
+    dag.register(make_node("slow", provides=["s"], requires=["r"], seconds=0.08, max_retries=0))
+    dag.register(make_node("fast", provides=["f"], requires=["r"], seconds=0.02, max_retries=0))
+    dag.register(make_node("join", requires=["s", "f"], seconds=0.02, max_retries=0))
+    dag.register(make_node("side", seconds=0.06, max_retries=0))
+    return dag
+
+
+DIAMOND = {"root": fixed(0.02), "slow": fixed(0.08), "fast": fixed(0.02), "join": fixed(0.02), "side": fixed(0.06)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule,limit", [
+    (ScheduleMode.READY, 8), (ScheduleMode.READY, 1), (ScheduleMode.LAYERED, 8), (ScheduleMode.LAYERED, 2),
+])
+async def test_simulated_makespan_matches_real_run(schedule, limit):
+    dag = diamond(schedule=schedule, max_parallelism=limit)
+    report = dag.simulate(runs=3, profiles=DIAMOND)
+    result = await dag.run()
+    assert report.makespan_s["p50"] == report.makespan_s["max"]        # Deterministic profiles
+    assert result.total_duration_ms / 1000 == pytest.approx(report.makespan_s["p50"], abs=0.03)
+
+
+def test_limits_and_schedules_change_the_prediction():
+    dag = diamond(schedule=ScheduleMode.READY)
+    assert dag.simulate(runs=1, profiles=DIAMOND).makespan_s["max"] == pytest.approx(0.12)
+    assert dag.simulate(runs=1, profiles=DIAMOND, max_parallelism=1).makespan_s["max"] == pytest.approx(0.2)
+    layered = dag.simulate(runs=1, profiles=DIAMOND, schedule=ScheduleMode.LAYERED)
+    assert layered.schedule == "layered" and layered.makespan_s["max"] == pytest.approx(0.16)
+    full = dag.simulate(runs=1, profiles=DIAMOND, max_parallelism=1)
+    assert full.utilization == pytest.approx(1.0)
+
+
+def test_failures_retries_and_timeouts():
+    dag = diamond(schedule=ScheduleMode.READY)
+    dag.nodes["slow"].max_retries = 1
+    report = dag.simulate(runs=50, profiles={**DIAMOND, "slow": fixed(0.08, failure_rate=1.0)})
+    # Two failed attempts with a 1s backoff between them; join never runs
+    assert report.makespan_s["max"] == pytest.approx(0.02 + 0.08 + 1 + 0.08)
+    assert report.node_failure_rates == {"slow": 1.0}
+    assert report.node_skip_rates == {"join": 1.0}
+    assert report.skip_rate == pytest.approx(1 / 5) and report.halt_rate == 0.0
+
+    dag.nodes["slow"].max_retries = 0
+    dag.nodes["slow"].timeout_s = 0.05
+    report = dag.simulate(runs=1, profiles=DIAMOND)
+    assert report.node_failure_rates == {"slow": 1.0}
+    assert report.makespan_s["max"] == pytest.approx(0.07)
+
+
+def test_failure_rate_is_sampled_and_reproducible():
+    dag = diamond(schedule=ScheduleMode.READY)
+    profiles = {**DIAMOND, "fast": fixed(0.02, failure_rate=0.25)}
+    report = dag.simulate(runs=4000, profiles=profiles, seed=7)
+    assert report.node_failure_rates["fast"] == pytest.approx(0.25, abs=0.03)
+    assert report.node_skip_rates["join"] == report.node_failure_rates["fast"]
+    assert dag.simulate(runs=4000, profiles=profiles, seed=7) == report
+
+
+def test_critical_failure_halts_and_deadline_cuts_runs():
+    dag = diamond(schedule=ScheduleMode.READY)
+    dag.nodes["fast"].critical = True
+    report = dag.simulate(runs=10, profiles={**DIAMOND, "fast": fixed(0.02, failure_rate=1.0)})
+    assert report.halt_rate == 1.0
+    assert report.makespan_s["max"] == pytest.approx(0.04)
+    assert report.node_skip_rates == {"join": 1.0}           # slow and side were cancelled mid-flight
+
+    report = diamond(schedule=ScheduleMode.READY).simulate(runs=5, profiles=DIAMOND, deadline_s=0.05)
+    assert report.halt_rate == 1.0 and report.makespan_s["max"] == pytest.approx(0.05)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("schedule", list(ScheduleMode))
+async def test_unprovided_requirements_skip_as_in_the_engine(schedule):
+    dag = DAGOrchestrator(schedule=schedule)
+    dag.register(make_node("orphan", provides=["o"], requires=["nobody"]))
+    dag.register(make_node("selfish", requires=["own"], provides=["own"]))
+    dag.register(make_node("after", requires=["o"]))
+    dag.register(make_node("fine"))
+    report = dag.simulate(runs=2, profiles={name: fixed(0.1) for name in dag.nodes})
+    result = await dag.run()
+    skipped = {nid for nid, summary in result.node_results.items() if summary["status"] == "skipped"}
+    assert skipped == set(report.node_skip_rates) == {"orphan", "selfish", "after"}
+    assert report.skip_rate == 0.75 and report.makespan_s["max"] == pytest.approx(0.1)
+
+
+def test_provider_policies_and_resource_pools():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, resource_limits={"api": 1})
+    dag.register(make_node("mirror_a", provides=["data"], resources=["api"]))
+    dag.register(make_node("mirror_b", provides=["data"]))
+    dag.register(make_node("use", requires=["data"], resources=["api"]))
+    profiles = {"mirror_a": fixed(0.5), "mirror_b": fixed(0.1), "use": fixed(0.1)}
+
+    # By default both mirrors run and `use` waits for both
+    assert dag.simulate(runs=1, profiles=profiles).makespan_s["max"] == pytest.approx(0.6)
+
+    # FIRST_SUCCESS: mirror_b wins, mirror_a is superseded and frees the api pool for `use`
+    dag.set_provider_policy("data", ProviderPolicy.FIRST_SUCCESS)
+    report = dag.simulate(runs=1, profiles=profiles)
+    assert report.makespan_s["max"] == pytest.approx(0.2)
+    assert report.node_skip_rates == {"mirror_a": 1.0}
+
+    dag.set_provider_policy("data", ProviderPolicy.ALL_REQUIRED)
+    assert dag.simulate(runs=1, profiles=profiles).makespan_s["max"] == pytest.approx(0.6)
+
+    dag.set_provider_policy("data", ProviderPolicy.ROUND_ROBIN)
+    report = dag.simulate(runs=4, profiles=profiles)
+    assert report.node_skip_rates == {"mirror_a": 0.5, "mirror_b": 0.5}
+    assert report.makespan_s == {"mean": 0.4, "p50": 0.2, "p90": 0.6, "p95": 0.6, "p99": 0.6, "max": 0.6}
+
+
+@pytest.mark.asyncio
+async def test_profiles_from_recorded_results():
+    flaky_calls = []
+
+    async def flaky(ctx):
+        flaky_calls.append(1)
+        if len(flaky_calls) % 2:
+            raise RuntimeError("upstream 503")
+        await asyncio.sleep(0.01)
+        return {}
+
+    dag = DAGOrchestrator()
+    dag.register(AgentNode(node_id="flaky", name="flaky", description="", max_retries=1, execute_fn=flaky))
+    dag.register(make_node("steady", seconds=0.01))
+    results = [await dag.run()]
+
+    profiles = profiles_from_results(results)
+    assert profiles["flaky"].failure_rate == pytest.approx(0.5)
+    assert len(profiles["steady"].durations) == 1 and profiles["steady"].failure_rate == 0.0
+    assert all(0.005 < d < 0.1 for d in profiles["flaky"].durations)
+
+    # Falls back to the orchestrator's own history when no profile is given
+    report = dag.simulate(runs=200, profiles={"flaky": profiles["flaky"]})
+    assert report.node_failure_rates.get("flaky", 0) < 0.5
+    assert 0.005 < report.makespan_s["p50"] < 1.2
+
+
+@pytest.mark.asyncio
+async def test_profiles_skip_nodes_that_did_not_execute():
+    dag = DAGOrchestrator(incremental=True)
+    dag.register(AgentNode(node_id="placeholder", name="placeholder", description="", provides=["p"]))
+    dag.register(make_node("steady", requires=["p"], seconds=0.01))
+    results = [await dag.run(), await dag.run()]
+    assert results[1].node_results["steady"]["reused"]
+
+    profiles = profiles_from_results(results)
+    assert "placeholder" not in profiles
+    assert len(profiles["steady"].durations) == 1          # The reused second run adds no sample
+
+
+def test_simulation_of_a_large_dag_is_fast():
+    rng = random.Random(3)
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY, max_parallelism=16)
+    for i in range(300):
+        requires = [f"c{j}" for j in rng.sample(range(i), min(i, 2))] if i > 20 else []
+        dag.register(AgentNode(node_id=f"n{i}", name="", description="", provides=[f"c{i}"],
+                               requires=requires, max_retries=0))
+    profiles = {f"n{i}": NodeProfile([rng.uniform(0.5, 3.0) for _ in range(5)], 0.01) for i in range(300)}
+    report = dag.simulate(runs=50, profiles=profiles)
+    assert report.runs == 50 and 0 < report.utilization <= 1
+    assert report.makespan_s["p50"] <= report.makespan_s["p95"] <= report.makespan_s["max"]
@@ -0,0 +1,89 @@
+"""
+Tests for RHNS DAG run streaming
+=================================
+Covers DAGOrchestrator.run_stream(): event order and timing, skip/fail
+events, the final result, and early exit from iteration.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from core.dag_orchestrator import DAGOrchestrator, AgentNode, ScheduleMode
+from core.dag_stream import EventKind
+
+
+def make_node(node_id, seconds=0.0, provides=None, requires=None, fail=False):
+    async def fn(ctx: dict) -> dict:
+        await asyncio.sleep(seconds)
+        if fail:
+            raise RuntimeError(f"{node_id} broke")
+        return {"node": node_id}
+    return AgentNode(node_id=node_id, name=node_id, description="",
+                     provides=provides or [], requires=requires or [],
+                     max_retries=0, execute_fn=fn)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_events_before_run_finishes():
+    dag = DAGOrchestrator(schedule=ScheduleMode.READY)
+    dag.register(make_node("defender", 0.01, provides=["defense_state"]))
+    dag.register(make_node("slow", 0.3))
+
+    start = time.time()
+    stream = dag.run_stream({"seed": 1})
+    first_success = None
+    events = []
+    async for event in stream:
+        events.append(event)
+        if event.kind is EventKind.SUCCEEDED and first_success is None:
+            first_success = (event, time.time() - start)
+
+    event, elapsed = first_success
+    assert event.node_id == "defender"
+    assert event.result == {"node": "defender"}
+    assert event.duration_ms is not None
+    assert elapsed < 0.2
+    assert stream.result.succeeded == 2
+    assert {e.run_id for e in events} == {stream.result.run_id}
+    kinds = [(e.node_id, e.kind) for e in events]
+    assert kinds.index(("slow", EventKind.STARTED)) < kinds.index(("slow", EventKind.SUCCEEDED))
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_failures_and_skips():
+    dag = DAGOrchestrator()
+    dag.register(make_node("a", provides=["cap_a"], fail=True))
+    dag.register(make_node("b", requires=["cap_a"]))
+
+    stream = dag.run_stream()
+    events = [event async for event in stream]
+    by_node = {e.node_id: e for e in events if e.kind is not EventKind.STARTED}
+    assert by_node["a"].kind is EventKind.FAILED
+    assert "broke" in by_node["a"].error
+    assert by_node["b"].kind is EventKind.SKIPPED
+    assert by_node["a"].result is None
+    assert stream.result.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_result_available_after_early_exit():
+    dag = DAGOrchestrator()
+    dag.register(make_node("a", 0.01))
+    dag.register(make_node("b", 0.05))
+
+    stream = dag.run_stream()
+    async for event in stream:
+        break
+    result = await stream.wait()
+    assert result.succeeded == 2
+    assert stream.result is result
+
+
+@pytest.mark.asyncio
+async def test_stream_wait_without_iterating():
+    dag = DAGOrchestrator()
+    dag.register(make_node("a"))
+    result = await dag.run_stream().wait()
+    assert result.succeeded == 1